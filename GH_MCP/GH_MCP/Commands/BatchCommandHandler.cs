@@ -0,0 +1,92 @@
+using System;
+using System.Collections.Generic;
+using GrasshopperMCP.Models;
+using Newtonsoft.Json.Linq;
+using Rhino;
+
+namespace GH_MCP.Commands
+{
+    /// <summary>
+    /// 處理批次命令的處理器，在一次請求中依序執行多個命令
+    /// </summary>
+    public static class BatchCommandHandler
+    {
+        /// <summary>
+        /// 依序執行批次中的所有命令，並返回每個命令的結果
+        /// </summary>
+        /// <param name="command">包含 commands 陣列的命令；transaction 為 true 時整批只重新計算一次，失敗則回滾</param>
+        /// <returns>每個子命令的執行結果</returns>
+        public static object ExecuteBatch(Command command)
+        {
+            var commandsData = command.GetParameter<JArray>("commands");
+            bool stopOnError = command.GetParameter<bool>("stopOnError");
+            bool transaction = command.GetParameter<bool>("transaction");
+
+            if (commandsData == null)
+            {
+                throw new ArgumentException("Batch requires a 'commands' array");
+            }
+
+            var results = new List<Response>();
+            int succeeded = 0;
+            int failed = 0;
+
+            // 已有開啟的交易時加入該交易，由開啟者決定提交或回滾
+            string transactionId = null;
+            bool ownsTransaction = transaction && TransactionCommandHandler.TryBegin(out transactionId);
+
+            foreach (var commandData in commandsData)
+            {
+                string type = commandData["type"]?.ToString();
+
+                // 禁止巢狀批次，避免遞迴執行
+                if (type == "batch")
+                {
+                    results.Add(Response.CreateError("Nested batch commands are not supported"));
+                    failed++;
+                    continue;
+                }
+
+                var parameters = (commandData["parameters"] as JObject)?.ToObject<Dictionary<string, object>>();
+                var response = GrasshopperCommandRegistry.ExecuteCommand(new Command(type, parameters));
+
+                // 部分處理器自行返回 Response，這裡將其展開以避免巢狀結構
+                if (response.Success && response.Data is Response inner)
+                {
+                    response = inner;
+                }
+
+                results.Add(response);
+
+                if (response.Success)
+                {
+                    succeeded++;
+                }
+                else
+                {
+                    failed++;
+                    if (stopOnError || ownsTransaction)
+                    {
+                        break;
+                    }
+                }
+            }
+
+            object transactionResult = null;
+            if (ownsTransaction)
+            {
+                transactionResult = TransactionCommandHandler.Finish(transactionId, failed > 0);
+            }
+
+            RhinoApp.WriteLine($"GH_MCP: Batch executed {results.Count} commands ({succeeded} succeeded, {failed} failed)");
+
+            return new
+            {
+                results = results,
+                succeeded = succeeded,
+                failed = failed,
+                transaction = transactionResult
+            };
+        }
+    }
+}
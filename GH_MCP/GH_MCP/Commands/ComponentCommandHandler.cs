@@ -4,6 +4,7 @@ using GrasshopperMCP.Models;
 using Grasshopper.Kernel;
 using Grasshopper.Kernel.Parameters;
 using Grasshopper.Kernel.Special;
+using Grasshopper.GUI.Base;
 using Rhino;
 using Rhino.Geometry;
 using Grasshopper;
@@ -11,6 +12,8 @@ using System.Linq;
 using Grasshopper.Kernel.Components;
 using System.Threading;
 using GH_MCP.Utils;
+using Newtonsoft.Json.Linq;
+using GH_MCP.Commands;
 
 namespace GrasshopperMCP.Commands
 {
@@ -239,9 +242,10 @@ namespace GrasshopperMCP.Commands
                         
                         // 添加到文檔
                         doc.AddObject(component, false);
+                        TransactionCommandHandler.TrackAddedObject(component);
                         
                         // 刷新畫布
-                        doc.NewSolution(false);
+                        TransactionCommandHandler.RequestSolution(doc);
                         
                         // 返回組件信息
                         result = new
@@ -365,7 +369,7 @@ namespace GrasshopperMCP.Commands
                     toParam.AddSource(fromParam);
                     
                     // 刷新畫布
-                    doc.NewSolution(false);
+                    TransactionCommandHandler.RequestSolution(doc);
                     
                     // 返回連接信息
                     result = new
@@ -409,18 +413,34 @@ namespace GrasshopperMCP.Commands
         /// <summary>
         /// 設置組件值
         /// </summary>
-        /// <param name="command">包含組件 ID 和值的命令</param>
+        /// <param name="command">包含組件 ID 和值（或打包的數值陣列 packed）的命令</param>
         /// <returns>操作結果</returns>
         public static object SetComponentValue(Command command)
         {
             string idStr = command.GetParameter<string>("id");
             string value = command.GetParameter<string>("value");
+            var packed = command.GetParameter<JObject>("packed");
+            // 分塊傳輸：append 表示接在現有資料之後，final 為 false 時暫不重新計算
+            bool append = command.GetParameter<bool>("append");
+            bool final = !command.Parameters.ContainsKey("final") || command.GetParameter<bool>("final");
+            // 滑桿範圍與小數位數（可選），在設定值之前套用，避免數值被舊範圍截斷
+            double? minimum = command.Parameters.ContainsKey("minimum") ? command.GetParameter<double>("minimum") : (double?)null;
+            double? maximum = command.Parameters.ContainsKey("maximum") ? command.GetParameter<double>("maximum") : (double?)null;
+            int? decimals = command.Parameters.ContainsKey("decimals") ? command.GetParameter<int>("decimals") : (int?)null;
             
             if (string.IsNullOrEmpty(idStr))
             {
                 throw new ArgumentException("Component ID is required");
             }
             
+            // 在 UI 線程之外先解碼打包的數值
+            double[] values = null;
+            bool integral = false;
+            if (packed != null)
+            {
+                values = PackedArray.Decode(packed, out integral);
+            }
+            
             object result = null;
             Exception exception = null;
             
@@ -450,19 +470,28 @@ namespace GrasshopperMCP.Commands
                         throw new ArgumentException($"Component with ID {idStr} not found");
                     }
                     
+                    // 打包的數值陣列
+                    if (values != null)
+                    {
+                        SetPackedValues(component, values, integral, append);
+                    }
                     // 根據組件類型設置值
-                    if (component is GH_Panel panel)
+                    else if (component is GH_Panel panel)
                     {
                         panel.UserText = value;
                     }
                     else if (component is GH_NumberSlider slider)
                     {
+                        SetSliderRange(slider, minimum, maximum, decimals);
+                        
+                        // 只設定範圍時可以省略數值
+                        bool rangeOnly = value == null && (minimum.HasValue || maximum.HasValue || decimals.HasValue);
                         double doubleValue;
                         if (double.TryParse(value, out doubleValue))
                         {
                             slider.SetSliderValue((decimal)doubleValue);
                         }
-                        else
+                        else if (!rangeOnly)
                         {
                             throw new ArgumentException("Invalid slider value format");
                         }
@@ -506,21 +535,253 @@ namespace GrasshopperMCP.Commands
                         throw new ArgumentException($"Cannot set value for component type {component.GetType().Name}");
                     }
                     
-                    // 刷新畫布
-                    doc.NewSolution(false);
+                    // 刷新畫布（分塊傳輸時只在最後一塊重新計算）
+                    if (final)
+                    {
+                        TransactionCommandHandler.RequestSolution(doc);
+                    }
                     
                     // 返回操作結果
+                    if (values != null)
+                    {
+                        result = new
+                        {
+                            id = component.InstanceGuid.ToString(),
+                            type = component.GetType().Name,
+                            count = values.Length
+                        };
+                    }
+                    else
+                    {
+                        result = new
+                        {
+                            id = component.InstanceGuid.ToString(),
+                            type = component.GetType().Name,
+                            value = value
+                        };
+                    }
+                }
+                catch (Exception ex)
+                {
+                    exception = ex;
+                    RhinoApp.WriteLine($"Error in SetComponentValue: {ex.Message}");
+                }
+            }));
+            
+            // 等待 UI 線程操作完成
+            while (result == null && exception == null)
+            {
+                Thread.Sleep(10);
+            }
+            
+            // 如果有異常，拋出
+            if (exception != null)
+            {
+                throw exception;
+            }
+            
+            return result;
+        }
+        
+        /// <summary>
+        /// 將參數的資料（數值、整數、布林或文字）加入結果
+        /// </summary>
+        /// <param name="target">要加入 data 和 count 的字典</param>
+        /// <param name="param">參數</param>
+        /// <param name="maxItems">最多回傳的項目數</param>
+        private static void AddParamData(Dictionary<string, object> target, IGH_Param param, int maxItems)
+        {
+            var data = new List<object>();
+            foreach (var goo in param.VolatileData.AllData(true))
+            {
+                if (data.Count >= maxItems)
+                {
+                    break;
+                }
+                if (goo is Grasshopper.Kernel.Types.GH_Number number)
+                {
+                    data.Add(number.Value);
+                }
+                else if (goo is Grasshopper.Kernel.Types.GH_Integer integer)
+                {
+                    data.Add(integer.Value);
+                }
+                else if (goo is Grasshopper.Kernel.Types.GH_Boolean boolean)
+                {
+                    data.Add(boolean.Value);
+                }
+                else
+                {
+                    data.Add(goo?.ToString());
+                }
+            }
+            target["data"] = data;
+            target["count"] = param.VolatileDataCount;
+        }
+        
+        /// <summary>
+        /// 設定滑桿的範圍與小數位數
+        /// </summary>
+        /// <param name="slider">目標滑桿</param>
+        /// <param name="minimum">最小值（可選）</param>
+        /// <param name="maximum">最大值（可選）</param>
+        /// <param name="decimals">小數位數（可選），0 表示整數滑桿</param>
+        private static void SetSliderRange(GH_NumberSlider slider, double? minimum, double? maximum, int? decimals)
+        {
+            if (decimals.HasValue)
+            {
+                slider.Slider.Type = decimals.Value == 0 ? GH_SliderAccuracy.Integer : GH_SliderAccuracy.Float;
+                slider.Slider.DecimalPlaces = decimals.Value;
+            }
+            // 新的最小值大於目前的最大值時，先放寬最大值
+            if (minimum.HasValue && maximum.HasValue && (decimal)minimum.Value > slider.Slider.Maximum)
+            {
+                slider.Slider.Maximum = (decimal)maximum.Value;
+            }
+            if (minimum.HasValue)
+            {
+                slider.Slider.Minimum = (decimal)minimum.Value;
+            }
+            if (maximum.HasValue)
+            {
+                slider.Slider.Maximum = (decimal)maximum.Value;
+            }
+        }
+        
+        /// <summary>
+        /// 將打包的數值陣列寫入面板、滑桿或數值參數
+        /// </summary>
+        /// <param name="component">目標組件</param>
+        /// <param name="values">數值</param>
+        /// <param name="integral">數值是否為整數</param>
+        /// <param name="append">是否接在現有資料之後</param>
+        private static void SetPackedValues(IGH_DocumentObject component, double[] values, bool integral, bool append)
+        {
+            if (component is GH_Panel panel)
+            {
+                // 每行一個值，並關閉多行資料以便每行輸出為一個項目
+                string text = PackedArray.ToLines(values, integral);
+                panel.Properties.Multiline = false;
+                panel.UserText = append && !string.IsNullOrEmpty(panel.UserText) ? panel.UserText + "\n" + text : text;
+            }
+            else if (component is GH_NumberSlider slider)
+            {
+                if (values.Length != 1)
+                {
+                    throw new ArgumentException("A slider takes exactly one value");
+                }
+                slider.SetSliderValue((decimal)values[0]);
+            }
+            else if (component is IGH_Param param)
+            {
+                SetPersistentNumbers(param, values, integral, append);
+            }
+            else if (component is IGH_Component ghComponent && ghComponent.Params.Input.Count > 0)
+            {
+                // 與單一值相同，寫入第一個輸入參數
+                SetPersistentNumbers(ghComponent.Params.Input[0], values, integral, append);
+            }
+            else
+            {
+                throw new ArgumentException($"Cannot set packed values for component type {component.GetType().Name}");
+            }
+        }
+        
+        /// <summary>
+        /// 將數值寫入參數的持久資料
+        /// </summary>
+        private static void SetPersistentNumbers(IGH_Param param, double[] values, bool integral, bool append)
+        {
+            if (param is Param_Number numberParam)
+            {
+                if (!append)
+                {
+                    numberParam.PersistentData.Clear();
+                }
+                numberParam.PersistentData.AppendRange(values.Select(v => new Grasshopper.Kernel.Types.GH_Number(v)));
+            }
+            else if (param is Param_Integer integerParam)
+            {
+                if (!integral)
+                {
+                    throw new ArgumentException("Integer parameters require int32 values");
+                }
+                if (!append)
+                {
+                    integerParam.PersistentData.Clear();
+                }
+                integerParam.PersistentData.AppendRange(values.Select(v => new Grasshopper.Kernel.Types.GH_Integer((int)v)));
+            }
+            else
+            {
+                throw new ArgumentException($"Cannot set packed values for parameter type {param.GetType().Name}");
+            }
+            
+            // 標記為過期，之後的 NewSolution 才會重新計算此參數及其下游
+            param.ExpireSolution(false);
+        }
+        
+        /// <summary>
+        /// 設置組件在畫布上的位置
+        /// </summary>
+        /// <param name="command">包含組件 ID 和座標的命令</param>
+        /// <returns>組件的新位置</returns>
+        public static object SetComponentPosition(Command command)
+        {
+            string idStr = command.GetParameter<string>("id");
+            double x = command.GetParameter<double>("x");
+            double y = command.GetParameter<double>("y");
+            
+            if (string.IsNullOrEmpty(idStr))
+            {
+                throw new ArgumentException("Component ID is required");
+            }
+            
+            object result = null;
+            Exception exception = null;
+            
+            // 在 UI 線程上執行
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                try
+                {
+                    // 獲取 Grasshopper 文檔
+                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                    if (doc == null)
+                    {
+                        throw new InvalidOperationException("No active Grasshopper document");
+                    }
+                    
+                    // 將字符串 ID 轉換為 Guid
+                    Guid id;
+                    if (!Guid.TryParse(idStr, out id))
+                    {
+                        throw new ArgumentException("Invalid component ID format");
+                    }
+                    
+                    // 查找組件
+                    IGH_DocumentObject component = doc.FindObject(id, true);
+                    if (component == null)
+                    {
+                        throw new ArgumentException($"Component with ID {idStr} not found");
+                    }
+                    
+                    // 移動組件，只需重繪畫布，不需要重新計算
+                    component.Attributes.Pivot = new System.Drawing.PointF((float)x, (float)y);
+                    component.Attributes.ExpireLayout();
+                    Grasshopper.Instances.ActiveCanvas?.Invalidate();
+                    
                     result = new
                     {
                         id = component.InstanceGuid.ToString(),
-                        type = component.GetType().Name,
-                        value = value
+                        x = component.Attributes.Pivot.X,
+                        y = component.Attributes.Pivot.Y
                     };
                 }
                 catch (Exception ex)
                 {
                     exception = ex;
-                    RhinoApp.WriteLine($"Error in SetComponentValue: {ex.Message}");
+                    RhinoApp.WriteLine($"Error in SetComponentPosition: {ex.Message}");
                 }
             }));
             
@@ -546,7 +807,11 @@ namespace GrasshopperMCP.Commands
         /// <returns>組件信息</returns>
         public static object GetComponentInfo(Command command)
         {
-            string idStr = command.GetParameter<string>("id");
+            // bridge 的 get_component_info 以 componentId 傳遞 ID
+            string idStr = command.GetParameter<string>("id") ?? command.GetParameter<string>("componentId");
+            // includeData 時附帶輸出參數的資料（最多 maxItems 項）
+            bool includeData = command.GetParameter<bool>("includeData");
+            int maxItems = command.Parameters.ContainsKey("maxItems") ? command.GetParameter<int>("maxItems") : 100;
             
             if (string.IsNullOrEmpty(idStr))
             {
@@ -587,6 +852,7 @@ namespace GrasshopperMCP.Commands
                     {
                         { "id", component.InstanceGuid.ToString() },
                         { "type", component.GetType().Name },
+                        { "componentName", component.Name },
                         { "name", component.NickName },
                         { "description", component.Description }
                     };
@@ -611,17 +877,27 @@ namespace GrasshopperMCP.Commands
                         var outputs = new List<Dictionary<string, object>>();
                         foreach (var param in ghComponent.Params.Output)
                         {
-                            outputs.Add(new Dictionary<string, object>
+                            var output = new Dictionary<string, object>
                             {
                                 { "name", param.Name },
                                 { "nickname", param.NickName },
                                 { "description", param.Description },
                                 { "type", param.GetType().Name },
                                 { "dataType", param.TypeName }
-                            });
+                            };
+                            if (includeData)
+                            {
+                                AddParamData(output, param, maxItems);
+                            }
+                            outputs.Add(output);
                         }
                         componentInfo["outputs"] = outputs;
                     }
+                    // 獨立的參數物件（面板與滑桿除外）直接附帶其資料
+                    else if (includeData && component is IGH_Param floatingParam && !(component is GH_Panel) && !(component is GH_NumberSlider))
+                    {
+                        AddParamData(componentInfo, floatingParam, maxItems);
+                    }
                     
                     // 如果是 GH_Panel，獲取其文本值
                     if (component is GH_Panel panel)
@@ -635,6 +911,7 @@ namespace GrasshopperMCP.Commands
                         componentInfo["value"] = (double)slider.CurrentValue;
                         componentInfo["minimum"] = (double)slider.Slider.Minimum;
                         componentInfo["maximum"] = (double)slider.Slider.Maximum;
+                        componentInfo["rounding"] = Math.Pow(10, -slider.Slider.DecimalPlaces);
                     }
                     
                     result = componentInfo;
@@ -196,7 +196,7 @@ namespace GH_MCP.Commands
                     targetParameter.ComputeData();
                     
                     // 刷新畫布
-                    doc.NewSolution(false);
+                    TransactionCommandHandler.RequestSolution(doc);
 
                     // 返回結果
                     result = new
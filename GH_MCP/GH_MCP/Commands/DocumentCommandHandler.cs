@@ -6,6 +6,7 @@ using Grasshopper.Kernel;
 using Rhino;
 using System.Linq;
 using System.Threading;
+using GH_MCP.Commands;
 
 namespace GrasshopperMCP.Commands
 {
@@ -83,6 +84,277 @@ namespace GrasshopperMCP.Commands
             return result;
         }
         
+        /// <summary>
+        /// 獲取文檔指紋（組件數、連接數和內容哈希），用於低成本地偵測文檔變更
+        /// </summary>
+        /// <param name="command">命令</param>
+        /// <returns>文檔指紋</returns>
+        public static object GetDocumentFingerprint(Command command)
+        {
+            object result = null;
+            Exception exception = null;
+            
+            // 在 UI 線程上執行
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                try
+                {
+                    // 獲取 Grasshopper 文檔
+                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                    if (doc == null)
+                    {
+                        throw new InvalidOperationException("No active Grasshopper document");
+                    }
+                    
+                    // FNV-1a 64 位哈希，涵蓋組件 ID、位置、滑塊值和所有連接
+                    ulong hash = 14695981039346656037UL;
+                    int connectionCount = 0;
+                    
+                    foreach (var obj in doc.Objects)
+                    {
+                        hash = Fnv1a(hash, obj.InstanceGuid.ToString());
+                        if (obj.Attributes != null)
+                        {
+                            hash = Fnv1a(hash, $"{obj.Attributes.Pivot.X:F1},{obj.Attributes.Pivot.Y:F1}");
+                        }
+                        
+                        if (obj is Grasshopper.Kernel.Special.GH_NumberSlider slider)
+                        {
+                            hash = Fnv1a(hash, slider.CurrentValue.ToString());
+                        }
+                        else if (obj is Grasshopper.Kernel.Special.GH_Panel panel)
+                        {
+                            hash = Fnv1a(hash, panel.UserText ?? "");
+                        }
+                        
+                        // 收集所有輸入參數的來源
+                        IEnumerable<IGH_Param> inputs = null;
+                        if (obj is IGH_Component component)
+                        {
+                            inputs = component.Params.Input;
+                        }
+                        else if (obj is IGH_Param param)
+                        {
+                            inputs = new[] { param };
+                        }
+                        
+                        if (inputs != null)
+                        {
+                            foreach (var input in inputs)
+                            {
+                                foreach (var source in input.Sources)
+                                {
+                                    hash = Fnv1a(hash, $"{source.InstanceGuid}>{input.InstanceGuid}");
+                                    connectionCount++;
+                                }
+                            }
+                        }
+                    }
+                    
+                    result = new
+                    {
+                        componentCount = doc.Objects.Count,
+                        connectionCount = connectionCount,
+                        hash = hash.ToString("x16")
+                    };
+                }
+                catch (Exception ex)
+                {
+                    exception = ex;
+                    RhinoApp.WriteLine($"Error in GetDocumentFingerprint: {ex.Message}");
+                }
+            }));
+            
+            // 等待 UI 線程操作完成
+            while (result == null && exception == null)
+            {
+                Thread.Sleep(10);
+            }
+            
+            // 如果有異常，拋出
+            if (exception != null)
+            {
+                throw exception;
+            }
+            
+            return result;
+        }
+        
+        /// <summary>
+        /// 將字符串併入 FNV-1a 哈希
+        /// </summary>
+        private static ulong Fnv1a(ulong hash, string value)
+        {
+            foreach (char c in value)
+            {
+                hash ^= c;
+                hash *= 1099511628211UL;
+            }
+            // 分隔符，避免相鄰字符串產生相同哈希
+            hash ^= 0x1F;
+            hash *= 1099511628211UL;
+            return hash;
+        }
+        
+        /// <summary>
+        /// 獲取文檔中所有組件的列表（位置、類型及滑塊和面板的值）
+        /// </summary>
+        /// <param name="command">命令</param>
+        /// <returns>組件列表</returns>
+        public static object GetAllComponents(Command command)
+        {
+            object result = null;
+            Exception exception = null;
+            
+            // 在 UI 線程上執行
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                try
+                {
+                    // 獲取 Grasshopper 文檔
+                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                    if (doc == null)
+                    {
+                        throw new InvalidOperationException("No active Grasshopper document");
+                    }
+                    
+                    var components = new List<object>();
+                    foreach (var obj in doc.Objects)
+                    {
+                        // type 為類別名稱（與 get_component_info 一致），componentName 為組件庫中的名稱
+                        var componentInfo = new Dictionary<string, object>
+                        {
+                            { "id", obj.InstanceGuid.ToString() },
+                            { "type", obj.GetType().Name },
+                            { "componentName", obj.Name },
+                            { "name", obj.NickName },
+                            { "x", obj.Attributes != null ? (double)obj.Attributes.Pivot.X : 0.0 },
+                            { "y", obj.Attributes != null ? (double)obj.Attributes.Pivot.Y : 0.0 }
+                        };
+                        
+                        if (obj is Grasshopper.Kernel.Special.GH_NumberSlider slider)
+                        {
+                            componentInfo["value"] = (double)slider.CurrentValue;
+                            componentInfo["minimum"] = (double)slider.Slider.Minimum;
+                            componentInfo["maximum"] = (double)slider.Slider.Maximum;
+                            componentInfo["rounding"] = Math.Pow(10, -slider.Slider.DecimalPlaces);
+                        }
+                        else if (obj is Grasshopper.Kernel.Special.GH_Panel panel)
+                        {
+                            componentInfo["value"] = panel.UserText;
+                        }
+                        
+                        components.Add(componentInfo);
+                    }
+                    
+                    result = components;
+                }
+                catch (Exception ex)
+                {
+                    exception = ex;
+                    RhinoApp.WriteLine($"Error in GetAllComponents: {ex.Message}");
+                }
+            }));
+            
+            // 等待 UI 線程操作完成
+            while (result == null && exception == null)
+            {
+                Thread.Sleep(10);
+            }
+            
+            // 如果有異常，拋出
+            if (exception != null)
+            {
+                throw exception;
+            }
+            
+            return result;
+        }
+        
+        /// <summary>
+        /// 獲取文檔中所有的連接
+        /// </summary>
+        /// <param name="command">命令</param>
+        /// <returns>連接列表（來源與目標的組件 ID 及參數名稱）</returns>
+        public static object GetConnections(Command command)
+        {
+            object result = null;
+            Exception exception = null;
+            
+            // 在 UI 線程上執行
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                try
+                {
+                    // 獲取 Grasshopper 文檔
+                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                    if (doc == null)
+                    {
+                        throw new InvalidOperationException("No active Grasshopper document");
+                    }
+                    
+                    var connections = new List<object>();
+                    foreach (var obj in doc.Objects)
+                    {
+                        // 與 GetDocumentFingerprint 相同的方式收集輸入參數
+                        IEnumerable<IGH_Param> inputs = null;
+                        if (obj is IGH_Component component)
+                        {
+                            inputs = component.Params.Input;
+                        }
+                        else if (obj is IGH_Param param)
+                        {
+                            inputs = new[] { param };
+                        }
+                        
+                        if (inputs == null)
+                        {
+                            continue;
+                        }
+                        
+                        foreach (var input in inputs)
+                        {
+                            foreach (var source in input.Sources)
+                            {
+                                // 來源參數可能屬於某個組件，以其頂層物件作為來源組件
+                                var sourceObject = source.Attributes?.GetTopLevel?.DocObject ?? source;
+                                
+                                // 參數名稱與 connect_components 的返回值一致（獨立參數物件為其自身名稱）
+                                connections.Add(new Dictionary<string, object>
+                                {
+                                    { "sourceId", sourceObject.InstanceGuid.ToString() },
+                                    { "sourceParam", source.Name },
+                                    { "targetId", obj.InstanceGuid.ToString() },
+                                    { "targetParam", input.Name }
+                                });
+                            }
+                        }
+                    }
+                    
+                    result = connections;
+                }
+                catch (Exception ex)
+                {
+                    exception = ex;
+                    RhinoApp.WriteLine($"Error in GetConnections: {ex.Message}");
+                }
+            }));
+            
+            // 等待 UI 線程操作完成
+            while (result == null && exception == null)
+            {
+                Thread.Sleep(10);
+            }
+            
+            // 如果有異常，拋出
+            if (exception != null)
+            {
+                throw exception;
+            }
+            
+            return result;
+        }
+        
         /// <summary>
         /// 清空文檔
         /// </summary>
@@ -138,7 +410,7 @@ namespace GrasshopperMCP.Commands
                     doc.RemoveObjects(objectsToRemove, false);
                     
                     // 刷新畫布
-                    doc.NewSolution(false);
+                    TransactionCommandHandler.RequestSolution(doc);
                     
                     // 返回操作結果
                     result = new
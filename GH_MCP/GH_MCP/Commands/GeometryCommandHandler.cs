@@ -5,7 +5,12 @@ using Grasshopper.Kernel;
 using Rhino.Geometry;
 using Newtonsoft.Json.Linq;
 using System.Linq;
+using System.Threading;
 using Rhino;
+using Grasshopper.Kernel.Parameters;
+using Grasshopper.Kernel.Types;
+using GH_MCP.Utils;
+using GH_MCP.Commands;
 
 namespace GrasshopperMCP.Commands
 {
@@ -124,5 +129,208 @@ namespace GrasshopperMCP.Commands
                 circumference = circle.Circumference
             };
         }
+        
+        /// <summary>
+        /// 批次創建幾何，並以持久資料存入畫布上的幾何參數
+        /// </summary>
+        /// <param name="command">包含 kind、打包的 points（N×3）、radii 或 counts 的命令</param>
+        /// <returns>幾何參數的 ID 與本次加入的項目範圍</returns>
+        public static object CreateGeometryBulk(Command command)
+        {
+            string kind = command.GetParameter<string>("kind") ?? "point";
+            var pointsData = command.GetParameter<JObject>("points");
+            var radiiData = command.GetParameter<JObject>("radii");
+            var countsData = command.GetParameter<JObject>("counts");
+            int degree = command.Parameters.ContainsKey("degree") ? command.GetParameter<int>("degree") : 3;
+            string targetIdStr = command.GetParameter<string>("targetId");
+            double x = command.GetParameter<double>("x");
+            double y = command.GetParameter<double>("y");
+            // 分塊傳輸時 final 為 false 的區塊不重新計算
+            bool final = !command.Parameters.ContainsKey("final") || command.GetParameter<bool>("final");
+            
+            if (pointsData == null)
+            {
+                throw new ArgumentException("Packed 'points' are required");
+            }
+            
+            // 在 UI 線程之外解碼並建立幾何
+            double[] coordinates = PackedArray.Decode(pointsData, out _);
+            if (coordinates.Length % 3 != 0)
+            {
+                throw new ArgumentException("Points must be an N x 3 array");
+            }
+            var points = new Point3d[coordinates.Length / 3];
+            for (int i = 0; i < points.Length; i++)
+            {
+                points[i] = new Point3d(coordinates[3 * i], coordinates[3 * i + 1], coordinates[3 * i + 2]);
+            }
+            
+            List<IGH_Goo> items;
+            Func<IGH_Param> createParam;
+            switch (kind)
+            {
+                case "point":
+                    items = points.Select(p => (IGH_Goo)new GH_Point(p)).ToList();
+                    createParam = () => new Param_Point();
+                    break;
+                    
+                case "circle":
+                    if (radiiData == null)
+                    {
+                        throw new ArgumentException("Packed 'radii' are required for circles");
+                    }
+                    double[] radii = PackedArray.Decode(radiiData, out _);
+                    if (radii.Length != 1 && radii.Length != points.Length)
+                    {
+                        throw new ArgumentException("Radii must hold one value or one value per center");
+                    }
+                    items = new List<IGH_Goo>(points.Length);
+                    for (int i = 0; i < points.Length; i++)
+                    {
+                        double radius = radii.Length == 1 ? radii[0] : radii[i];
+                        if (radius <= 0)
+                        {
+                            throw new ArgumentException($"Radius must be greater than 0 (item {i})");
+                        }
+                        items.Add(new GH_Circle(new Circle(points[i], radius)));
+                    }
+                    createParam = () => new Param_Circle();
+                    break;
+                    
+                case "curve":
+                    if (countsData == null)
+                    {
+                        throw new ArgumentException("Packed vertex 'counts' are required for curves");
+                    }
+                    double[] counts = PackedArray.Decode(countsData, out _);
+                    if ((int)counts.Sum() != points.Length)
+                    {
+                        throw new ArgumentException("Vertex counts do not add up to the number of points");
+                    }
+                    items = new List<IGH_Goo>(counts.Length);
+                    int start = 0;
+                    for (int i = 0; i < counts.Length; i++)
+                    {
+                        int count = (int)counts[i];
+                        if (count < 2)
+                        {
+                            throw new ArgumentException($"At least 2 points are required to create a curve (item {i})");
+                        }
+                        var vertices = new ArraySegment<Point3d>(points, start, count);
+                        // 與 create_curve 相同：兩點為直線，其餘為內插曲線
+                        Curve curve = count == 2
+                            ? new LineCurve(points[start], points[start + 1])
+                            : Curve.CreateInterpolatedCurve(vertices, degree);
+                        if (curve == null)
+                        {
+                            throw new ArgumentException($"Could not create curve (item {i})");
+                        }
+                        items.Add(new GH_Curve(curve));
+                        start += count;
+                    }
+                    createParam = () => new Param_Curve();
+                    break;
+                    
+                default:
+                    throw new ArgumentException($"Unsupported geometry kind: {kind} (expected point, circle or curve)");
+            }
+            
+            object result = null;
+            Exception exception = null;
+            
+            // 在 UI 線程上執行
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                try
+                {
+                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                    if (doc == null)
+                    {
+                        throw new InvalidOperationException("No active Grasshopper document");
+                    }
+                    
+                    // 找到既有的幾何參數（後續區塊），或在畫布上新增一個
+                    IGH_Param param;
+                    if (!string.IsNullOrEmpty(targetIdStr))
+                    {
+                        Guid targetId;
+                        if (!Guid.TryParse(targetIdStr, out targetId))
+                        {
+                            throw new ArgumentException("Invalid target ID format");
+                        }
+                        param = doc.FindObject(targetId, true) as IGH_Param;
+                        if (param == null)
+                        {
+                            throw new ArgumentException($"Geometry parameter with ID {targetIdStr} not found");
+                        }
+                    }
+                    else
+                    {
+                        param = createParam();
+                        param.CreateAttributes();
+                        param.Attributes.Pivot = new System.Drawing.PointF((float)x, (float)y);
+                        doc.AddObject(param, false);
+                        TransactionCommandHandler.TrackAddedObject(param);
+                    }
+                    
+                    // offset 為本次加入的第一個項目在參數資料中的索引
+                    int offset;
+                    if (param is Param_Point pointParam)
+                    {
+                        offset = pointParam.PersistentData.DataCount;
+                        pointParam.PersistentData.AppendRange(items.Cast<GH_Point>());
+                    }
+                    else if (param is Param_Circle circleParam)
+                    {
+                        offset = circleParam.PersistentData.DataCount;
+                        circleParam.PersistentData.AppendRange(items.Cast<GH_Circle>());
+                    }
+                    else if (param is Param_Curve curveParam)
+                    {
+                        offset = curveParam.PersistentData.DataCount;
+                        curveParam.PersistentData.AppendRange(items.Cast<GH_Curve>());
+                    }
+                    else
+                    {
+                        throw new ArgumentException($"Cannot add {kind} geometry to parameter type {param.GetType().Name}");
+                    }
+                    
+                    // 標記為過期，之後的 NewSolution 才會重新計算此參數及其下游
+                    param.ExpireSolution(false);
+                    
+                    if (final)
+                    {
+                        TransactionCommandHandler.RequestSolution(doc);
+                    }
+                    
+                    result = new
+                    {
+                        id = param.InstanceGuid.ToString(),
+                        kind = kind,
+                        start = offset,
+                        count = items.Count
+                    };
+                }
+                catch (Exception ex)
+                {
+                    exception = ex;
+                    RhinoApp.WriteLine($"Error in CreateGeometryBulk: {ex.Message}");
+                }
+            }));
+            
+            // 等待 UI 線程操作完成
+            while (result == null && exception == null)
+            {
+                Thread.Sleep(10);
+            }
+            
+            // 如果有異常，拋出
+            if (exception != null)
+            {
+                throw exception;
+            }
+            
+            return result;
+        }
     }
 }
@@ -34,6 +34,12 @@ namespace GH_MCP.Commands
             // 註冊意圖命令
             RegisterIntentCommands();
             
+            // 註冊批次命令
+            RegisterBatchCommands();
+            
+            // 註冊交易命令
+            RegisterTransactionCommands();
+            
             RhinoApp.WriteLine("GH_MCP: Command registry initialized.");
         }
 
@@ -50,6 +56,9 @@ namespace GH_MCP.Commands
             
             // 創建圓
             RegisterCommand("create_circle", GeometryCommandHandler.CreateCircle);
+            
+            // 批次創建幾何
+            RegisterCommand("create_geometry_bulk", GeometryCommandHandler.CreateGeometryBulk);
         }
 
         /// <summary>
@@ -68,6 +77,9 @@ namespace GH_MCP.Commands
             
             // 獲取組件信息
             RegisterCommand("get_component_info", ComponentCommandHandler.GetComponentInfo);
+            
+            // 設置組件位置
+            RegisterCommand("set_component_position", ComponentCommandHandler.SetComponentPosition);
         }
 
         /// <summary>
@@ -78,6 +90,15 @@ namespace GH_MCP.Commands
             // 獲取文檔信息
             RegisterCommand("get_document_info", DocumentCommandHandler.GetDocumentInfo);
             
+            // 獲取文檔指紋
+            RegisterCommand("get_document_fingerprint", DocumentCommandHandler.GetDocumentFingerprint);
+            
+            // 獲取所有組件
+            RegisterCommand("get_all_components", DocumentCommandHandler.GetAllComponents);
+            
+            // 獲取所有連接
+            RegisterCommand("get_connections", DocumentCommandHandler.GetConnections);
+            
             // 清空文檔
             RegisterCommand("clear_document", DocumentCommandHandler.ClearDocument);
             
@@ -102,6 +123,33 @@ namespace GH_MCP.Commands
             RhinoApp.WriteLine("GH_MCP: Intent commands registered.");
         }
 
+        /// <summary>
+        /// 註冊批次命令
+        /// </summary>
+        private static void RegisterBatchCommands()
+        {
+            // 在一次請求中執行多個命令
+            RegisterCommand("batch", BatchCommandHandler.ExecuteBatch);
+        }
+
+        /// <summary>
+        /// 註冊交易命令
+        /// </summary>
+        private static void RegisterTransactionCommands()
+        {
+            // 開啟交易，延後重新計算
+            RegisterCommand("begin_transaction", TransactionCommandHandler.BeginTransaction);
+            
+            // 提交交易
+            RegisterCommand("commit_transaction", TransactionCommandHandler.CommitTransaction);
+            
+            // 回滾交易
+            RegisterCommand("rollback_transaction", TransactionCommandHandler.RollbackTransaction);
+            
+            // 獲取交易狀態
+            RegisterCommand("get_transaction_status", TransactionCommandHandler.GetTransactionStatus);
+        }
+
         /// <summary>
         /// 註冊命令處理器
         /// </summary>
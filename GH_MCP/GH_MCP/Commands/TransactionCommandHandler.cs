@@ -0,0 +1,303 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Threading;
+using GrasshopperMCP.Models;
+using Grasshopper;
+using Grasshopper.Kernel;
+using Rhino;
+
+namespace GH_MCP.Commands
+{
+    /// <summary>
+    /// 處理交易命令的處理器：交易期間延後重新計算，提交時只計算一次，回滾時移除交易中新增的元件
+    /// </summary>
+    public static class TransactionCommandHandler
+    {
+        /// <summary>
+        /// 未指定 timeoutSeconds 時，交易在此秒數後自動回滾
+        /// </summary>
+        public const double DefaultTimeoutSeconds = 300;
+
+        private static readonly object SyncRoot = new object();
+
+        // 目前開啟的交易 ID，null 表示沒有交易
+        private static string activeTransactionId;
+        private static DateTime startedUtc;
+        private static DateTime expiresUtc;
+
+        // 逾時後回滾交易，避免用戶端斷線時插件一直停留在交易中
+        private static System.Threading.Timer expiryTimer;
+
+        // 交易中新增的文檔物件，回滾時移除
+        private static readonly List<Guid> addedObjects = new List<Guid>();
+
+        // 交易中被延後的重新計算次數
+        private static int deferredSolutions;
+
+        /// <summary>
+        /// 請求重新計算；交易進行中時延後到提交，否則立即計算（須在 UI 線程上呼叫）
+        /// </summary>
+        /// <param name="doc">Grasshopper 文檔</param>
+        public static void RequestSolution(GH_Document doc)
+        {
+            lock (SyncRoot)
+            {
+                if (activeTransactionId != null)
+                {
+                    deferredSolutions++;
+                    return;
+                }
+            }
+            doc.NewSolution(false);
+        }
+
+        /// <summary>
+        /// 記錄交易中新增的文檔物件
+        /// </summary>
+        /// <param name="obj">新增的物件</param>
+        public static void TrackAddedObject(IGH_DocumentObject obj)
+        {
+            lock (SyncRoot)
+            {
+                if (activeTransactionId != null)
+                {
+                    addedObjects.Add(obj.InstanceGuid);
+                }
+            }
+        }
+
+        /// <summary>
+        /// 開啟交易，逾時時間為 DefaultTimeoutSeconds
+        /// </summary>
+        /// <param name="transactionId">新交易的 ID；已有交易時為 null</param>
+        /// <returns>是否成功開啟</returns>
+        public static bool TryBegin(out string transactionId)
+        {
+            return TryBegin(DefaultTimeoutSeconds, out transactionId);
+        }
+
+        /// <summary>
+        /// 開啟交易
+        /// </summary>
+        /// <param name="timeoutSeconds">交易未結束時自動回滾的秒數</param>
+        /// <param name="transactionId">新交易的 ID；已有交易時為 null</param>
+        /// <returns>是否成功開啟</returns>
+        public static bool TryBegin(double timeoutSeconds, out string transactionId)
+        {
+            if (timeoutSeconds <= 0)
+            {
+                throw new ArgumentException("timeoutSeconds must be positive");
+            }
+
+            lock (SyncRoot)
+            {
+                if (activeTransactionId != null)
+                {
+                    transactionId = null;
+                    return false;
+                }
+                activeTransactionId = Guid.NewGuid().ToString("N").Substring(0, 12);
+                startedUtc = DateTime.UtcNow;
+                expiresUtc = startedUtc.AddSeconds(timeoutSeconds);
+                addedObjects.Clear();
+                deferredSolutions = 0;
+                transactionId = activeTransactionId;
+
+                string id = activeTransactionId;
+                expiryTimer = new System.Threading.Timer(_ => Expire(id), null, TimeSpan.FromSeconds(timeoutSeconds), Timeout.InfiniteTimeSpan);
+                return true;
+            }
+        }
+
+        /// <summary>
+        /// 逾時回滾交易（在計時器線程上執行）
+        /// </summary>
+        /// <param name="transactionId">逾時的交易 ID</param>
+        private static void Expire(string transactionId)
+        {
+            try
+            {
+                RhinoApp.WriteLine($"GH_MCP: Transaction {transactionId} timed out, rolling back");
+                Finish(transactionId, true);
+            }
+            catch (InvalidOperationException)
+            {
+                // 交易已經提交或回滾
+            }
+            catch (Exception ex)
+            {
+                RhinoApp.WriteLine($"Error in ExpireTransaction: {ex.Message}");
+            }
+        }
+
+        /// <summary>
+        /// 結束交易：提交時執行一次被延後的重新計算，回滾時先移除交易中新增的元件
+        /// </summary>
+        /// <param name="transactionId">要結束的交易 ID，null 表示目前的交易</param>
+        /// <param name="rollback">是否回滾</param>
+        /// <returns>交易結果</returns>
+        public static object Finish(string transactionId, bool rollback)
+        {
+            string id;
+            List<Guid> added;
+            int deferred;
+            double seconds;
+
+            lock (SyncRoot)
+            {
+                if (activeTransactionId == null)
+                {
+                    throw new InvalidOperationException("No transaction is open");
+                }
+                if (!string.IsNullOrEmpty(transactionId) && transactionId != activeTransactionId)
+                {
+                    throw new InvalidOperationException($"Transaction {transactionId} is not open (open transaction: {activeTransactionId})");
+                }
+                id = activeTransactionId;
+                added = addedObjects.ToList();
+                deferred = deferredSolutions;
+                seconds = (DateTime.UtcNow - startedUtc).TotalSeconds;
+                activeTransactionId = null;
+                addedObjects.Clear();
+                deferredSolutions = 0;
+                expiryTimer?.Dispose();
+                expiryTimer = null;
+            }
+
+            object result = null;
+            Exception exception = null;
+
+            // 在 UI 線程上執行
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                try
+                {
+                    var doc = Instances.ActiveCanvas?.Document;
+                    if (doc == null)
+                    {
+                        throw new InvalidOperationException("No active Grasshopper document");
+                    }
+
+                    int removed = 0;
+                    if (rollback)
+                    {
+                        // 已被刪除的物件（例如清空文檔）會被略過
+                        var objects = added
+                            .Select(guid => doc.FindObject(guid, true))
+                            .Where(obj => obj != null)
+                            .ToList();
+                        doc.RemoveObjects(objects, false);
+                        removed = objects.Count;
+                    }
+
+                    bool solved = deferred > 0 || removed > 0;
+                    if (solved)
+                    {
+                        doc.NewSolution(false);
+                    }
+
+                    result = new
+                    {
+                        transactionId = id,
+                        committed = !rollback,
+                        rolledBack = rollback,
+                        addedComponents = added.Count,
+                        removedComponents = removed,
+                        deferredSolutions = deferred,
+                        solutions = solved ? 1 : 0,
+                        seconds = seconds
+                    };
+                }
+                catch (Exception ex)
+                {
+                    exception = ex;
+                    RhinoApp.WriteLine($"Error in FinishTransaction: {ex.Message}");
+                }
+            }));
+
+            // 等待 UI 線程操作完成
+            while (result == null && exception == null)
+            {
+                Thread.Sleep(10);
+            }
+
+            // 如果有異常，拋出
+            if (exception != null)
+            {
+                throw exception;
+            }
+
+            RhinoApp.WriteLine($"GH_MCP: Transaction {id} {(rollback ? "rolled back" : "committed")} ({deferred} deferred solutions)");
+            return result;
+        }
+
+        /// <summary>
+        /// 開啟交易，之後的命令不再各自重新計算
+        /// </summary>
+        /// <param name="command">可包含 timeoutSeconds 的命令</param>
+        /// <returns>交易 ID 與逾時秒數</returns>
+        public static object BeginTransaction(Command command)
+        {
+            double timeoutSeconds = command.Parameters.ContainsKey("timeoutSeconds")
+                ? command.GetParameter<double>("timeoutSeconds")
+                : DefaultTimeoutSeconds;
+
+            if (!TryBegin(timeoutSeconds, out string transactionId))
+            {
+                lock (SyncRoot)
+                {
+                    throw new InvalidOperationException($"Transaction {activeTransactionId} is already open");
+                }
+            }
+
+            RhinoApp.WriteLine($"GH_MCP: Transaction {transactionId} started (rolled back after {timeoutSeconds} s)");
+            return new
+            {
+                transactionId = transactionId,
+                timeoutSeconds = timeoutSeconds
+            };
+        }
+
+        /// <summary>
+        /// 提交交易並執行一次重新計算
+        /// </summary>
+        /// <param name="command">可包含 transactionId 的命令</param>
+        /// <returns>交易結果</returns>
+        public static object CommitTransaction(Command command)
+        {
+            return Finish(command.GetParameter<string>("transactionId"), false);
+        }
+
+        /// <summary>
+        /// 回滾交易，移除交易中新增的元件
+        /// </summary>
+        /// <param name="command">可包含 transactionId 的命令</param>
+        /// <returns>交易結果</returns>
+        public static object RollbackTransaction(Command command)
+        {
+            return Finish(command.GetParameter<string>("transactionId"), true);
+        }
+
+        /// <summary>
+        /// 獲取目前交易的狀態
+        /// </summary>
+        /// <param name="command">命令</param>
+        /// <returns>交易狀態</returns>
+        public static object GetTransactionStatus(Command command)
+        {
+            lock (SyncRoot)
+            {
+                return new
+                {
+                    active = activeTransactionId != null,
+                    transactionId = activeTransactionId,
+                    addedComponents = addedObjects.Count,
+                    deferredSolutions = deferredSolutions,
+                    seconds = activeTransactionId != null ? (DateTime.UtcNow - startedUtc).TotalSeconds : 0.0,
+                    expiresInSeconds = activeTransactionId != null ? Math.Max(0.0, (expiresUtc - DateTime.UtcNow).TotalSeconds) : 0.0
+                };
+            }
+        }
+    }
+}
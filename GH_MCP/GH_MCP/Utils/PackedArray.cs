@@ -0,0 +1,91 @@
+using System;
+using System.Globalization;
+using Newtonsoft.Json.Linq;
+
+namespace GH_MCP.Utils
+{
+    /// <summary>
+    /// 解碼 Python 端以 base64 打包的小端序 float64 / int32 陣列
+    /// </summary>
+    public static class PackedArray
+    {
+        /// <summary>
+        /// 解碼打包的陣列
+        /// </summary>
+        /// <param name="packed">包含 dtype、shape 和 data 的物件</param>
+        /// <param name="integral">資料是否為 int32</param>
+        /// <returns>展平後的數值</returns>
+        public static double[] Decode(JObject packed, out bool integral)
+        {
+            string dtype = packed["dtype"]?.ToString() ?? "float64";
+            string data = packed["data"]?.ToString();
+
+            if (data == null)
+            {
+                throw new ArgumentException("Packed value requires 'data'");
+            }
+
+            byte[] bytes = Convert.FromBase64String(data);
+
+            // 打包格式固定為小端序，大端序平台需要反轉每個元素
+            if (dtype == "float64")
+            {
+                integral = false;
+                if (bytes.Length % 8 != 0)
+                {
+                    throw new ArgumentException("Packed float64 data length is not a multiple of 8");
+                }
+                var values = new double[bytes.Length / 8];
+                if (BitConverter.IsLittleEndian)
+                {
+                    Buffer.BlockCopy(bytes, 0, values, 0, bytes.Length);
+                }
+                else
+                {
+                    for (int i = 0; i < values.Length; i++)
+                    {
+                        Array.Reverse(bytes, i * 8, 8);
+                        values[i] = BitConverter.ToDouble(bytes, i * 8);
+                    }
+                }
+                return values;
+            }
+
+            if (dtype == "int32")
+            {
+                integral = true;
+                if (bytes.Length % 4 != 0)
+                {
+                    throw new ArgumentException("Packed int32 data length is not a multiple of 4");
+                }
+                var values = new double[bytes.Length / 4];
+                for (int i = 0; i < values.Length; i++)
+                {
+                    if (!BitConverter.IsLittleEndian)
+                    {
+                        Array.Reverse(bytes, i * 4, 4);
+                    }
+                    values[i] = BitConverter.ToInt32(bytes, i * 4);
+                }
+                return values;
+            }
+
+            throw new ArgumentException($"Unsupported packed dtype: {dtype}");
+        }
+
+        /// <summary>
+        /// 將數值格式化為面板文字，每行一個值
+        /// </summary>
+        public static string ToLines(double[] values, bool integral)
+        {
+            var lines = new string[values.Length];
+            for (int i = 0; i < values.Length; i++)
+            {
+                lines[i] = integral
+                    ? ((long)values[i]).ToString(CultureInfo.InvariantCulture)
+                    : values[i].ToString("R", CultureInfo.InvariantCulture);
+            }
+            return string.Join("\n", lines);
+        }
+    }
+}
@@ -0,0 +1,65 @@
+"""
+Throughput of create_geometry_bulk against one create_point request per item
+
+Runs the bridge against the bundled emulator with a fixed time per plug-in
+command and creates N points, N circles and N / 4 curves in bulk, then N
+points (capped by --per-item) with one create_point request each.
+
+    python benchmarks/geometry_bulk.py --items 20000 --latency-ms 1
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.emulator import EmulatorServer
+
+
+def report(name, items, elapsed, requests):
+    print(f"  {name:22} items={items:7}  requests={requests:6}  {elapsed * 1000:8.1f} ms  {items / elapsed:10.0f} items/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--per-item", type=int, default=1000, help="Points created with per-item create_point requests")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Emulated Grasshopper time per command")
+    args = parser.parse_args()
+
+    emulator = EmulatorServer("localhost", 0, latency=args.latency_ms / 1000)
+    emulator.start_background()
+    bridge.GRASSHOPPER_PORT = emulator.server_address[1]
+
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-100, 100, size=(args.items, 3))
+    curves = [rng.uniform(-100, 100, size=(4, 3)) for _ in range(args.items // 4)]
+
+    print(f"emulated latency: {args.latency_ms} ms per command")
+    with contextlib.redirect_stderr(io.StringIO()):
+        for name, kwargs, items in (
+            ("bulk points", {"kind": "point", "points": points}, args.items),
+            ("bulk circles", {"kind": "circle", "points": points, "radii": 1.5}, args.items),
+            ("bulk curves", {"kind": "curve", "curves": curves}, len(curves)),
+        ):
+            started = time.perf_counter()
+            response = bridge.create_geometry(**kwargs)
+            elapsed = time.perf_counter() - started
+            if not response["success"]:
+                raise SystemExit(f"{name}: {response['error']}")
+            report(name, items, elapsed, response["result"]["requests"])
+
+        count = min(args.per_item, args.items)
+        started = time.perf_counter()
+        for x, y, z in points[:count].tolist():
+            response = bridge.send_to_grasshopper("create_point", {"x": x, "y": y, "z": z})
+            if not response["success"]:
+                raise SystemExit(f"create_point: {response['error']}")
+        report("per-item create_point", count, time.perf_counter() - started, count)
+
+
+if __name__ == "__main__":
+    main()
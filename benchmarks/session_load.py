@@ -0,0 +1,124 @@
+"""
+Load test of one bridge serving many MCP sessions over streamable HTTP
+
+Starts the bundled emulator and the bridge's streamable-HTTP transport in this
+process, then runs N concurrent client sessions. Each session repeatedly adds
+a component, reads grasshopper://status and the document info, and once
+takes the document lock to add a group of components. It then checks that no
+other session's component landed inside the group.
+
+    python benchmarks/session_load.py --sessions 40 --calls 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import threading
+import time
+
+import uvicorn
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.emulator import EmulatorServer
+from grasshopper_mcp.recorder import percentile
+from grasshopper_mcp.sessions import SessionRunner
+
+GROUP_SIZE = 3
+
+
+def start_bridge(port):
+    bridge.session_runner = SessionRunner(bridge.server, bridge.document_lock, bridge.is_read_only_tool)
+    bridge.session_runner.install()
+    config = uvicorn.Config(bridge.server.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_session(url, index, calls, latencies, errors):
+    async def timed(name, call):
+        started = time.perf_counter()
+        try:
+            result = await call
+        except Exception as e:
+            errors.append(f"{name}: {str(e)}")
+            return None
+        latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if getattr(result, "isError", False):
+            errors.append(f"{name}: {result.content[0].text if result.content else 'error'}")
+        return result
+
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for i in range(calls):
+                await timed("add_component", session.call_tool(
+                    "add_component", {"component_type": "Number Slider", "x": i, "y": index}))
+                await timed("status", session.read_resource("grasshopper://status"))
+                await timed("get_document_info", session.call_tool("get_document_info", {}))
+
+            # A group of edits under the document lock must not interleave with other sessions' edits
+            locked = await timed("lock_document", session.call_tool("lock_document", {"lease_seconds": 120}))
+            if locked is None or not json.loads(locked.content[0].text).get("success"):
+                errors.append(f"session {index}: could not lock the document")
+                return
+            for i in range(GROUP_SIZE):
+                await timed("add_component", session.call_tool(
+                    "add_component", {"component_type": "Panel", "x": i, "y": index}))
+            listing = await timed("get_all_components", session.call_tool("get_all_components", {}))
+            await timed("unlock_document", session.call_tool("unlock_document", {}))
+            if listing is not None:
+                components = json.loads(listing.content[0].text)["result"]
+                if [component["y"] for component in components[-GROUP_SIZE:]] != [index] * GROUP_SIZE:
+                    errors.append(f"session {index}: locked edits were interleaved")
+
+
+async def run(url, sessions, calls):
+    latencies, errors = {}, []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(url, index, calls, latencies, errors) for index in range(sessions)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=5, help="add/status/info rounds per session")
+    parser.add_argument("--latency-ms", type=float, default=0.5, help="Emulated Grasshopper time per command")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    emulator = EmulatorServer("localhost", 0, latency=args.latency_ms / 1000)
+    emulator.start_background()
+    bridge.GRASSHOPPER_PORT = emulator.server_address[1]
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        start_bridge(args.port)
+        elapsed, latencies, errors = asyncio.run(run(f"http://127.0.0.1:{args.port}/mcp", args.sessions, args.calls))
+        status = bridge.session_runner.status()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"sessions: {args.sessions}, calls: {total} in {elapsed:.2f} s ({total / elapsed:.0f}/s)")
+    for name, values in sorted(latencies.items()):
+        values = sorted(values)
+        print(f"  {name:18} n={len(values):5}  p50={percentile(values, 0.5) * 1000:7.1f} ms  "
+              f"p99={percentile(values, 0.99) * 1000:7.1f} ms")
+    expected = args.sessions * (args.calls + GROUP_SIZE)
+    print(f"components: {len(emulator.document.components)} (expected {expected})")
+    print(f"grasshopper commands: {sum(emulator.document.command_counts.values())} {emulator.document.command_counts}")
+    print(f"sessions seen: {status['sessionsSeen']}, document lock: {status['documentLock']}")
+    print(f"errors: {len(errors)}")
+    for error in errors[:10]:
+        print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
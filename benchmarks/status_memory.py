@@ -0,0 +1,83 @@
+"""
+Memory and time of a grasshopper://status read on a large document
+
+Runs the bridge against the bundled emulator filled with N components (a
+fifth of them sliders) wired in a chain, and reports the time, traced peak
+memory and size of the status payload, including its serialization for MCP.
+
+    python benchmarks/status_memory.py --components 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+import pydantic_core
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.emulator import EmulatorServer
+from grasshopper_mcp.models import DocumentModel
+
+
+def populate(document, count):
+    previous = None
+    for i in range(count):
+        component_type = "Number Slider" if i % 5 == 0 else "Addition"
+        component = document._create_component({"type": component_type, "x": (i % 100) * 250, "y": (i // 100) * 120})
+        component_id = component["id"]
+        if component_type == "Number Slider":
+            component["value"] = "5"
+        elif previous is not None:
+            document.connect_components({"sourceId": previous, "targetId": component_id, "targetParam": "A"})
+        previous = component_id
+
+
+def retained(build):
+    """Memory still held by the object build() returns"""
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--components", type=int, default=10000)
+    args = parser.parse_args()
+
+    emulator = EmulatorServer("localhost", 0)
+    emulator.start_background()
+    populate(emulator.document, args.components)
+    bridge.GRASSHOPPER_PORT = emulator.server_address[1]
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        tracemalloc.start()
+        started = time.perf_counter()
+        status = bridge.get_grasshopper_status()
+        # What FastMCP does with a resource's return value
+        payload = status if isinstance(status, str) else pydantic_core.to_json(status, fallback=str, indent=2).decode()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"components: {args.components}, connections: {len(emulator.document.connections)}")
+    print(f"status read: {elapsed:.2f} s, peak traced memory: {peak / 2**20:.1f} MiB, payload: {len(payload) / 2**20:.1f} MiB")
+    print(f"requests: {sum(emulator.document.command_counts.values())} {emulator.document.command_counts}")
+
+    # Held in memory: wire dicts as parsed from JSON vs the slotted models built from them
+    with contextlib.redirect_stderr(io.StringIO()):
+        components = bridge.send_to_grasshopper("get_all_components")["result"]
+        connections = bridge.send_to_grasshopper("get_connections")["result"]
+    text = json.dumps([components, connections])
+    wire = retained(lambda: json.loads(text))
+    model = retained(lambda: DocumentModel.from_wire(*json.loads(text)))
+    print(f"retained: wire dicts {wire / 2**20:.1f} MiB, DocumentModel {model / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
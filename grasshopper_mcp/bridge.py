@@ -1,13 +1,48 @@
+import argparse
+import asyncio
 import socket
 import json
 import os
 import sys
+import tempfile
+import threading
+import time
 import traceback
-from typing import Dict, Any, Optional, List
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
 
 # Use MCP server
 from mcp.server.fastmcp import FastMCP
 
+from grasshopper_mcp.mirror import DocumentMirror, DEFAULT_MIRROR_TTL
+from grasshopper_mcp.layout import layered_layout, DEFAULT_X_SPACING, DEFAULT_Y_SPACING
+from grasshopper_mcp.graph import ComponentGraph
+from grasshopper_mcp.models import DocumentModel, component_type_name
+from grasshopper_mcp.snapshot import SnapshotStore, take_snapshot, diff_snapshots, plan_patch, remap_ids, is_empty_diff
+from grasshopper_mcp.templates import (
+    TemplateStore, capture_template as build_template, plan_instances, default_template_directory, PLACEHOLDER_PREFIX
+)
+from grasshopper_mcp.geometry import geometry_chunks, DEFAULT_GEOMETRY_CHUNK
+from grasshopper_mcp.packing import as_array, pack_array, iter_chunks, DEFAULT_CHUNK_ITEMS
+from grasshopper_mcp.recorder import TrafficRecorder, CommandTimings
+from grasshopper_mcp import sweep
+from grasshopper_mcp.shared_cache import SharedCache
+from grasshopper_mcp.sessions import (
+    DocumentLock, DocumentLockTimeout, SessionRunner, current_session, DEFAULT_LEASE, DEFAULT_LOCK_TIMEOUT,
+    DEFAULT_SESSION_WORKERS
+)
+from grasshopper_mcp.profiling import ToolProfiler, PROFILE_MODES, DEFAULT_MAX_BYTES as DEFAULT_PROFILE_MAX_BYTES
+from grasshopper_mcp.jobs import (
+    JobManager, JobManagerBusy, FINISHED_STATES, SUCCEEDED, CANCELLED, DEFAULT_WORKERS, DEFAULT_MAX_PENDING,
+    DEFAULT_RETENTION
+)
+from grasshopper_mcp.scheduler import (
+    CommandScheduler, SchedulerBusy, INTERACTIVE, BULK, BACKGROUND, DEFAULT_WINDOW, DEFAULT_MAX_QUEUE
+)
+from grasshopper_mcp.watcher import DocumentWatcher, ResourceSubscriptions, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL
+
 # Set Grasshopper MCP connection parameters
 GRASSHOPPER_HOST = "localhost"
 GRASSHOPPER_PORT = 8080  # Default port, can be modified as needed
@@ -15,10 +50,90 @@ GRASSHOPPER_PORT = 8080  # Default port, can be modified as needed
 # Create MCP server
 server = FastMCP("Grasshopper Bridge")
 
-def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """Send commands to Grasshopper MCP"""
+# Local mirror of component input ports and wires, used to assign input ports without round trips
+document_mirror = DocumentMirror(ttl=float(os.environ.get("GRASSHOPPER_MCP_MIRROR_TTL", DEFAULT_MIRROR_TTL)))
+
+# Traffic recorder, enabled with --record or GRASSHOPPER_MCP_RECORD
+traffic_recorder: Optional[TrafficRecorder] = None
+
+# Per-call profiler of tools and resources, set up by main() with --profile / GRASSHOPPER_MCP_PROFILE
+tool_profiler: Optional[ToolProfiler] = None
+
+# Grasshopper runs commands one at a time on the UI thread, so only a few are sent at once
+command_scheduler = CommandScheduler(
+    window=int(os.environ.get("GRASSHOPPER_MCP_WINDOW", DEFAULT_WINDOW)),
+    max_queue=int(os.environ.get("GRASSHOPPER_MCP_MAX_QUEUE", DEFAULT_MAX_QUEUE))
+)
+
+# Background jobs for long-running tools (load_document, save_document, create_pattern with background=True)
+job_manager = JobManager(
+    workers=int(os.environ.get("GRASSHOPPER_MCP_JOB_WORKERS", DEFAULT_WORKERS)),
+    max_pending=int(os.environ.get("GRASSHOPPER_MCP_JOB_MAX_PENDING", DEFAULT_MAX_PENDING)),
+    retention=float(os.environ.get("GRASSHOPPER_MCP_JOB_RETENTION", DEFAULT_RETENTION))
+)
+
+# Write lock on the document, owned by one MCP session at a time (see sessions.py)
+document_lock = DocumentLock()
+
+# Runs tools off the event loop when serving several sessions (--transport sse / streamable-http)
+session_runner: Optional[SessionRunner] = None
+
+# Tools that never change the document, besides get_*; every other tool takes the document lock
+READ_ONLY_TOOLS = {
+    "graph_query", "snapshot", "diff_snapshots", "search_components", "validate_connection",
+    "capture_template", "list_templates",
+    "job_status", "job_result", "cancel_job", "unlock_document"
+}
+
+def is_read_only_tool(name: str) -> bool:
+    return name.startswith("get_") or name in READ_ONLY_TOOLS
+
+def command_priority(command_type: str) -> int:
+    """Default priority class: reads are interactive, everything that changes the document is bulk"""
+    if command_type.startswith(("get_", "search_", "validate_")):
+        return INTERACTIVE
+    return BULK
+
+# Per-thread CommandTimings collector, set by track_commands()
+_command_timings = threading.local()
+
+@contextmanager
+def track_commands():
+    """Collect queue and upstream time of every command the current thread sends"""
+    previous = getattr(_command_timings, "current", None)
+    timings = _command_timings.current = CommandTimings()
+    try:
+        yield timings
+    finally:
+        _command_timings.current = previous
+
+def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = None,
+                        priority: Optional[int] = None, endpoint: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
+    """
+    Send commands to Grasshopper MCP
+    
+    Args:
+        command_type: Plug-in command type
+        params: Command parameters
+        priority: Scheduler priority class (INTERACTIVE, BULK or BACKGROUND); inferred from the command type by default
+        endpoint: (host, port) to send to; defaults to GRASSHOPPER_HOST / GRASSHOPPER_PORT
+    
+    Returns:
+        The plug-in's response, or {"success": False, "busy": True, ...} when the command queue is full
+    """
     if params is None:
         params = {}
+    if endpoint is None:
+        endpoint = (GRASSHOPPER_HOST, GRASSHOPPER_PORT)
+    if priority is None:
+        priority = command_priority(command_type)
+    
+    requested = time.perf_counter()
+    try:
+        command_scheduler.acquire(endpoint, priority)
+    except SchedulerBusy as e:
+        print(f"Rejected command {command_type}: {str(e)}", file=sys.stderr)
+        return {"success": False, "busy": True, "error": str(e)}
     
     # Create command
     command = {
@@ -26,22 +141,29 @@ def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = No
         "parameters": params
     }
     
+    started = time.perf_counter()
+    connected = started
+    request_bytes = 0
+    response_data = bytearray()
+    response = None
     try:
         print(f"Sending command to Grasshopper: {command_type} with params: {params}", file=sys.stderr)
         
         # Connect to Grasshopper MCP
         client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client.connect((GRASSHOPPER_HOST, GRASSHOPPER_PORT))
+        client.connect(endpoint)
+        connected = time.perf_counter()
         
         # Send command
         command_json = json.dumps(command)
-        client.sendall((command_json + "\n").encode("utf-8"))
+        payload = (command_json + "\n").encode("utf-8")
+        request_bytes = len(payload)
+        client.sendall(payload)
         print(f"Command sent: {command_json}", file=sys.stderr)
         
         # Receive response
-        response_data = b""
         while True:
-            chunk = client.recv(4096)
+            chunk = client.recv(65536)
             if not chunk:
                 break
             response_data += chunk
@@ -55,29 +177,212 @@ def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = No
         # Parse JSON response
         response = json.loads(response_str)
         client.close()
+        
+        # The plug-in returns its payload as "data"; the bridge reads it as "result"
+        if isinstance(response, dict) and "result" not in response and "data" in response:
+            response["result"] = response.pop("data")
+        # Status subscribers hear about the bridge's own edits without waiting for the next poll
+        if isinstance(response, dict) and response.get("success") and command_priority(command_type) != INTERACTIVE:
+            document_watcher.poke()
         return response
     except Exception as e:
         print(f"Error communicating with Grasshopper: {str(e)}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
-        return {
+        response = {
             "success": False,
             "error": f"Error communicating with Grasshopper: {str(e)}"
         }
+        return response
+    finally:
+        command_scheduler.release(endpoint)
+        timings = getattr(_command_timings, "current", None)
+        if timings is not None:
+            timings.add(started - requested, time.perf_counter() - started)
+        if traffic_recorder is not None:
+            traffic_recorder.record(
+                command_type, params, started, request_bytes, len(response_data),
+                connected - started, time.perf_counter() - started,
+                bool(isinstance(response, dict) and response.get("success"))
+            )
 
-# Register MCP tools
-@server.tool("add_component")
-def add_component(component_type: str, x: float, y: float):
+# Whether the plug-in understands the "batch" command; None until the first batch is sent
+_batch_supported: Optional[bool] = None
+
+def send_batch_to_grasshopper(commands: List[Dict[str, Any]], stop_on_error: bool = False,
+                              priority: int = BULK, endpoint: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
     """
-    Add a component to the Grasshopper canvas
+    Send several commands to Grasshopper MCP in a single request
     
     Args:
-        component_type: Component type (point, curve, circle, line, panel, slider)
-        x: X coordinate on the canvas
-        y: Y coordinate on the canvas
+        commands: List of {"type": ..., "parameters": {...}} commands, executed in order
+        stop_on_error: Stop executing the remaining commands after the first failure
+        priority: Scheduler priority class for the request
+        endpoint: (host, port) to send to; defaults to GRASSHOPPER_HOST / GRASSHOPPER_PORT
     
     Returns:
-        Result of adding the component
+        One response per executed command, in order
+    """
+    global _batch_supported
+    if not commands:
+        return []
+    
+    if _batch_supported is not False:
+        response = send_to_grasshopper("batch", {"commands": commands, "stopOnError": stop_on_error}, priority=priority, endpoint=endpoint)
+        payload = response.get("result") if response else None
+        if response and response.get("success") and isinstance(payload, dict) and isinstance(payload.get("results"), list):
+            _batch_supported = True
+            # Normalize plug-in responses ("data") to the bridge's "result" key
+            return [
+                {"success": item.get("success", False), "result": item.get("result", item.get("data")), "error": item.get("error")}
+                for item in payload["results"]
+            ]
+        if response and "No handler registered for command type 'batch'" in str(response.get("error", "")):
+            print("Grasshopper plug-in does not support batch commands, sending commands one by one", file=sys.stderr)
+            _batch_supported = False
+        else:
+            error = response.get("error") if response else None
+            return [{"success": False, "error": error or "Batch request failed"} for _ in commands]
+    
+    # Older plug-ins: fall back to one request per command
+    results = []
+    for command in commands:
+        result = send_to_grasshopper(command["type"], command.get("parameters", {}), priority=priority, endpoint=endpoint)
+        results.append(result)
+        if stop_on_error and not (result and result.get("success")):
+            break
+    return results
+
+# Document snapshots taken by the snapshot tool, persisted when GRASSHOPPER_MCP_SNAPSHOT_DIR is set
+snapshot_store = SnapshotStore(os.environ.get("GRASSHOPPER_MCP_SNAPSHOT_DIR"))
+
+# Subgraph templates from capture_template, persisted in GRASSHOPPER_MCP_TEMPLATE_DIR (default ~/.grasshopper-mcp/templates)
+template_store = TemplateStore(default_template_directory())
+
+# Whether the plug-in understands "get_document_fingerprint"; None until first tried
+_fingerprint_supported: Optional[bool] = None
+
+def _fingerprint_of(response: Optional[Dict[str, Any]]) -> Optional[str]:
+    payload = response.get("result") if response else None
+    if response and response.get("success") and isinstance(payload, dict) and "hash" in payload:
+        return f"{payload.get('componentCount')}:{payload.get('connectionCount')}:{payload['hash']}"
+    return None
+
+def document_fingerprint(priority: int = INTERACTIVE) -> Optional[str]:
+    """
+    Cheap fingerprint of the document: "<component count>:<connection count>:<hash>"
+    
+    Uses the plug-in's get_document_fingerprint command, or hashes the raw component and
+    connection listings on older plug-ins. Returns None when Grasshopper is unreachable.
+    """
+    global _fingerprint_supported
+    if _fingerprint_supported is not False:
+        response = send_to_grasshopper("get_document_fingerprint", priority=priority)
+        fingerprint = _fingerprint_of(response)
+        if fingerprint is not None:
+            _fingerprint_supported = True
+            return fingerprint
+        if response and "No handler registered for command type 'get_document_fingerprint'" in str(response.get("error", "")):
+            _fingerprint_supported = False
+        else:
+            return None
+    
+    components_result = send_to_grasshopper("get_all_components", priority=priority)
+    connections_result = send_to_grasshopper("get_connections", priority=priority)
+    if not components_result or "result" not in components_result or not connections_result or "result" not in connections_result:
+        return None
+    current = take_snapshot(components_result["result"] or [], connections_result["result"] or [])
+    return f"{len(current['components'])}:{len(current['connections'])}:{current['hash']}"
+
+def _shared_cache_directory() -> Optional[str]:
+    value = os.environ.get("GRASSHOPPER_MCP_SHARED_CACHE", "").strip()
+    if not value or value.lower() in ("0", "false", "off"):
+        return None
+    if value.lower() in ("1", "true", "on"):
+        return os.path.join(tempfile.gettempdir(), "grasshopper-mcp-cache")
+    return value
+
+# Cache shared with sibling bridge processes, enabled with GRASSHOPPER_MCP_SHARED_CACHE (1 or a directory)
+shared_cache: Optional[SharedCache] = (
+    SharedCache(_shared_cache_directory()) if _shared_cache_directory() else None
+)
+
+def _shared_key(kind: str, version: str) -> str:
+    return f"{kind}|{GRASSHOPPER_HOST}:{GRASSHOPPER_PORT}|{version}"
+
+def send_listing(command_type: str, priority: Optional[int] = None) -> Dict[str, Any]:
     """
+    Send a document listing command (get_all_components, get_connections)
+    
+    With the shared cache enabled, the listing is keyed by the document fingerprint and
+    reused by every bridge process talking to the same Grasshopper instance. On a miss the
+    listing and a second fingerprint are fetched in one batch, and the listing is only
+    stored when the fingerprint is unchanged.
+    """
+    if shared_cache is None or _fingerprint_supported is False:
+        return send_to_grasshopper(command_type, priority=priority)
+    priority = priority if priority is not None else INTERACTIVE
+    fingerprint = document_fingerprint(priority)
+    if fingerprint is None or _fingerprint_supported is False:
+        return send_to_grasshopper(command_type, priority=priority)
+    
+    failed = []
+    
+    def fetch():
+        response, check = send_batch_to_grasshopper([
+            {"type": command_type, "parameters": {}},
+            {"type": "get_document_fingerprint", "parameters": {}}
+        ], priority=priority)
+        if response and response.get("success") and response.get("result") is not None and _fingerprint_of(check) == fingerprint:
+            return response["result"]
+        failed.append(response)
+        return None
+    
+    result = shared_cache.get_or_compute(_shared_key(command_type, fingerprint), fetch)
+    if result is None:
+        return failed[-1] if failed else send_to_grasshopper(command_type, priority=priority)
+    return {"success": True, "result": result}
+
+# Component library lookup by name / fullName, built on first use
+_library_index: Optional[Dict[str, Dict[str, Any]]] = None
+
+def find_library_component(component_type: str) -> Optional[Dict[str, Any]]:
+    """Look up a component type in the component library"""
+    global _library_index
+    if _library_index is None:
+        index = {}
+        for category in get_component_library().get("categories", []):
+            for lib_component in category.get("components", []):
+                for key in (lib_component.get("name"), lib_component.get("fullName")):
+                    if key:
+                        index.setdefault(key.lower(), lib_component)
+        _library_index = index
+    if not component_type:
+        return None
+    return _library_index.get(component_type.lower())
+
+def _refresh_mirror_for(component_id: str):
+    """Bring the mirror up to date for one target component (only called when it is stale)"""
+    if not document_mirror.knows_inputs(component_id):
+        info = send_to_grasshopper("get_component_info", {"componentId": component_id})
+        if info and "result" in info and isinstance(info["result"], dict):
+            component_data = info["result"]
+            component_type = component_type_name(component_data)
+            inputs = None
+            if isinstance(component_data.get("inputs"), list):
+                inputs = [param.get("name") for param in component_data["inputs"] if param.get("name")]
+            else:
+                lib_component = find_library_component(component_type)
+                if lib_component is not None:
+                    inputs = [param["name"] for param in lib_component.get("inputs", [])]
+            document_mirror.register_component(component_id, inputs)
+    
+    if not document_mirror.is_synced():
+        connections = send_listing("get_connections")
+        if connections and isinstance(connections.get("result"), list):
+            document_mirror.load_connections(connections["result"])
+
+def normalize_component_type(component_type: str) -> str:
+    """Map common alternative component names to the names Grasshopper expects"""
     # Handle common component name confusion issues
     component_mapping = {
         # Various possible input methods for Number Slider
@@ -121,140 +426,1142 @@ def add_component(component_type: str, x: float, y: float):
         component_type = component_mapping[normalized_type]
         print(f"Component type normalized from '{normalized_type}' to '{component_mapping[normalized_type]}'", file=sys.stderr)
     
+    return component_type
+
+def _register_added_component(result: Dict[str, Any], component_type: str):
+    """Record a component created by add_component in the document mirror"""
+    if result and isinstance(result.get("result"), dict) and result["result"].get("id"):
+        lib_component = find_library_component(component_type)
+        inputs = [param["name"] for param in lib_component.get("inputs", [])] if lib_component else None
+        document_mirror.register_component(result["result"]["id"], inputs)
+
+# Register MCP tools
+@server.tool("add_component")
+def add_component(component_type: str, x: float, y: float):
+    """
+    Add a component to the Grasshopper canvas
+    
+    Args:
+        component_type: Component type (point, curve, circle, line, panel, slider)
+        x: X coordinate on the canvas
+        y: Y coordinate on the canvas
+    
+    Returns:
+        Result of adding the component
+    """
+    component_type = normalize_component_type(component_type)
+    
     params = {
         "type": component_type,
         "x": x,
         "y": y
     }
     
-    return send_to_grasshopper("add_component", params)
+    result = send_to_grasshopper("add_component", params)
+    
+    # Seed the mirror with the new component's input ports from the component library
+    _register_added_component(result, component_type)
+    
+    return result
 
 @server.tool("clear_document")
 def clear_document():
     """Clear the Grasshopper document"""
-    return send_to_grasshopper("clear_document")
+    result = send_to_grasshopper("clear_document")
+    document_mirror.reset(synced=bool(result and result.get("success")))
+    return result
+
+def run_or_submit(name: str, fn, params: Dict[str, Any], background: bool) -> Dict[str, Any]:
+    """
+    Run fn(job) now, or submit it as a background job and return its id
+    
+    fn receives the Job (None when run inline) to report progress on.
+    """
+    if not background:
+        return fn(None)
+    
+    # The job changes the document later, on a job thread: hold the submitting session's lock while it runs
+    owner = current_session.get()
+    
+    def locked(job):
+        with document_lock.held(owner, timeout=None):
+            return fn(job)
+    
+    try:
+        job = job_manager.submit(name, locked, params)
+    except JobManagerBusy as e:
+        return {
+            "success": False,
+            "busy": True,
+            "error": str(e)
+        }
+    return {
+        "success": True,
+        "result": job.status()
+    }
+
+def _report(job, message: str, progress: Optional[float] = None):
+    if job is not None:
+        job.report(message, progress)
 
 @server.tool("save_document")
-def save_document(path: str):
+def save_document(path: str, background: bool = False):
     """
     Save the Grasshopper document
     
     Args:
         path: Save path
+        background: Return a job ID at once and save in the background (poll with job_status / job_result)
     
     Returns:
-        Result of the save operation
+        Result of the save operation, or the job status when background is set
     """
     params = {
         "path": path
     }
     
-    return send_to_grasshopper("save_document", params)
+    def run(job):
+        _report(job, "Saving document")
+        return send_to_grasshopper("save_document", params)
+    
+    return run_or_submit("save_document", run, params, background)
+
+@server.tool("load_document")
+def load_document(path: str, background: bool = False):
+    """
+    Load a Grasshopper document
+    
+    Args:
+        path: Document path
+        background: Return a job ID at once and load in the background (poll with job_status / job_result)
+    
+    Returns:
+        Result of the load operation, or the job status when background is set
+    """
+    params = {
+        "path": path
+    }
+    
+    def run(job):
+        _report(job, "Loading document")
+        result = send_to_grasshopper("load_document", params)
+        document_mirror.reset()
+        return result
+    
+    return run_or_submit("load_document", run, params, background)
+
+@server.tool("get_document_info")
+def get_document_info():
+    """Get information about the Grasshopper document"""
+    return send_to_grasshopper("get_document_info")
+
+def _value_result(component_id: str, response: Optional[Dict[str, Any]], packed: bool) -> Dict[str, Any]:
+    """Per-component entry for set_component_values"""
+    entry = {"id": component_id, "success": bool(response and response.get("success"))}
+    payload = (response or {}).get("result")
+    if entry["success"] and packed and not (isinstance(payload, dict) and "count" in payload):
+        # Older plug-ins ignore "packed" and set an empty value instead
+        entry["success"] = False
+        entry["error"] = "Grasshopper plug-in does not support packed values; update GH_MCP"
+    elif entry["success"]:
+        if isinstance(payload, dict) and "count" in payload:
+            entry["count"] = payload["count"]
+    else:
+        entry["error"] = (response or {}).get("error") or "Unknown error"
+    return entry
+
+def set_component_values(assignments: Dict[str, Any], chunk_items: int = DEFAULT_CHUNK_ITEMS,
+                         dtype: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Set values of many sliders, panels and number parameters
+    
+    Scalars are sent as plain values and arrays (NumPy arrays, array('d') / array('i') buffers,
+    number lists or already packed {"dtype", "shape", "data"} blocks) as base64-packed float64
+    or int32 blocks. Everything up to chunk_items values per component goes in one batch request;
+    larger arrays are streamed in chunks of chunk_items values, and the document is only
+    recomputed after the last chunk.
+    
+    Args:
+        assignments: Component ID -> value
+        chunk_items: Maximum number of values per request for large arrays
+        dtype: "float64" or "int32" to force the packed type; inferred from the data by default
+    
+    Returns:
+        Per-component results and success / failure counts
+    """
+    commands = []
+    batched_ids = []
+    chunked = []
+    results = {}
+    for component_id, value in assignments.items():
+        if isinstance(value, (str, int, float, np.generic)):
+            commands.append({"type": "set_component_value", "parameters": {"id": component_id, "value": str(value)}})
+            batched_ids.append((component_id, False))
+            continue
+        try:
+            values = as_array(value, dtype)
+        except (TypeError, ValueError) as e:
+            results[component_id] = {"id": component_id, "success": False, "error": f"Invalid value: {str(e)}"}
+            continue
+        if values.size > chunk_items:
+            chunked.append((component_id, values))
+        else:
+            commands.append({"type": "set_component_value", "parameters": {"id": component_id, "packed": pack_array(values)}})
+            batched_ids.append((component_id, True))
+    
+    responses = send_batch_to_grasshopper(commands)
+    for i, (component_id, packed) in enumerate(batched_ids):
+        response = responses[i] if i < len(responses) else {"success": False, "error": "Not executed"}
+        results[component_id] = _value_result(component_id, response, packed)
+    
+    for component_id, values in chunked:
+        chunks = list(iter_chunks(values, chunk_items))
+        count = 0
+        for i, (offset, rows) in enumerate(chunks):
+            params = {
+                "id": component_id,
+                "packed": pack_array(rows),
+                "append": offset > 0,
+                "final": i == len(chunks) - 1
+            }
+            entry = _value_result(component_id, send_to_grasshopper("set_component_value", params, priority=BULK), True)
+            if not entry["success"]:
+                entry["error"] = f"Chunk at offset {offset}: {entry['error']}"
+                break
+            count += rows.size
+        if entry["success"]:
+            entry["count"] = count
+            entry["chunks"] = len(chunks)
+        results[component_id] = entry
+    
+    succeeded = sum(1 for entry in results.values() if entry["success"])
+    return {
+        "success": succeeded == len(results),
+        "result": {
+            "components": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": [results[component_id] for component_id in assignments if component_id in results]
+        }
+    }
+
+@server.tool("set_values")
+def set_values(values: Dict[str, Any], chunk_size: int = DEFAULT_CHUNK_ITEMS, dtype: str = None):
+    """
+    Set the values of sliders, panels and number parameters, many at once
+    
+    Args:
+        values: Component ID -> value. A number or string sets a slider or panel; a list of numbers
+            (or a packed {"dtype": "float64"|"int32", "shape": [...], "data": base64}) fills a panel or
+            number / integer parameter with one item per value
+        chunk_size: Maximum number of values per request; larger lists are sent in several chunks
+        dtype: "float64" or "int32" to force the number type of lists (optional, inferred by default)
+    
+    Returns:
+        Per-component results and success / failure counts
+    """
+    if not values:
+        return {
+            "success": False,
+            "error": "No values specified"
+        }
+    if dtype is not None and dtype not in ("float64", "int32"):
+        return {
+            "success": False,
+            "error": f"Unsupported dtype: {dtype} (expected float64 or int32)"
+        }
+    
+    return set_component_values(values, chunk_items=max(1, chunk_size), dtype=dtype)
+
+def sweep_endpoints(endpoints: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+    """Endpoints to spread sweeps over: the given "host:port" list, GRASSHOPPER_ENDPOINTS, or the default endpoint"""
+    value = ",".join(endpoints) if endpoints else os.environ.get("GRASSHOPPER_ENDPOINTS")
+    return sweep.parse_endpoints(value, (GRASSHOPPER_HOST, GRASSHOPPER_PORT))
+
+@server.tool("run_sweep")
+def run_sweep(inputs: Dict[str, Any], outputs: Any, output_path: str, method: str = "grid",
+              samples: int = None, seed: int = None, endpoints: List[str] = None, resume: bool = True,
+              output_format: str = None):
+    """
+    Sweep slider values over a grid or Latin-hypercube sample and record the outputs of other components
+    
+    Args:
+        inputs: Slider component ID -> values. For "grid": a list of values or {"min", "max", "steps"};
+            for "lhs": {"min", "max"}. Add "label" to name the result column (default: the ID)
+        outputs: Component IDs to read after each sample ("id" or "id:OutputName"), as a list,
+            or a dict of column label -> ID
+        output_path: Result file; .parquet writes Parquet (requires pyarrow), anything else CSV
+        method: "grid" (every combination) or "lhs" (Latin-hypercube sample)
+        samples: Number of samples for "lhs"
+        seed: Random seed for "lhs"
+        endpoints: "host:port" Grasshopper instances with the same definition open to share the samples
+            (default: GRASSHOPPER_ENDPOINTS, or the configured endpoint)
+        resume: Skip samples already recorded in output_path by an earlier run of the same sweep
+        output_format: "csv" or "parquet" (optional, inferred from output_path)
+    
+    Returns:
+        Sample counts (completed, failed, skipped as already done), samples per endpoint and throughput
+    """
+    if not inputs:
+        return {
+            "success": False,
+            "error": "No inputs specified"
+        }
+    
+    try:
+        specs = {component_id: dict(spec) if isinstance(spec, dict) else spec for component_id, spec in inputs.items()}
+        labels = [spec.pop("label", component_id) if isinstance(spec, dict) else component_id for component_id, spec in specs.items()]
+        if method == "grid":
+            values = sweep.grid_samples(specs)
+        elif method == "lhs":
+            if not samples:
+                raise ValueError("method 'lhs' requires samples")
+            values = sweep.latin_hypercube(specs, samples, seed)
+        else:
+            raise ValueError(f"Unknown method: {method} (expected grid or lhs)")
+        output_specs = sweep.parse_outputs(outputs)
+        result = sweep.run_sweep(
+            send_batch_to_grasshopper, sweep_endpoints(endpoints), list(specs), values, output_specs,
+            output_path, input_labels=labels, resume=resume, output_format=output_format
+        )
+    except (KeyError, TypeError, ValueError, OSError) as e:
+        return {
+            "success": False,
+            "error": f"Sweep failed: {str(e)}"
+        }
+    
+    return {
+        "success": result["failed"] == 0 and result["remaining"] == 0,
+        "result": result
+    }
+
+def create_geometry(kind: str, points: Any = None, radii: Any = None, curves: Optional[List[Any]] = None,
+                    x: float = 0, y: float = 0, chunk_items: int = DEFAULT_GEOMETRY_CHUNK) -> Dict[str, Any]:
+    """
+    Create many points, circles or curves as persistent data of one geometry parameter
+    
+    Coordinates are sent as packed float64 arrays, chunk_items items per request. The first
+    request places a new Point / Circle / Curve parameter at (x, y) and later chunks are
+    appended to it; the document is only recomputed after the last chunk.
+    
+    Args:
+        kind: "point", "circle" or "curve"
+        points: N x 3 coordinates (points, circle centers) as a NumPy array, nested list or packed block
+        radii: One radius for every circle, or one per center
+        curves: One vertex array (M x 3) per curve
+        x: X coordinate of the new parameter on the canvas
+        y: Y coordinate of the new parameter on the canvas
+        chunk_items: Maximum number of items per request
+    
+    Returns:
+        The parameter's component ID and the number of items created
+    """
+    chunks = geometry_chunks(kind, points, radii, curves, chunk_items)
+    try:
+        pending = next(chunks)
+    except (TypeError, ValueError) as e:
+        return {
+            "success": False,
+            "error": f"Invalid geometry: {str(e)}"
+        }
+    except StopIteration:
+        return {
+            "success": False,
+            "error": "No geometry specified"
+        }
+    
+    component_id = None
+    count = 0
+    requests = 0
+    while pending is not None:
+        params = dict(pending)
+        pending = next(chunks, None)
+        params["final"] = pending is None
+        if component_id is None:
+            params["x"], params["y"] = x, y
+        else:
+            params["targetId"] = component_id
+        response = send_to_grasshopper("create_geometry_bulk", params, priority=BULK)
+        requests += 1
+        payload = response.get("result") if response else None
+        if not (response and response.get("success") and isinstance(payload, dict)):
+            return {
+                "success": False,
+                "error": f"Chunk {requests} failed: {(response or {}).get('error') or 'Unknown error'}",
+                "result": {"id": component_id, "kind": kind, "count": count, "requests": requests}
+            }
+        if component_id is None:
+            component_id = payload.get("id")
+            document_mirror.register_component(component_id)
+        count += payload.get("count", 0)
+    
+    return {
+        "success": True,
+        "result": {"id": component_id, "kind": kind, "count": count, "requests": requests}
+    }
+
+@server.tool("create_geometry_bulk")
+def create_geometry_bulk(kind: str, points: Any = None, radii: Any = None, curves: List[Any] = None,
+                         x: float = 0, y: float = 0, chunk_size: int = DEFAULT_GEOMETRY_CHUNK):
+    """
+    Create thousands of points, circles or curves in a few requests
+    
+    The geometry is stored in a single Point, Circle or Curve parameter placed on the canvas,
+    ready to be connected to other components.
+    
+    Args:
+        kind: "point", "circle" or "curve"
+        points: N x 3 coordinates [[x, y, z], ...] of points or circle centers (z may be omitted),
+            or a packed {"dtype": "float64", "shape": [N, 3], "data": base64} block
+        radii: Circle radius, or a list with one radius per center
+        curves: List of vertex lists, one per curve; 2 vertices make a line, more an interpolated curve
+        x: X coordinate of the geometry parameter on the canvas
+        y: Y coordinate of the geometry parameter on the canvas
+        chunk_size: Maximum number of items per request
+    
+    Returns:
+        The geometry parameter's component ID, the number of items and the number of requests sent
+    """
+    return create_geometry(kind, points, radii, curves, x, y, chunk_items=chunk_size)
+
+def _connection_params(source_id: str, target_id: str, source_param: str = None, target_param: str = None, source_param_index: int = None, target_param_index: int = None) -> Dict[str, Any]:
+    """Build connect_components parameters, preferring parameter names over indices"""
+    params = {
+        "sourceId": source_id,
+        "targetId": target_id
+    }
+    
+    if source_param is not None:
+        params["sourceParam"] = source_param
+    elif source_param_index is not None:
+        params["sourceParamIndex"] = source_param_index
+        
+    if target_param is not None:
+        params["targetParam"] = target_param
+    elif target_param_index is not None:
+        params["targetParamIndex"] = target_param_index
+    
+    return params
+
+@server.tool("connect_components")
+def connect_components(source_id: str, target_id: str, source_param: str = None, target_param: str = None, source_param_index: int = None, target_param_index: int = None):
+    """
+    Connect two components in the Grasshopper canvas
+    
+    Args:
+        source_id: ID of the source component (output)
+        target_id: ID of the target component (input)
+        source_param: Name of the source parameter (optional)
+        target_param: Name of the target parameter (optional)
+        source_param_index: Index of the source parameter (optional, used if source_param is not provided)
+        target_param_index: Index of the target parameter (optional, used if target_param is not provided)
+    
+    Returns:
+        Result of connecting the components
+    """
+    # For components with several inputs (like Addition, Subtraction, etc.), intelligently assign
+    # the first free input from the local mirror; Grasshopper is only queried when the mirror is stale
+    if target_param is None and target_param_index is None:
+        if document_mirror.needs_refresh(target_id):
+            _refresh_mirror_for(target_id)
+        target_param = document_mirror.assign_input(target_id)
+    
+    params = _connection_params(source_id, target_id, source_param, target_param, source_param_index, target_param_index)
+    result = send_to_grasshopper("connect_components", params)
+    
+    if result and result.get("success"):
+        # Prefer the ports the plug-in reports it connected
+        reported = result.get("result") if isinstance(result.get("result"), dict) else {}
+        document_mirror.record_connection(
+            source_id, reported.get("sourceParam") or source_param,
+            target_id, reported.get("targetParam") or target_param, target_param_index
+        )
+    else:
+        # The mirror may disagree with the canvas; re-read the connections before the next assignment
+        document_mirror.invalidate()
+    
+    return result
+
+def _expand_connection_spec(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Expand one fan_out / fan_in / zip spec into individual wires, raising ValueError if malformed"""
+    mode = spec.get("mode")
+    source_param = spec.get("source_param")
+    target_param = spec.get("target_param")
+    
+    if mode == "fan_out":
+        source_id = spec.get("source_id")
+        target_ids = spec.get("target_ids") or []
+        if not source_id or not target_ids:
+            raise ValueError("fan_out requires 'source_id' and a non-empty 'target_ids' list")
+        return [
+            {"source_id": source_id, "source_param": source_param, "target_id": target_id, "target_param": target_param}
+            for target_id in target_ids
+        ]
+    
+    if mode == "fan_in":
+        source_ids = spec.get("source_ids") or []
+        target_id = spec.get("target_id")
+        target_params = spec.get("target_params")
+        if not source_ids or not target_id:
+            raise ValueError("fan_in requires a non-empty 'source_ids' list and 'target_id'")
+        if target_params is not None and len(target_params) != len(source_ids):
+            raise ValueError(f"fan_in has {len(source_ids)} sources but {len(target_params)} target_params")
+        return [
+            {
+                "source_id": source_id,
+                "source_param": source_param,
+                "target_id": target_id,
+                "target_param": target_params[i] if target_params is not None else target_param
+            }
+            for i, source_id in enumerate(source_ids)
+        ]
+    
+    if mode == "zip":
+        source_ids = spec.get("source_ids") or []
+        target_ids = spec.get("target_ids") or []
+        if not source_ids or len(source_ids) != len(target_ids):
+            raise ValueError(f"zip requires equally long non-empty lists, got {len(source_ids)} sources and {len(target_ids)} targets")
+        return [
+            {"source_id": source_id, "source_param": source_param, "target_id": target_id, "target_param": target_param}
+            for source_id, target_id in zip(source_ids, target_ids)
+        ]
+    
+    raise ValueError(f"Unknown connection mode '{mode}', expected 'fan_out', 'fan_in' or 'zip'")
+
+def _connect_wires(wires: List[Dict[str, Any]], stop_on_error: bool = False) -> Dict[str, Any]:
+    """
+    Create validated wires in one batch request
+    
+    Each wire is {"source_id", "source_param", "target_id", "target_param"}; a None target_param
+    is filled with a free input port from the document mirror.
+    """
+    errors = []
+    
+    # Refresh stale targets once, then assign free input ports locally
+    for target_id in dict.fromkeys(wire["target_id"] for wire in wires if wire["target_param"] is None):
+        if document_mirror.needs_refresh(target_id):
+            _refresh_mirror_for(target_id)
+    
+    reserved: Dict[str, set] = {}
+    for i, wire in enumerate(wires):
+        target_ports = reserved.setdefault(wire["target_id"], set())
+        if wire["target_param"] is None:
+            wire["target_param"] = document_mirror.assign_input(wire["target_id"], target_ports)
+        if wire["target_param"] is not None:
+            if wire["target_param"] in target_ports:
+                errors.append(f"Wire {i}: input '{wire['target_param']}' of {wire['target_id']} is already used by another wire in this request")
+            target_ports.add(wire["target_param"])
+    if errors:
+        return {
+            "success": False,
+            "error": "Conflicting connections",
+            "errors": errors
+        }
+    
+    commands = [
+        {
+            "type": "connect_components",
+            "parameters": _connection_params(wire["source_id"], wire["target_id"], wire["source_param"], wire["target_param"])
+        }
+        for wire in wires
+    ]
+    responses = send_batch_to_grasshopper(commands, stop_on_error=stop_on_error)
+    
+    results = []
+    succeeded = 0
+    for i, wire in enumerate(wires):
+        response = responses[i] if i < len(responses) else {"success": False, "error": "Not executed"}
+        entry = {
+            "sourceId": wire["source_id"],
+            "targetId": wire["target_id"],
+            "sourceParam": wire["source_param"],
+            "targetParam": wire["target_param"],
+            "success": bool(response and response.get("success"))
+        }
+        if entry["success"]:
+            succeeded += 1
+            # Prefer the ports the plug-in reports it connected
+            reported = response.get("result") if isinstance(response.get("result"), dict) else {}
+            entry["sourceParam"] = reported.get("sourceParam") or wire["source_param"]
+            entry["targetParam"] = reported.get("targetParam") or wire["target_param"]
+            document_mirror.record_connection(wire["source_id"], entry["sourceParam"], wire["target_id"], entry["targetParam"])
+        else:
+            entry["error"] = (response or {}).get("error") or "Unknown error"
+            document_mirror.invalidate(wire["target_id"])
+        results.append(entry)
+    
+    if succeeded < len(wires):
+        document_mirror.invalidate()
+    
+    return {
+        "success": succeeded == len(wires),
+        "result": {
+            "wires": len(wires),
+            "succeeded": succeeded,
+            "failed": len(wires) - succeeded,
+            "results": results
+        }
+    }
+
+@server.tool("connect_many")
+def connect_many(specs: List[Dict[str, Any]], stop_on_error: bool = False):
+    """
+    Create many connections in a single request using fan-out, fan-in or zip specs
+    
+    Args:
+        specs: List of wiring specs, each one of:
+            {"mode": "fan_out", "source_id": id, "target_ids": [ids], "source_param"?: name, "target_param"?: name}
+            {"mode": "fan_in", "source_ids": [ids], "target_id": id, "source_param"?: name, "target_params"?: [names]}
+            {"mode": "zip", "source_ids": [ids], "target_ids": [ids], "source_param"?: name, "target_param"?: name}
+            When no target parameter is given, free inputs of multi-input components are assigned in order
+            (e.g. three sliders fanned into Construct Point go to X, Y and Z)
+        stop_on_error: Stop creating wires after the first failed one
+    
+    Returns:
+        Per-wire results and success / failure counts
+    """
+    # Validate every spec locally before anything is sent
+    wires = []
+    errors = []
+    for i, spec in enumerate(specs or []):
+        try:
+            wires.extend(_expand_connection_spec(spec))
+        except ValueError as e:
+            errors.append(f"Spec {i}: {str(e)}")
+    if not wires and not errors:
+        errors.append("No connections specified")
+    if errors:
+        return {
+            "success": False,
+            "error": "Invalid connection specs",
+            "errors": errors
+        }
+    
+    return _connect_wires(wires, stop_on_error)
+
+def _planned_graph(components: List[Any], connections: Optional[List[Dict[str, Any]]]):
+    """Node keys and (source, target) edges of a planned graph, accepting ids or keys"""
+    node_ids = []
+    for component in components:
+        if isinstance(component, dict):
+            node_id = component.get("key") or component.get("id")
+        else:
+            node_id = component
+        if node_id:
+            node_ids.append(str(node_id))
+    
+    edges = []
+    for conn in connections or []:
+        source = conn.get("source") or conn.get("sourceId")
+        target = conn.get("target") or conn.get("targetId")
+        if source and target:
+            edges.append((str(source), str(target)))
+    return node_ids, edges
+
+@server.tool("auto_layout")
+def auto_layout(components: List[Any] = None, connections: List[Dict[str, Any]] = None, apply: bool = False,
+                x_spacing: float = DEFAULT_X_SPACING, y_spacing: float = DEFAULT_Y_SPACING,
+                origin_x: float = 0, origin_y: float = 0):
+    """
+    Compute a layered left-to-right layout, following the flow of data through the wires
+    
+    Args:
+        components: Planned components (ids, keys or {"key"/"id": ...} dicts); omit to lay out the current canvas
+        connections: Planned connections ({"source"/"sourceId": ..., "target"/"targetId": ...}); omit for the canvas
+        apply: Move the canvas components to the computed positions (canvas layout only)
+        x_spacing: Horizontal distance between layers
+        y_spacing: Vertical distance between components in a layer
+        origin_x: X coordinate of the layout's top-left corner
+        origin_y: Y coordinate of the layout's top-left corner
+    
+    Returns:
+        Computed positions keyed by component id or key
+    """
+    from_canvas = components is None
+    if from_canvas:
+        # Lay out the canvas from the mirrored graph, downloading it only when stale
+        components_result = send_listing("get_all_components")
+        if not components_result or not components_result.get("success", True) or "result" not in components_result:
+            return components_result
+        components = components_result["result"]
+        if connections is None:
+            if not document_mirror.is_synced():
+                connections_result = send_listing("get_connections")
+                if connections_result and isinstance(connections_result.get("result"), list):
+                    document_mirror.load_connections(connections_result["result"])
+            connections = document_mirror.connections()
+    
+    node_ids, edges = _planned_graph(components, connections)
+    positions = layered_layout(node_ids, edges, x_spacing=x_spacing, y_spacing=y_spacing, origin=(origin_x, origin_y))
+    result = {
+        "success": True,
+        "result": {
+            "positions": {node_id: {"x": x, "y": y} for node_id, (x, y) in positions.items()}
+        }
+    }
+    
+    if apply and from_canvas:
+        commands = [
+            {"type": "set_component_position", "parameters": {"id": node_id, "x": x, "y": y}}
+            for node_id, (x, y) in positions.items()
+        ]
+        responses = send_batch_to_grasshopper(commands)
+        failed = [
+            {"id": command["parameters"]["id"], "error": (response or {}).get("error")}
+            for command, response in zip(commands, responses)
+            if not (response and response.get("success"))
+        ]
+        result["success"] = not failed
+        result["result"]["moved"] = len(commands) - len(failed)
+        if failed:
+            result["result"]["failed"] = failed
+    
+    return result
+
+@server.tool("build_definition")
+def build_definition(components: List[Dict[str, Any]], connections: List[Dict[str, Any]] = None,
+                     origin_x: float = 0, origin_y: float = 0, stop_on_error: bool = False, transaction: bool = False):
+    """
+    Add several components and wire them up in two batch requests, laying out components without x / y
+    
+    Args:
+        components: Components to add, e.g. [{"key": "r", "type": "Number Slider"}, {"key": "c", "type": "Circle", "x": 300, "y": 0}]
+            "x" and "y" are optional; missing positions come from a layered layout of the planned wiring
+        connections: Wires between keys (or existing component ids), e.g.
+            [{"source": "r", "target": "c", "target_param": "Radius"}]; "source_param" is optional and a missing
+            "target_param" picks the first free input
+        origin_x: X coordinate of the automatic layout's top-left corner
+        origin_y: Y coordinate of the automatic layout's top-left corner
+        stop_on_error: Stop creating wires after the first failed one
+        transaction: Recompute the definition once at the end instead of after every command, and
+            remove the created components again if anything fails
+    
+    Returns:
+        Created component ids keyed by key, and per-wire connection results
+    """
+    if transaction:
+        return run_in_transaction(lambda: build_definition(components, connections, origin_x, origin_y, stop_on_error))
+    
+    errors = []
+    keys = []
+    for i, component in enumerate(components or []):
+        key = component.get("key")
+        if not key:
+            errors.append(f"Component {i}: missing 'key'")
+        elif key in keys:
+            errors.append(f"Component {i}: duplicate key '{key}'")
+        if not component.get("type"):
+            errors.append(f"Component {i}: missing 'type'")
+        keys.append(key)
+    if not components:
+        errors.append("No components specified")
+    if errors:
+        return {
+            "success": False,
+            "error": "Invalid components",
+            "errors": errors
+        }
+    
+    # Place components without explicit positions using the planned wiring
+    positions = {}
+    if any(component.get("x") is None or component.get("y") is None for component in components):
+        node_ids, edges = _planned_graph(components, connections)
+        positions = layered_layout(node_ids, edges, origin=(origin_x, origin_y))
+    
+    commands = []
+    for component in components:
+        x, y = component.get("x"), component.get("y")
+        if x is None or y is None:
+            x, y = positions[component["key"]]
+        component_type = normalize_component_type(component["type"])
+        commands.append({"type": "add_component", "parameters": {"type": component_type, "x": x, "y": y}})
+    responses = send_batch_to_grasshopper(commands)
+    
+    created = {}
+    failed = {}
+    for component, command, response in zip(components, commands, responses):
+        if response and response.get("success") and isinstance(response.get("result"), dict) and response["result"].get("id"):
+            _register_added_component(response, command["parameters"]["type"])
+            created[component["key"]] = {
+                "id": response["result"]["id"],
+                "type": command["parameters"]["type"],
+                "x": command["parameters"]["x"],
+                "y": command["parameters"]["y"]
+            }
+        else:
+            failed[component["key"]] = (response or {}).get("error") or "Unknown error"
+    
+    # Resolve wire endpoints from keys to the ids Grasshopper assigned
+    wires = []
+    skipped = []
+    for conn in connections or []:
+        source, target = conn.get("source"), conn.get("target")
+        if source in failed or target in failed or not source or not target:
+            skipped.append({"source": source, "target": target, "success": False, "error": "Endpoint component was not created"})
+            continue
+        wires.append({
+            "source_id": created[source]["id"] if source in created else source,
+            "source_param": conn.get("source_param"),
+            "target_id": created[target]["id"] if target in created else target,
+            "target_param": conn.get("target_param")
+        })
+    
+    connection_result = _connect_wires(wires, stop_on_error) if wires else {"success": True, "result": {"results": []}}
+    success = not failed and not skipped and connection_result.get("success", False)
+    return {
+        "success": success,
+        "result": {
+            "components": created,
+            "failedComponents": failed,
+            "connections": connection_result.get("result", {}).get("results", []) + skipped,
+            "connectionErrors": connection_result.get("errors", [])
+        }
+    }
+
+@server.tool("create_pattern")
+def create_pattern(description: str, background: bool = False):
+    """
+    Create a pattern of components based on a high-level description
+    
+    Args:
+        description: High-level description of what to create (e.g., '3D voronoi cube')
+        background: Return a job ID at once and build the pattern in the background
+            (poll with job_status / job_result)
+    
+    Returns:
+        Result of creating the pattern, or the job status when background is set
+    """
+    params = {
+        "description": description
+    }
+    
+    def run(job):
+        _report(job, "Creating pattern")
+        result = send_to_grasshopper("create_pattern", params)
+        # The pattern adds components and wires the mirror has not seen
+        document_mirror.invalidate()
+        return result
+    
+    return run_or_submit("create_pattern", run, params, background)
+
+@server.tool("job_status")
+def job_status(job_id: str = None):
+    """
+    Get the state, progress and elapsed time of a background job
+    
+    Args:
+        job_id: Job ID returned by a tool called with background=True (omit to list all jobs)
+    
+    Returns:
+        Job status: state (queued, running, succeeded, failed, cancelled), elapsed and queued seconds,
+        progress message
+    """
+    if job_id is None:
+        return {
+            "success": True,
+            "result": [job.status() for job in job_manager.list()]
+        }
+    job = job_manager.get(job_id)
+    if job is None:
+        return {
+            "success": False,
+            "error": f"Unknown job: {job_id} (finished jobs are kept for {job_manager.retention:g} seconds)"
+        }
+    return {
+        "success": True,
+        "result": job.status()
+    }
+
+@server.tool("job_result")
+def job_result(job_id: str):
+    """
+    Get the result of a finished background job
+    
+    Args:
+        job_id: Job ID returned by a tool called with background=True
+    
+    Returns:
+        The tool's result once the job has finished, otherwise the job status
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return {
+            "success": False,
+            "error": f"Unknown job: {job_id} (finished jobs are kept for {job_manager.retention:g} seconds)"
+        }
+    status = job.status()
+    if status["state"] not in FINISHED_STATES:
+        return {
+            "success": False,
+            "pending": True,
+            "error": f"Job {job_id} is {status['state']}",
+            "job": status
+        }
+    if isinstance(job.result, dict):
+        return dict(job.result, job=status)
+    return {
+        "success": status["state"] == SUCCEEDED,
+        "result": job.result,
+        "error": job.error,
+        "job": status
+    }
+
+@server.tool("cancel_job")
+def cancel_job(job_id: str):
+    """
+    Cancel a background job that has not started yet
+    
+    Args:
+        job_id: Job ID returned by a tool called with background=True
+    
+    Returns:
+        The job status; jobs already running cannot be interrupted and run to completion
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return {
+            "success": False,
+            "error": f"Unknown job: {job_id}"
+        }
+    status = job.status()
+    if status["state"] != CANCELLED:
+        return {
+            "success": False,
+            "error": f"Job {job_id} is {status['state']} and can no longer be cancelled",
+            "job": status
+        }
+    return {
+        "success": True,
+        "result": status
+    }
+
+@server.tool("lock_document")
+def lock_document(lease_seconds: float = DEFAULT_LEASE, wait_seconds: float = DEFAULT_LOCK_TIMEOUT):
+    """
+    Keep other sessions from changing the document while this session makes several edits
+    
+    Tools that change the document always lock it for the duration of the call; use this to
+    keep the lock between calls. Call again to renew the lease.
+    
+    Args:
+        lease_seconds: Seconds the lock is kept after this call unless renewed or released with unlock_document
+        wait_seconds: Seconds to wait for another session's lock
+    
+    Returns:
+        Lock expiry time (Unix seconds)
+    """
+    try:
+        expires = document_lock.hold(current_session.get(), lease=lease_seconds, timeout=wait_seconds)
+    except DocumentLockTimeout as e:
+        return {
+            "success": False,
+            "busy": True,
+            "error": str(e)
+        }
+    return {
+        "success": True,
+        "result": {"leaseExpires": expires}
+    }
+
+@server.tool("unlock_document")
+def unlock_document():
+    """
+    Release a lock taken with lock_document
+    
+    Returns:
+        Whether this session held the lock
+    """
+    released = document_lock.unhold(current_session.get())
+    return {
+        "success": released,
+        "error": None if released else "This session does not hold the document lock"
+    }
+
+# Whether the plug-in understands transactions; None until first tried
+_transactions_supported: Optional[bool] = None
+
+# Transaction opened by begin_transaction in this process, committed or rolled back by its owner
+# ({"id", "owner", "started", "timer"}); rolled back when its lease expires or its session ends
+_open_transaction: Optional[Dict[str, Any]] = None
+_transaction_lock = threading.RLock()
+
+# Seconds the plug-in keeps a run_in_transaction transaction open if the bridge never finishes it
+TRANSACTION_TIMEOUT = float(os.environ.get("GRASSHOPPER_MCP_TRANSACTION_TIMEOUT", 300))
+
+def run_in_transaction(fn) -> Dict[str, Any]:
+    """
+    Run a tool body with Grasshopper's recomputes deferred to a single solution at the end
+    
+    The components it added are removed again if its result is not successful. When the calling
+    session has a transaction open (begin_transaction), fn runs as part of it; when another
+    session's transaction is open, fn does not run.
+    
+    Args:
+        fn: Function returning a tool result ({"success": ..., ...})
+    
+    Returns:
+        fn's result, with the commit or rollback outcome under "transaction"
+    """
+    global _transactions_supported
+    transaction_id = None
+    if _transactions_supported is not False:
+        with _transaction_lock:
+            own = _open_transaction is not None and _open_transaction["owner"] == current_session.get()
+        if own:
+            return fn()
+        response = send_to_grasshopper("begin_transaction", {"timeoutSeconds": TRANSACTION_TIMEOUT})
+        if response and response.get("success"):
+            _transactions_supported = True
+            transaction_id = response["result"]["transactionId"]
+        elif response and "No handler registered for command type 'begin_transaction'" in str(response.get("error", "")):
+            print("Grasshopper plug-in does not support transactions, running without one", file=sys.stderr)
+            _transactions_supported = False
+        else:
+            # Never fold these edits into somebody else's transaction
+            return {
+                "success": False,
+                "busy": True,
+                "error": f"Could not start a transaction: {(response or {}).get('error') or 'Unknown error'}"
+            }
+    if transaction_id is None:
+        return fn()
+    
+    try:
+        result = fn()
+    except Exception:
+        send_to_grasshopper("rollback_transaction", {"transactionId": transaction_id})
+        document_mirror.invalidate()
+        raise
+    failed = not (isinstance(result, dict) and result.get("success"))
+    outcome = send_to_grasshopper("rollback_transaction" if failed else "commit_transaction", {"transactionId": transaction_id})
+    if failed:
+        document_mirror.invalidate()
+    if isinstance(result, dict):
+        result["transaction"] = outcome.get("result") if outcome and outcome.get("success") else {
+            "error": (outcome or {}).get("error") or "Could not finish the transaction"
+        }
+    return result
 
-@server.tool("load_document")
-def load_document(path: str):
+@server.tool("begin_transaction")
+def begin_transaction(lease_seconds: float = DEFAULT_LEASE, wait_seconds: float = DEFAULT_LOCK_TIMEOUT):
     """
-    Load a Grasshopper document
+    Group the following edits: Grasshopper stops recomputing after every add, connect and value
+    change until commit_transaction, which recomputes once; rollback_transaction removes the
+    components added since
+    
+    Also locks the document for this session (as lock_document) so other sessions' edits
+    cannot end up in the transaction. The transaction is rolled back when the lease runs out
+    or the session disconnects, and by the plug-in itself after lease_seconds if the bridge
+    goes away.
     
     Args:
-        path: Document path
+        lease_seconds: Seconds the transaction and the document lock last unless ended first
+        wait_seconds: Seconds to wait for another session's lock
     
     Returns:
-        Result of the load operation
+        Transaction ID
     """
-    params = {
-        "path": path
-    }
-    
-    return send_to_grasshopper("load_document", params)
+    global _open_transaction
+    owner = current_session.get()
+    with _transaction_lock:
+        if _open_transaction is not None and _open_transaction["owner"] == owner:
+            return {"success": False, "error": f"Transaction {_open_transaction['id']} is already open"}
+    try:
+        document_lock.hold(owner, lease=lease_seconds, timeout=wait_seconds)
+    except DocumentLockTimeout as e:
+        return {
+            "success": False,
+            "busy": True,
+            "error": str(e)
+        }
+    result = send_to_grasshopper("begin_transaction", {"timeoutSeconds": lease_seconds})
+    if not (result and result.get("success")):
+        document_lock.unhold(owner)
+        return result
+    transaction_id = result["result"]["transactionId"]
+    timer = threading.Timer(lease_seconds, _expire_transaction, args=(transaction_id, "its lease expired"))
+    timer.daemon = True
+    with _transaction_lock:
+        _open_transaction = {"id": transaction_id, "owner": owner, "started": time.time(), "timer": timer}
+    timer.start()
+    return result
 
-@server.tool("get_document_info")
-def get_document_info():
-    """Get information about the Grasshopper document"""
-    return send_to_grasshopper("get_document_info")
+def _forget_transaction(transaction_id: str) -> Optional[Dict[str, Any]]:
+    """Stop tracking a transaction; returns it if it was the open one"""
+    global _open_transaction
+    with _transaction_lock:
+        transaction = _open_transaction
+        if transaction is None or transaction["id"] != transaction_id:
+            return None
+        _open_transaction = None
+    transaction["timer"].cancel()
+    document_lock.unhold(transaction["owner"])
+    return transaction
 
-@server.tool("connect_components")
-def connect_components(source_id: str, target_id: str, source_param: str = None, target_param: str = None, source_param_index: int = None, target_param_index: int = None):
+def _expire_transaction(transaction_id: str, reason: str):
+    """Roll back a begin_transaction transaction whose owner is gone"""
+    transaction = _forget_transaction(transaction_id)
+    if transaction is None:
+        return
+    print(f"Rolling back transaction {transaction_id} because {reason}", file=sys.stderr)
+    send_to_grasshopper("rollback_transaction", {"transactionId": transaction_id})
+    document_mirror.invalidate()
+
+def _on_session_end(session_id: str):
+    with _transaction_lock:
+        transaction = _open_transaction
+    if transaction is not None and transaction["owner"] == session_id:
+        _expire_transaction(transaction["id"], "its session ended")
+
+def _finish_transaction(command_type: str) -> Dict[str, Any]:
+    owner = current_session.get()
+    params = {}
+    with _transaction_lock:
+        transaction = _open_transaction
+    if transaction is not None:
+        if transaction["owner"] != owner:
+            return {"success": False, "error": "The open transaction belongs to another session"}
+        params["transactionId"] = transaction["id"]
+    result = send_to_grasshopper(command_type, params)
+    # The plug-in forgets its transaction when Grasshopper restarts or it times out; forget ours then too
+    error = str((result or {}).get("error") or "")
+    if transaction is not None and result and (result.get("success") or "not open" in error or "No transaction is open" in error):
+        _forget_transaction(transaction["id"])
+    document_mirror.invalidate()
+    return result
+
+@server.tool("commit_transaction")
+def commit_transaction():
     """
-    Connect two components in the Grasshopper canvas
-    
-    Args:
-        source_id: ID of the source component (output)
-        target_id: ID of the target component (input)
-        source_param: Name of the source parameter (optional)
-        target_param: Name of the target parameter (optional)
-        source_param_index: Index of the source parameter (optional, used if source_param is not provided)
-        target_param_index: Index of the target parameter (optional, used if target_param is not provided)
+    End the transaction opened with begin_transaction and recompute the definition once
     
     Returns:
-        Result of connecting the components
+        Components added and solutions deferred during the transaction
     """
-    # Get target component information and check for existing connections
-    target_info = send_to_grasshopper("get_component_info", {"componentId": target_id})
-    
-    # Check component type, if it's a component that needs multiple inputs (like Addition, Subtraction, etc.), intelligently assign inputs
-    if target_info and "result" in target_info and "type" in target_info["result"]:
-        component_type = target_info["result"]["type"]
-        
-        # Get existing connections
-        connections = send_to_grasshopper("get_connections")
-        existing_connections = []
-        
-        if connections and "result" in connections:
-            for conn in connections["result"]:
-                if conn.get("targetId") == target_id:
-                    existing_connections.append(conn)
-        
-        # For specific components that need multiple inputs, automatically select the correct input port
-        if component_type in ["Addition", "Subtraction", "Multiplication", "Division", "Math"]:
-            # If no target parameter is specified and there's already a connection to the first input, automatically connect to the second input
-            if target_param is None and target_param_index is None:
-                # Check if the first input is already occupied
-                first_input_occupied = False
-                for conn in existing_connections:
-                    if conn.get("targetParam") == "A" or conn.get("targetParamIndex") == 0:
-                        first_input_occupied = True
-                        break
-                
-                # If the first input is occupied, connect to the second input
-                if first_input_occupied:
-                    target_param = "B"  # The second input is usually named B
-                else:
-                    target_param = "A"  # Otherwise connect to the first input
-    
-    params = {
-        "sourceId": source_id,
-        "targetId": target_id
-    }
-    
-    if source_param is not None:
-        params["sourceParam"] = source_param
-    elif source_param_index is not None:
-        params["sourceParamIndex"] = source_param_index
-        
-    if target_param is not None:
-        params["targetParam"] = target_param
-    elif target_param_index is not None:
-        params["targetParamIndex"] = target_param_index
-    
-    return send_to_grasshopper("connect_components", params)
+    return _finish_transaction("commit_transaction")
 
-@server.tool("create_pattern")
-def create_pattern(description: str):
+@server.tool("rollback_transaction")
+def rollback_transaction():
     """
-    Create a pattern of components based on a high-level description
+    End the transaction opened with begin_transaction, removing the components added during it
     
-    Args:
-        description: High-level description of what to create (e.g., '3D voronoi cube')
+    Wires between components that existed before and value changes are not undone.
     
     Returns:
-        Result of creating the pattern
+        Components removed and solutions deferred during the transaction
     """
-    params = {
-        "description": description
-    }
-    
-    return send_to_grasshopper("create_pattern", params)
+    return _finish_transaction("rollback_transaction")
+
+@server.tool("get_transaction_status")
+def get_transaction_status():
+    """
+    Get the open transaction, if any, with the components added and solutions deferred so far
+    """
+    result = send_to_grasshopper("get_transaction_status", {})
+    transaction = _open_transaction
+    if result and result.get("success") and transaction is not None:
+        result["result"]["owner"] = transaction["owner"]
+    return result
 
 @server.tool("get_available_patterns")
 def get_available_patterns(query: str):
@@ -294,9 +1601,9 @@ def get_component_info(component_id: str):
     if result and "result" in result:
         component_data = result["result"]
         
-        # Get component type
+        # Get component type (the plug-in reports the class name, e.g. GH_NumberSlider)
         if "type" in component_data:
-            component_type = component_data["type"]
+            component_type = component_type_name(component_data)
             
             # Query component library to get detailed parameter information for this component type
             component_library = get_component_library()
@@ -329,7 +1636,7 @@ def get_component_info(component_id: str):
                     }
             
             # Add component connection information
-            connections = send_to_grasshopper("get_connections")
+            connections = send_listing("get_connections")
             if connections and "result" in connections:
                 # Find all connections related to this component
                 related_connections = []
@@ -342,6 +1649,38 @@ def get_component_info(component_id: str):
     
     return result
 
+def load_document_model(slider_settings: bool = True) -> Optional[DocumentModel]:
+    """
+    Read every component and connection into a DocumentModel
+    
+    Args:
+        slider_settings: Also read the value and range of sliders the listing has no range for, in one batch request
+    
+    Returns:
+        The model, or None when the components could not be read
+    """
+    components_result = send_listing("get_all_components")
+    if not components_result or "result" not in components_result:
+        return None
+    components = components_result.pop("result") or []
+    connections_result = send_listing("get_connections")
+    connections = (connections_result or {}).pop("result", None) or []
+    model = DocumentModel.from_wire(components, connections)
+    # The wire dicts are no longer needed once converted
+    del components, connections, components_result, connections_result
+    
+    if slider_settings:
+        # The listing carries slider ranges; only ask for the ones it left out
+        sliders = [slider for slider in model.of_type("Number Slider") if slider.minimum is None or slider.maximum is None]
+        responses = send_batch_to_grasshopper(
+            [{"type": "get_component_info", "parameters": {"componentId": slider.id}} for slider in sliders],
+            priority=INTERACTIVE
+        )
+        for slider, response in zip(sliders, responses):
+            if response and response.get("success") and isinstance(response.get("result"), dict):
+                slider.update_from_info(response["result"])
+    return model
+
 @server.tool("get_all_components")
 def get_all_components():
     """
@@ -350,59 +1689,28 @@ def get_all_components():
     Returns:
         List of all components in the document with their IDs, types, and positions
     """
-    result = send_to_grasshopper("get_all_components")
+    model = load_document_model()
+    if model is None:
+        return {
+            "success": False,
+            "error": "Could not read components from Grasshopper"
+        }
     
-    # Enhance return results, add more parameter information for each component
-    if result and "result" in result:
-        components = result["result"]
-        component_library = get_component_library()
-        
-        # Get all connection information
-        connections = send_to_grasshopper("get_connections")
-        connections_data = connections.get("result", []) if connections else []
-        
-        # Add detailed information for each component
-        for component in components:
-            if "id" in component and "type" in component:
-                component_id = component["id"]
-                component_type = component["type"]
-                
-                # Add detailed parameter information for the component
-                if "components" in component_library:
-                    for lib_component in component_library["components"]:
-                        if lib_component.get("name") == component_type or lib_component.get("fullName") == component_type:
-                            # Merge parameter information from component library into component data
-                            if "settings" in lib_component:
-                                component["availableSettings"] = lib_component["settings"]
-                            if "inputs" in lib_component:
-                                component["inputDetails"] = lib_component["inputs"]
-                            if "outputs" in lib_component:
-                                component["outputDetails"] = lib_component["outputs"]
-                            break
-                
-                # Add component connection information
-                related_connections = []
-                for conn in connections_data:
-                    if conn.get("sourceId") == component_id or conn.get("targetId") == component_id:
-                        related_connections.append(conn)
-                
-                if related_connections:
-                    component["connections"] = related_connections
-                
-                # Special handling for certain component types
-                if component_type == "Number Slider":
-                    # Try to get the slider's current settings
-                    component_info = send_to_grasshopper("get_component_info", {"componentId": component_id})
-                    if component_info and "result" in component_info:
-                        info_data = component_info["result"]
-                        component["currentSettings"] = {
-                            "min": info_data.get("min", 0),
-                            "max": info_data.get("max", 10),
-                            "value": info_data.get("value", 5),
-                            "rounding": info_data.get("rounding", 0.1)
-                        }
+    # Serialize once: each component with its connections and, for sliders, current settings
+    components = []
+    for component in model.components.values():
+        entry = component.to_wire()
+        related_connections = model.connections_of(component.id)
+        if related_connections:
+            entry["connections"] = [conn.to_wire() for conn in related_connections]
+        if component.type == "Number Slider":
+            entry["currentSettings"] = component.slider_settings()
+        components.append(entry)
     
-    return result
+    return {
+        "success": True,
+        "result": components
+    }
 
 @server.tool("get_connections")
 def get_connections():
@@ -412,12 +1720,331 @@ def get_connections():
     Returns:
         List of all connections between components
     """
-    return send_to_grasshopper("get_connections")
+    return send_listing("get_connections")
+
+def _required_inputs(component_id: str, component_type: Optional[str]) -> Optional[List[str]]:
+    """Non-optional input names of a component, from the mirror or the component library"""
+    lib_component = find_library_component(component_type)
+    if lib_component is not None:
+        return [param["name"] for param in lib_component.get("inputs", []) if not param.get("optional")]
+    return document_mirror.input_names(component_id)
+
+@server.tool("graph_query")
+def graph_query(query: str = "summary", component_id: str = None):
+    """
+    Analyze the component graph of the current document locally, after a single download
+    
+    Args:
+        query: One of "summary", "topological_order", "cycles", "dangling_inputs", "orphans",
+            "upstream" or "downstream" ("summary" runs all document-wide queries)
+        component_id: Component to start from for "upstream" and "downstream"
+    
+    Returns:
+        Query results referencing the component ids returned by get_all_components
+    """
+    queries = ["summary", "topological_order", "cycles", "dangling_inputs", "orphans", "upstream", "downstream"]
+    if query not in queries:
+        return {
+            "success": False,
+            "error": f"Unknown query '{query}', expected one of: {', '.join(queries)}"
+        }
+    if query in ("upstream", "downstream") and not component_id:
+        return {
+            "success": False,
+            "error": f"Query '{query}' requires component_id"
+        }
+    
+    components_result = send_listing("get_all_components")
+    if not components_result or "result" not in components_result:
+        return components_result
+    connections_result = send_listing("get_connections")
+    if not connections_result or "result" not in connections_result:
+        return connections_result
+    connections = connections_result["result"] or []
+    document_mirror.load_connections(connections)
+    
+    graph = ComponentGraph(components_result["result"] or [], connections)
+    
+    if query in ("upstream", "downstream"):
+        if component_id not in graph.types:
+            return {
+                "success": False,
+                "error": f"Component {component_id} not found"
+            }
+        ids = graph.upstream(component_id) if query == "upstream" else graph.downstream(component_id)
+        return {
+            "success": True,
+            "result": {
+                "componentId": component_id,
+                query: [{"id": related_id, "type": graph.types[related_id]} for related_id in ids]
+            }
+        }
+    
+    result = {}
+    if query in ("summary", "topological_order"):
+        order = graph.topological_order()
+        result["topologicalOrder"] = order
+        result["isAcyclic"] = len(order) == len(graph.types)
+    if query in ("summary", "cycles"):
+        result["cycles"] = graph.cycles()
+    if query in ("summary", "dangling_inputs"):
+        result["danglingInputs"] = graph.dangling_inputs(_required_inputs)
+    if query in ("summary", "orphans"):
+        result["orphans"] = graph.orphans()
+    if query == "summary":
+        result["componentCount"] = len(graph.types)
+        result["connectionCount"] = graph.edge_count
+    
+    return {
+        "success": True,
+        "result": result
+    }
+
+def _capture_snapshot() -> Dict[str, Any]:
+    """Snapshot the current document, raising RuntimeError if it cannot be read"""
+    components_result = send_listing("get_all_components")
+    if not components_result or "result" not in components_result:
+        raise RuntimeError((components_result or {}).get("error") or "Could not read components")
+    connections_result = send_listing("get_connections")
+    if not connections_result or "result" not in connections_result:
+        raise RuntimeError((connections_result or {}).get("error") or "Could not read connections")
+    connections = connections_result["result"] or []
+    document_mirror.load_connections(connections)
+    return take_snapshot(components_result["result"] or [], connections)
+
+def _resolve_snapshot(key: Optional[str]) -> Dict[str, Any]:
+    """Snapshot by hash or label, or of the current document when key is None"""
+    if key is None:
+        snapshot = _capture_snapshot()
+        snapshot_store.put(snapshot)
+        return snapshot
+    snapshot = snapshot_store.get(key)
+    if snapshot is None:
+        raise RuntimeError(f"Unknown snapshot '{key}'")
+    return snapshot
+
+@server.tool("snapshot")
+def snapshot(label: str = None):
+    """
+    Store a compact, content-hashed snapshot of the current components and connections
+    
+    Args:
+        label: Optional name to refer to the snapshot by (e.g. "known-good")
+    
+    Returns:
+        Snapshot hash and size; identical documents always produce the same hash
+    """
+    try:
+        current = _capture_snapshot()
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}
+    snapshot_hash = snapshot_store.put(current, label)
+    return {
+        "success": True,
+        "result": {
+            "hash": snapshot_hash,
+            "label": label,
+            "components": len(current["components"]),
+            "connections": len(current["connections"])
+        }
+    }
+
+@server.tool("diff_snapshots")
+def diff_snapshots_tool(from_snapshot: str, to_snapshot: str = None):
+    """
+    Compute what changed between two snapshots
+    
+    Args:
+        from_snapshot: Hash or label of the earlier snapshot
+        to_snapshot: Hash or label of the later snapshot (omit to compare against the current document)
+    
+    Returns:
+        Added, removed, moved and re-valued components, and added, removed and rewired connections
+    """
+    try:
+        old = _resolve_snapshot(from_snapshot)
+        new = _resolve_snapshot(to_snapshot)
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}
+    return {
+        "success": True,
+        "result": diff_snapshots(old, new)
+    }
+
+@server.tool("apply_patch")
+def apply_patch(to_snapshot: str, from_snapshot: str = None, dry_run: bool = False):
+    """
+    Bring the document to a snapshot's state with the minimal command sequence
+    
+    Args:
+        to_snapshot: Hash or label of the snapshot to restore
+        from_snapshot: Hash or label of the state the document is in (omit to use the current document)
+        dry_run: Only return the planned commands
+    
+    Returns:
+        Planned commands, their results, and operations the plug-in cannot perform (removals)
+    """
+    try:
+        old = _resolve_snapshot(from_snapshot)
+        new = _resolve_snapshot(to_snapshot)
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}
+    
+    diff = diff_snapshots(old, new)
+    plan = plan_patch(diff)
+    result = {
+        "from": old["hash"],
+        "to": new["hash"],
+        "create": plan["create"],
+        "update": plan["update"],
+        "unsupported": plan["unsupported"]
+    }
+    if dry_run or is_empty_diff(diff):
+        return {"success": True, "result": result}
+    
+    # Re-create missing components first, then map their snapshot ids to the new ids
+    id_map = {}
+    create_responses = send_batch_to_grasshopper([{"type": c["type"], "parameters": c["parameters"]} for c in plan["create"]])
+    for command, response in zip(plan["create"], create_responses):
+        if response and response.get("success") and isinstance(response.get("result"), dict) and response["result"].get("id"):
+            id_map[command["snapshotId"]] = response["result"]["id"]
+            _register_added_component(response, command["parameters"]["type"])
+    
+    update_commands = remap_ids(plan["update"], id_map)
+    update_responses = send_batch_to_grasshopper(update_commands)
+    document_mirror.invalidate()
+    
+    failures = [
+        {"command": command, "error": (response or {}).get("error") or "Unknown error"}
+        for command, response in zip(plan["create"] + update_commands, create_responses + update_responses)
+        if not (response and response.get("success"))
+    ]
+    result["idMap"] = id_map
+    result["failures"] = failures
+    return {
+        "success": not failures and not plan["unsupported"],
+        "result": result
+    }
+
+@server.tool("capture_template")
+def capture_template(component_ids: List[str], name: str = None):
+    """
+    Save a set of components, their wiring and slider settings as a reusable template
+    
+    Args:
+        component_ids: IDs of the components to capture
+        name: Optional name to refer to the template by (e.g. "attractor-grid")
+    
+    Returns:
+        Template hash (equal sub-definitions always produce the same hash), its components
+        by index (the keys used by instantiate_template overrides) and the number of wires
+        to components outside the set, which are not captured
+    """
+    model = load_document_model(slider_settings=True)
+    if model is None:
+        return {"success": False, "error": "Could not read components"}
+    try:
+        template, info = build_template(model, component_ids)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    template_hash = template_store.put(template, name)
+    return {
+        "success": True,
+        "result": {
+            "hash": template_hash,
+            "name": name,
+            "components": [
+                {"index": index, "type": row[0], "sourceId": source_id, "value": row[3], "slider": row[4]}
+                for index, (row, source_id) in enumerate(zip(template["components"], info["sourceIds"]))
+            ],
+            "connections": len(template["connections"]),
+            "externalConnections": info["externalConnections"]
+        }
+    }
+
+@server.tool("list_templates")
+def list_templates():
+    """List saved templates with their names, component types and wire counts"""
+    return {
+        "success": True,
+        "result": template_store.list()
+    }
+
+@server.tool("instantiate_template")
+def instantiate_template(template: str, copies: int = 1, x: float = 0, y: float = 0, offset_x: float = None,
+                         offset_y: float = None, overrides: List[Dict[str, Any]] = None, transaction: bool = False):
+    """
+    Place copies of a saved template, with all components created in one batch and all
+    settings, values and wires applied in a second one
+    
+    Args:
+        template: Hash or name of the template
+        copies: Number of copies to place
+        x: X coordinate of the first copy's top-left component
+        y: Y coordinate of the first copy's top-left component
+        offset_x: Shift between copies along X (default 0)
+        offset_y: Shift between copies along Y (default: the template's height plus a gap)
+        overrides: Per copy, component index -> value, or {"value", "min", "max", "rounding"} for sliders;
+            a single entry applies to every copy
+        transaction: Recompute the definition once at the end instead of after every command, and
+            remove the created components again if anything fails
+    
+    Returns:
+        The new component IDs per copy (indexed like the template) and any failed commands
+    """
+    if transaction:
+        return run_in_transaction(lambda: instantiate_template(template, copies, x, y, offset_x, offset_y, overrides))
+    
+    stored = template_store.get(template)
+    if stored is None:
+        return {"success": False, "error": f"Unknown template '{template}'"}
+    offset = None
+    if offset_x is not None or offset_y is not None:
+        offset = (offset_x or 0, offset_y or 0)
+    try:
+        plan = plan_instances(stored, copies, (x, y), offset, overrides)
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
+    
+    id_map = {}
+    create_responses = send_batch_to_grasshopper([{"type": c["type"], "parameters": c["parameters"]} for c in plan["create"]])
+    for command, response in zip(plan["create"], create_responses):
+        if response and response.get("success") and isinstance(response.get("result"), dict) and response["result"].get("id"):
+            id_map[command["placeholder"]] = response["result"]["id"]
+            _register_added_component(response, command["parameters"]["type"])
+    
+    # Settings and wires of components that could not be created would fail anyway
+    update_commands = [
+        command for command in remap_ids(plan["update"], id_map)
+        if not any(str(command["parameters"].get(key, "")).startswith(PLACEHOLDER_PREFIX) for key in ("id", "sourceId", "targetId"))
+    ]
+    update_responses = send_batch_to_grasshopper(update_commands)
+    document_mirror.invalidate()
+    
+    failures = [
+        {"command": command, "error": (response or {}).get("error") or "Unknown error"}
+        for command, response in zip(plan["create"] + update_commands, create_responses + update_responses)
+        if not (response and response.get("success"))
+    ]
+    size = len(stored["components"])
+    instances = [
+        [id_map.get(command["placeholder"]) for command in plan["create"][copy * size:(copy + 1) * size]]
+        for copy in range(copies)
+    ]
+    return {
+        "success": not failures,
+        "result": {
+            "template": stored["hash"],
+            "instances": instances,
+            "commands": len(plan["create"]) + len(update_commands),
+            "failures": failures
+        }
+    }
 
 @server.tool("search_components")
 def search_components(query: str):
     """
-    Search for components by name or category
+    Search the component library by name, category or description
     
     Args:
         query: Search query
@@ -425,16 +2052,29 @@ def search_components(query: str):
     Returns:
         List of components matching the search query
     """
-    params = {
-        "query": query
-    }
+    terms = query.lower().split()
+    if not terms:
+        return {"success": False, "error": "Empty search query"}
     
-    return send_to_grasshopper("search_components", params)
+    matches = []
+    for category in get_component_library().get("categories", []):
+        for lib_component in category.get("components", []):
+            text = " ".join([category.get("name", ""), lib_component.get("name", ""),
+                             lib_component.get("fullName", ""), lib_component.get("description", "")]).lower()
+            if all(term in text for term in terms):
+                matches.append({
+                    "name": lib_component.get("name"),
+                    "fullName": lib_component.get("fullName"),
+                    "category": category.get("name"),
+                    "description": lib_component.get("description")
+                })
+    
+    return {"success": True, "result": matches}
 
 @server.tool("get_component_parameters")
 def get_component_parameters(component_type: str):
     """
-    Get a list of parameters for a specific component type
+    Get the input and output parameters of a component type from the component library
     
     Args:
         component_type: Type of component to get parameters for
@@ -442,11 +2082,18 @@ def get_component_parameters(component_type: str):
     Returns:
         List of input and output parameters for the component type
     """
-    params = {
-        "componentType": component_type
-    }
+    lib_component = find_library_component(normalize_component_type(component_type))
+    if lib_component is None:
+        return {"success": False, "error": f"Component type not in the component library: {component_type}"}
     
-    return send_to_grasshopper("get_component_parameters", params)
+    return {
+        "success": True,
+        "result": {
+            "name": lib_component.get("name"),
+            "inputs": lib_component.get("inputs", []),
+            "outputs": lib_component.get("outputs", [])
+        }
+    }
 
 @server.tool("validate_connection")
 def validate_connection(source_id: str, target_id: str, source_param: str = None, target_param: str = None):
@@ -475,117 +2122,192 @@ def validate_connection(source_id: str, target_id: str, source_param: str = None
     
     return send_to_grasshopper("validate_connection", params)
 
+STATUS_URI = "grasshopper://status"
+
+# MCP sessions subscribed to resource updates, and the watcher that notifies them
+resource_subscriptions = ResourceSubscriptions()
+
+def _watch_fingerprint() -> Optional[str]:
+    return document_fingerprint(priority=BACKGROUND)
+
+def _has_status_subscribers() -> bool:
+    # The watcher stops itself once every subscriber has gone away
+    return resource_subscriptions.count(STATUS_URI) > 0
+
+def _on_document_changed(fingerprint: str):
+    print(f"Grasshopper document changed ({fingerprint}), notifying subscribers", file=sys.stderr)
+    resource_subscriptions.notify(STATUS_URI)
+
+document_watcher = DocumentWatcher(
+    _watch_fingerprint,
+    _on_document_changed,
+    min_interval=float(os.environ.get("GRASSHOPPER_MCP_WATCH_MIN_INTERVAL", DEFAULT_MIN_INTERVAL)),
+    max_interval=float(os.environ.get("GRASSHOPPER_MCP_WATCH_MAX_INTERVAL", DEFAULT_MAX_INTERVAL)),
+    active=_has_status_subscribers
+)
+
+# FastMCP has no public API for resource subscriptions, so register them on the low-level server
+_lowlevel_server = server._mcp_server
+
+@_lowlevel_server.subscribe_resource()
+async def subscribe_resource(uri):
+    """Start watching the document when a session subscribes to grasshopper://status"""
+    session = _lowlevel_server.request_context.session
+    resource_subscriptions.subscribe(str(uri), session, asyncio.get_running_loop())
+    if str(uri) == STATUS_URI:
+        document_watcher.start()
+
+@_lowlevel_server.unsubscribe_resource()
+async def unsubscribe_resource(uri):
+    """Stop watching the document when the last subscriber leaves"""
+    resource_subscriptions.unsubscribe(str(uri), _lowlevel_server.request_context.session)
+    if resource_subscriptions.count(STATUS_URI) == 0:
+        document_watcher.stop()
+
+_get_capabilities = _lowlevel_server.get_capabilities
+
+def _get_capabilities_with_subscribe(*args, **kwargs):
+    # Advertise resource subscriptions, which the low-level server always reports as unsupported
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+_lowlevel_server.get_capabilities = _get_capabilities_with_subscribe
+
+# Last status built by get_grasshopper_status, reused while the document fingerprint is unchanged
+_status_cache: Dict[str, Any] = {"fingerprint": None, "status": None}
+_status_build_lock = threading.Lock()
+
+def _component_summary(model: DocumentModel, component) -> Dict[str, Any]:
+    """Status summary of one component: position, slider settings and connections"""
+    summary = {
+        "id": component.id,
+        "type": component.type or "",
+        "position": {
+            "x": component.x,
+            "y": component.y
+        }
+    }
+    
+    # Add component-specific parameter information
+    if component.type == "Number Slider":
+        summary["settings"] = component.slider_settings()
+    
+    # Add connection information summary
+    conn_summary = []
+    for conn in model.connections_of(component.id):
+        if conn.source_id == component.id:
+            conn_summary.append({
+                "type": "output",
+                "to": conn.target_id,
+                "sourceParam": conn.source_param or "",
+                "targetParam": conn.target_param or ""
+            })
+        else:
+            conn_summary.append({
+                "type": "input",
+                "from": conn.source_id,
+                "sourceParam": conn.source_param or "",
+                "targetParam": conn.target_param or ""
+            })
+    if conn_summary:
+        summary["connections"] = conn_summary
+    return summary
+
 # Register MCP resources
 @server.resource("grasshopper://status")
 def get_grasshopper_status():
     """Get Grasshopper status"""
     try:
-        # Get document information
-        doc_info = send_to_grasshopper("get_document_info")
-        
-        # Get all components (using enhanced get_all_components)
-        components_result = get_all_components()
-        components = components_result.get("result", []) if components_result else []
-        
-        # Get all connections
-        connections = send_to_grasshopper("get_connections")
-        
-        # Add hint information for commonly used components
-        component_hints = {
-            "Number Slider": {
-                "description": "Single numeric value slider with adjustable range",
-                "common_usage": "Use for single numeric inputs like radius, height, count, etc.",
-                "parameters": ["min", "max", "value", "rounding", "type"],
-                "NOT_TO_BE_CONFUSED_WITH": "MD Slider (which is for multi-dimensional values)"
-            },
-            "MD Slider": {
-                "description": "Multi-dimensional slider for vector input",
-                "common_usage": "Use for vector inputs, NOT for simple numeric values",
-                "NOT_TO_BE_CONFUSED_WITH": "Number Slider (which is for single numeric values)"
-            },
-            "Panel": {
-                "description": "Displays text or numeric data",
-                "common_usage": "Use for displaying outputs and debugging"
-            },
-            "Addition": {
-                "description": "Adds two or more numbers",
-                "common_usage": "Connect two Number Sliders to inputs A and B",
-                "parameters": ["A", "B"],
-                "connection_tip": "First slider should connect to input A, second to input B"
-            }
-        }
+        # Reuse the previous status when the document has not changed
+        fingerprint = document_fingerprint()
+        if fingerprint is not None and fingerprint == _status_cache["fingerprint"]:
+            return _status_cache["status"]
+        # ... or the status another bridge process built for the same document
+        if fingerprint is not None and shared_cache is not None:
+            status = shared_cache.get(_shared_key("status", fingerprint))
+            if status is not None:
+                _status_cache["fingerprint"] = fingerprint
+                _status_cache["status"] = status
+                return status
         
-        # Add current parameter value summary for each component
-        component_summaries = []
-        for component in components:
-            summary = {
-                "id": component.get("id", ""),
-                "type": component.get("type", ""),
-                "position": {
-                    "x": component.get("x", 0),
-                    "y": component.get("y", 0)
-                }
-            }
+        # Build one status at a time: sessions asking concurrently wait for it instead of rebuilding it
+        with _status_build_lock:
+            if fingerprint is not None and fingerprint == _status_cache["fingerprint"]:
+                return _status_cache["status"]
             
-            # Add component-specific parameter information
-            if "currentSettings" in component:
-                summary["settings"] = component["currentSettings"]
-            elif component.get("type") == "Number Slider":
-                # Try to extract slider settings from component information
-                summary["settings"] = {
-                    "min": component.get("min", 0),
-                    "max": component.get("max", 10),
-                    "value": component.get("value", 5),
-                    "rounding": component.get("rounding", 0.1)
+            # Get document information
+            doc_info = send_to_grasshopper("get_document_info")
+            
+            # Read components and connections once into compact models
+            model = load_document_model() or DocumentModel([], [])
+            
+            # Add hint information for commonly used components
+            component_hints = {
+                "Number Slider": {
+                    "description": "Single numeric value slider with adjustable range",
+                    "common_usage": "Use for single numeric inputs like radius, height, count, etc.",
+                    "parameters": ["min", "max", "value", "rounding", "type"],
+                    "NOT_TO_BE_CONFUSED_WITH": "MD Slider (which is for multi-dimensional values)"
+                },
+                "MD Slider": {
+                    "description": "Multi-dimensional slider for vector input",
+                    "common_usage": "Use for vector inputs, NOT for simple numeric values",
+                    "NOT_TO_BE_CONFUSED_WITH": "Number Slider (which is for single numeric values)"
+                },
+                "Panel": {
+                    "description": "Displays text or numeric data",
+                    "common_usage": "Use for displaying outputs and debugging"
+                },
+                "Addition": {
+                    "description": "Adds two or more numbers",
+                    "common_usage": "Connect two Number Sliders to inputs A and B",
+                    "parameters": ["A", "B"],
+                    "connection_tip": "First slider should connect to input A, second to input B"
                 }
+            }
             
-            # Add connection information summary
-            if "connections" in component:
-                conn_summary = []
-                for conn in component["connections"]:
-                    if conn.get("sourceId") == component.get("id"):
-                        conn_summary.append({
-                            "type": "output",
-                            "to": conn.get("targetId", ""),
-                            "sourceParam": conn.get("sourceParam", ""),
-                            "targetParam": conn.get("targetParam", "")
-                        })
-                    else:
-                        conn_summary.append({
-                            "type": "input",
-                            "from": conn.get("sourceId", ""),
-                            "sourceParam": conn.get("sourceParam", ""),
-                            "targetParam": conn.get("targetParam", "")
-                        })
-                
-                if conn_summary:
-                    summary["connections"] = conn_summary
+            status = {
+                "status": "Connected to Grasshopper",
+                "document": doc_info.get("result", {}),
+                "component_hints": component_hints,
+                "recommendations": [
+                    "When needing a simple numeric input control, ALWAYS use 'Number Slider', not MD Slider",
+                    "For vector inputs (like 3D points), use 'MD Slider' or 'Construct Point' with multiple Number Sliders",
+                    "Use 'Panel' to display outputs and debug values",
+                    "When connecting multiple sliders to Addition, first slider goes to input A, second to input B"
+                ],
+                "canvas_summary": f"Current canvas has {len(model.components)} components and {len(model.connections)} connections"
+            }
             
-            component_summaries.append(summary)
-        
-        return {
-            "status": "Connected to Grasshopper",
-            "document": doc_info.get("result", {}),
-            "components": component_summaries,
-            "connections": connections.get("result", []),
-            "component_hints": component_hints,
-            "recommendations": [
-                "When needing a simple numeric input control, ALWAYS use 'Number Slider', not MD Slider",
-                "For vector inputs (like 3D points), use 'MD Slider' or 'Construct Point' with multiple Number Sliders",
-                "Use 'Panel' to display outputs and debug values",
-                "When connecting multiple sliders to Addition, first slider goes to input A, second to input B"
-            ],
-            "canvas_summary": f"Current canvas has {len(component_summaries)} components and {len(connections.get('result', []))} connections"
-        }
+            # Serialize once, straight from the models: each component summary and connection is
+            # encoded as it is built instead of materializing the whole list of dicts first
+            encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+            status = "".join([
+                encode(status)[:-1],
+                ',"components":[',
+                ",".join(encode(_component_summary(model, component)) for component in model.components.values()),
+                '],"connections":[',
+                ",".join(encode(conn.to_wire()) for conn in model.connections),
+                "]}"
+            ])
+            if fingerprint is not None:
+                _status_cache["fingerprint"] = fingerprint
+                _status_cache["status"] = status
+                if shared_cache is not None:
+                    shared_cache.put(_shared_key("status", fingerprint), status)
+            return status
     except Exception as e:
         print(f"Error getting Grasshopper status: {str(e)}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
-        return {
+        # Same type as a successful status: a JSON string
+        return json.dumps({
             "status": f"Error: {str(e)}",
             "document": {},
             "components": [],
             "connections": []
-        }
+        })
 
 @server.resource("grasshopper://component_guide")
 def get_component_guide():
@@ -1047,13 +2769,119 @@ def get_component_library():
         ]
     }
 
+@server.resource("grasshopper://scheduler")
+def get_scheduler_metrics():
+    """Get command scheduler metrics: in-flight commands, queue depth and wait times per priority class"""
+    return command_scheduler.metrics()
+
+@server.resource("grasshopper://shared-cache")
+def get_shared_cache_stats():
+    """Get shared cache statistics: hits, misses, stores, evictions and entry count"""
+    if shared_cache is None:
+        return {"enabled": False}
+    return dict(shared_cache.stats(), enabled=True)
+
+@server.resource("grasshopper://sessions")
+def get_session_status():
+    """Get the number of MCP sessions served by this process and the document lock state"""
+    if session_runner is None:
+        return {"sessions": 1, "documentLock": document_lock.status()}
+    return session_runner.status()
+
+@server.resource("grasshopper://profile")
+def get_profile_summary():
+    """Get the profiling summary: call times per tool and resource, and the hottest functions"""
+    if tool_profiler is None:
+        return {"enabled": False}
+    return dict(tool_profiler.summary(), enabled=True)
+
 def main():
     """Main entry point for the Grasshopper MCP Bridge Server"""
+    global traffic_recorder, tool_profiler, session_runner
+    parser = argparse.ArgumentParser(prog="grasshopper-mcp", description="Grasshopper MCP Bridge Server")
+    parser.add_argument("--record", metavar="PATH", default=os.environ.get("GRASSHOPPER_MCP_RECORD"),
+                        help="Append every command sent to Grasshopper, with sizes and timings, to a JSONL log")
+    parser.add_argument("--profile", metavar="DIR", default=os.environ.get("GRASSHOPPER_MCP_PROFILE"),
+                        help="Profile every tool and resource call and write one profile file per call to DIR")
+    parser.add_argument("--profile-mode", choices=PROFILE_MODES,
+                        default=os.environ.get("GRASSHOPPER_MCP_PROFILE_MODE", "pstats"),
+                        help="pstats: deterministic cProfile files; sampling: folded-stack (.collapsed) files")
+    parser.add_argument("--profile-max-mb", type=float,
+                        default=float(os.environ.get("GRASSHOPPER_MCP_PROFILE_MAX_MB", DEFAULT_PROFILE_MAX_BYTES / 2**20)),
+                        help="Delete the oldest profile files beyond this total size")
+    parser.add_argument("--transport", choices=("stdio", "sse", "streamable-http"),
+                        default=os.environ.get("GRASSHOPPER_MCP_TRANSPORT", "stdio"),
+                        help="stdio serves one session; sse and streamable-http serve many sessions over HTTP")
+    parser.add_argument("--mcp-host", default=os.environ.get("GRASSHOPPER_MCP_HTTP_HOST", "127.0.0.1"),
+                        help="Listen address for the sse / streamable-http transports")
+    parser.add_argument("--mcp-port", type=int, default=int(os.environ.get("GRASSHOPPER_MCP_HTTP_PORT", 8000)),
+                        help="Listen port for the sse / streamable-http transports")
+    parser.add_argument("--session-workers", type=int,
+                        default=int(os.environ.get("GRASSHOPPER_MCP_SESSION_WORKERS", DEFAULT_SESSION_WORKERS)),
+                        help="Tool calls executed at once across all sessions (sse / streamable-http)")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    replay_parser = subparsers.add_parser("replay", help="Re-drive a recorded session and report latency")
+    replay_parser.add_argument("log", help="Log written with --record")
+    replay_parser.add_argument("--host", default=GRASSHOPPER_HOST)
+    replay_parser.add_argument("--port", type=int, default=GRASSHOPPER_PORT)
+    replay_parser.add_argument("--speed", default="1", help="Time scale for recorded gaps: 1, 10 (or 10x), or max")
+    replay_parser.add_argument("--concurrency", type=int, default=1, help="Commands in flight at once")
+    replay_parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    
+    emulate_parser = subparsers.add_parser("emulate", help="Run a stand-in Grasshopper MCP server")
+    emulate_parser.add_argument("--host", default=GRASSHOPPER_HOST)
+    emulate_parser.add_argument("--port", type=int, default=GRASSHOPPER_PORT)
+    emulate_parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed time spent per command")
+    
+    http_parser = subparsers.add_parser("serve-http", help="Serve the tools as an HTTP/JSON API for scripts")
+    http_parser.add_argument("--host", default="127.0.0.1")
+    http_parser.add_argument("--port", type=int, default=8090)
+    http_parser.add_argument("--workers", type=int, default=8, help="HTTP requests executed at once")
+    http_parser.add_argument("--allow-command", action="append", default=[], metavar="TYPE",
+                             help="Also accept this raw plug-in command on /command and /batch (repeatable)")
+    http_parser.add_argument("--allow-any-command", action="store_true",
+                             help="Accept every raw plug-in command, including ones that change or save the document")
+    
+    args = parser.parse_args()
+    
+    if args.command == "replay":
+        if args.concurrency < 1:
+            replay_parser.error("--concurrency must be at least 1")
+        from grasshopper_mcp.replay import run_replay
+        sys.exit(run_replay(args.log, args.host, args.port, speed=args.speed, concurrency=args.concurrency, as_json=args.json))
+    if args.command == "emulate":
+        from grasshopper_mcp.emulator import run_emulator
+        sys.exit(run_emulator(args.host, args.port, latency_ms=args.latency_ms))
+    
     try:
+        if args.record:
+            traffic_recorder = TrafficRecorder(args.record)
+            print(f"Recording Grasshopper traffic to {args.record}", file=sys.stderr)
+        if args.profile:
+            tool_profiler = ToolProfiler(args.profile, mode=args.profile_mode, max_bytes=int(args.profile_max_mb * 2**20))
+            count = tool_profiler.instrument(server, exclude=("grasshopper://profile",))
+            print(f"Profiling {count} tools and resources ({args.profile_mode}) to {args.profile}", file=sys.stderr)
+        
+        if args.command == "serve-http":
+            from grasshopper_mcp.http_gateway import run_gateway, DEFAULT_ALLOWED_COMMANDS
+            allowed_commands = None if args.allow_any_command else DEFAULT_ALLOWED_COMMANDS.union(args.allow_command)
+            sys.exit(run_gateway(server, send_to_grasshopper, track_commands, args.host, args.port, workers=args.workers,
+                                 run_transaction=run_in_transaction, allowed_commands=allowed_commands))
+        
+        if args.transport != "stdio":
+            # Must come after the profiler: session wrappers go outside the profiling ones (see grasshopper_mcp.wrappers)
+            session_runner = SessionRunner(server, document_lock, is_read_only_tool, workers=args.session_workers,
+                                           on_session_end=_on_session_end)
+            session_runner.install()
+            server.settings.host = args.mcp_host
+            server.settings.port = args.mcp_port
+            print(f"Serving MCP sessions over {args.transport} on {args.mcp_host}:{args.mcp_port}", file=sys.stderr)
+        
         # Start MCP server
         print("Starting Grasshopper MCP Bridge Server...", file=sys.stderr)
         print("Please add this MCP server to Claude Desktop", file=sys.stderr)
-        server.run()
+        server.run(transport=args.transport)
     except Exception as e:
         print(f"Error starting MCP server: {str(e)}", file=sys.stderr)
         traceback.print_exc(file=sys.stderr)
@@ -0,0 +1,470 @@
+"""
+Stand-in Grasshopper MCP server for load tests and latency regression runs
+
+Speaks the plug-in's wire protocol (one newline-terminated JSON command per
+TCP connection) and keeps an in-memory document. Commands are executed one at
+a time, like the plug-in does on Rhino's UI thread, with an optional fixed
+latency per command.
+"""
+
+import hashlib
+import json
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Any, Callable, Optional
+
+from grasshopper_mcp.models import CLASS_TYPE_NAMES
+from grasshopper_mcp.packing import unpack_array
+
+# Input parameter names for common component types; any other component gets a single "Input"
+EMULATED_INPUTS = {
+    "Addition": ["A", "B"],
+    "Subtraction": ["A", "B"],
+    "Multiplication": ["A", "B"],
+    "Division": ["A", "B"],
+    "Math": ["A", "B"],
+    "Circle": ["Plane", "Radius"],
+    "Construct Point": ["X", "Y", "Z"],
+    "Line": ["Start", "End"],
+    "Extrude": ["Base", "Direction", "Height"],
+    "Box": ["Base", "X Size", "Y Size", "Z Size"],
+    "XY Plane": ["Origin"],
+}
+
+# Types added as floating parameters: the object is its own single input and output port
+EMULATED_PARAMS = {
+    "Number Slider", "MD Slider", "Panel", "Boolean Toggle", "Button", "Value List", "Colour Swatch",
+    "Number", "Integer", "Boolean", "Text", "Point", "Vector", "Plane", "Curve", "Surface", "Brep", "Mesh",
+    "Geometry", "Data",
+}
+
+# Library name -> class name the plug-in reports as "type" (GetType().Name)
+_CLASS_NAMES = {name: class_name for class_name, name in CLASS_TYPE_NAMES.items()}
+
+# Seconds after which an open transaction is rolled back, as in the plug-in
+DEFAULT_TRANSACTION_TIMEOUT = 300.0
+
+# Arithmetic components the emulator can evaluate, with their single "Result" output
+EMULATED_OPERATIONS = {
+    "Addition": lambda a, b: a + b,
+    "Subtraction": lambda a, b: a - b,
+    "Multiplication": lambda a, b: a * b,
+    "Division": lambda a, b: a / b,
+}
+
+
+class EmulatedDocument:
+    """In-memory Grasshopper document driven by plug-in commands"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.components: Dict[str, Dict[str, Any]] = {}
+        # (target id, target param) -> connection dict
+        self.connections: Dict[Any, Dict[str, Any]] = {}
+        self.solutions = 0
+        # Open transaction: {"id", "started", "expires", "added": [component ids], "deferred": solutions held back}
+        self.transaction: Optional[Dict[str, Any]] = None
+        self.command_counts: Dict[str, int] = {}
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "add_component": self.add_component,
+            "connect_components": self.connect_components,
+            "set_component_value": self.set_component_value,
+            "set_component_position": self.set_component_position,
+            "get_component_info": self.get_component_info,
+            "create_point": self.create_point,
+            "create_geometry_bulk": self.create_geometry_bulk,
+            "get_all_components": self.get_all_components,
+            "get_connections": self.get_connections,
+            "get_document_info": self.get_document_info,
+            "get_document_fingerprint": self.get_document_fingerprint,
+            "clear_document": self.clear_document,
+            "save_document": lambda params: self._disabled("SaveDocument", "save"),
+            "load_document": lambda params: self._disabled("LoadDocument", "load"),
+            "begin_transaction": self.begin_transaction,
+            "commit_transaction": lambda params: self.finish_transaction(params.get("transactionId"), rollback=False),
+            "rollback_transaction": lambda params: self.finish_transaction(params.get("transactionId"), rollback=True),
+            "get_transaction_status": self.get_transaction_status,
+        }
+
+    def execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one command and build a plug-in style response"""
+        command_type = command.get("type")
+        params = command.get("parameters") or {}
+        with self.lock:
+            # The plug-in rolls back on a timer; here it happens at the next command
+            self._expire_transaction()
+        if command_type == "batch":
+            # A transactional batch joins an open transaction, or runs in its own
+            owns_transaction = False
+            if params.get("transaction"):
+                with self.lock:
+                    if self.transaction is None:
+                        self.begin_transaction({})
+                        owns_transaction = True
+                        transaction_id = self.transaction["id"]
+            results = []
+            for sub_command in params.get("commands", []):
+                if sub_command.get("type") == "batch":
+                    result = {"success": False, "data": None, "error": "Nested batch commands are not supported"}
+                else:
+                    result = self.execute(sub_command)
+                results.append(result)
+                if (params.get("stopOnError") or owns_transaction) and not result["success"]:
+                    break
+            failed = sum(1 for result in results if not result["success"])
+            transaction = None
+            if owns_transaction:
+                with self.lock:
+                    transaction = self.finish_transaction(transaction_id, rollback=failed > 0)
+            return {
+                "success": True,
+                "data": {
+                    "results": results,
+                    "succeeded": len(results) - failed,
+                    "failed": failed,
+                    "transaction": transaction
+                }
+            }
+
+        handler = self.handlers.get(command_type)
+        if handler is None:
+            return {"success": False, "data": None, "error": f"No handler registered for command type '{command_type}'"}
+        # Plug-in handlers all run serially on the UI thread
+        with self.lock:
+            self.command_counts[command_type] = self.command_counts.get(command_type, 0) + 1
+            if self.latency:
+                time.sleep(self.latency)
+            try:
+                return {"success": True, "data": handler(params), "error": None}
+            except (KeyError, ValueError, RuntimeError) as e:
+                return {"success": False, "data": None, "error": f"Error executing command '{command_type}': {str(e)}"}
+
+    def _component(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component_id = params.get("id") or params.get("componentId")
+        if component_id not in self.components:
+            raise KeyError(f"Component with ID {component_id} not found")
+        return self.components[component_id]
+
+    def _new_solution(self):
+        if self.transaction is not None:
+            self.transaction["deferred"] += 1
+        else:
+            self.solutions += 1
+
+    def _create_component(self, params, floating: Optional[bool] = None):
+        if not params.get("type"):
+            raise ValueError("Component type is required")
+        component_id = str(uuid.uuid4())
+        component_type = params["type"]
+        if floating is None:
+            floating = component_type in EMULATED_PARAMS
+        if floating:
+            class_name = _CLASS_NAMES.get(component_type, "Param_" + component_type.replace(" ", ""))
+        else:
+            # Stand-in for the component's class name, which only the plug-in knows
+            class_name = "Component_" + component_type.replace(" ", "")
+        self.components[component_id] = {
+            "id": component_id,
+            "type": class_name,
+            "componentName": component_type,
+            "name": component_type,
+            "x": float(params.get("x") or 0),
+            "y": float(params.get("y") or 0),
+            # Floating parameters have no input list: they are their own port
+            "inputs": None if floating else list(EMULATED_INPUTS.get(component_type, ["Input"])),
+            "value": None,
+        }
+        if component_type == "Number Slider":
+            # The plug-in always reports a slider's range
+            self.components[component_id].update(minimum=0.0, maximum=10.0, rounding=0.1)
+        if self.transaction is not None:
+            self.transaction["added"].append(component_id)
+        return self.components[component_id]
+
+    def add_component(self, params):
+        component = self._create_component(params)
+        self._new_solution()
+        return {key: component[key] for key in ("id", "type", "name", "x", "y")}
+
+    def connect_components(self, params):
+        source = self._component({"id": params.get("sourceId")})
+        target = self._component({"id": params.get("targetId")})
+        inputs = target["inputs"]
+        target_param = params.get("targetParam")
+        if inputs is None:
+            # Like the plug-in, a floating parameter is the port whatever name is given
+            target_param = target["componentName"]
+            inputs = [target_param]
+        elif target_param is None:
+            index = params.get("targetParamIndex")
+            if index is not None:
+                target_param = inputs[int(index)]
+            elif len(inputs) == 1:
+                target_param = inputs[0]
+            else:
+                raise ValueError("Target parameter not found")
+        if target_param not in inputs:
+            raise ValueError(f"Target parameter not found: {target_param}")
+        if source["inputs"] is None:
+            source_param = source["componentName"]
+        elif source["componentName"] in EMULATED_OPERATIONS:
+            source_param = "Result"
+        else:
+            source_param = params.get("sourceParam") or "Output"
+        connection = {
+            "sourceId": source["id"],
+            "sourceParam": source_param,
+            "targetId": target["id"],
+            "targetParam": target_param,
+        }
+        self.connections[(target["id"], target_param)] = connection
+        self._new_solution()
+        return dict(connection, success=True, message="Connection created successfully")
+
+    def set_component_value(self, params):
+        component = self._component(params)
+        packed = params.get("packed")
+        if packed is None:
+            if component["componentName"] == "Number Slider":
+                for key in ("minimum", "maximum"):
+                    if params.get(key) is not None:
+                        component[key] = float(params[key])
+                if params.get("decimals") is not None:
+                    component["rounding"] = 10.0 ** -int(params["decimals"])
+            if "value" in params:
+                component["value"] = params.get("value")
+            if params.get("final", True):
+                self._new_solution()
+            return {"id": component["id"], "type": component["type"], "value": component["value"]}
+        values = unpack_array(packed).ravel().tolist()
+        if component["componentName"] == "Number Slider" and len(values) != 1:
+            raise ValueError("A slider takes exactly one value")
+        if params.get("append") and isinstance(component["value"], list):
+            component["value"] = component["value"] + values
+        else:
+            component["value"] = values
+        if params.get("final", True):
+            self._new_solution()
+        return {"id": component["id"], "type": component["type"], "count": len(values)}
+
+    def set_component_position(self, params):
+        component = self._component(params)
+        component["x"], component["y"] = float(params.get("x") or 0), float(params.get("y") or 0)
+        return {"id": component["id"], "x": component["x"], "y": component["y"]}
+
+    def create_point(self, params):
+        return {"id": str(uuid.uuid4()), "x": params.get("x", 0), "y": params.get("y", 0), "z": params.get("z", 0)}
+
+    def create_geometry_bulk(self, params):
+        kind = params.get("kind", "point")
+        points = unpack_array(params["points"]).reshape(-1, 3)
+        if kind == "circle":
+            count = len(points)
+        elif kind == "curve":
+            counts = unpack_array(params["counts"])
+            if int(counts.sum()) != len(points):
+                raise ValueError("Vertex counts do not add up to the number of points")
+            count = len(counts)
+        elif kind == "point":
+            count = len(points)
+        else:
+            raise ValueError(f"Unsupported geometry kind: {kind}")
+        if params.get("targetId"):
+            component = self._component({"id": params["targetId"]})
+        else:
+            component = self._create_component({"type": kind.capitalize(), "x": params.get("x"), "y": params.get("y")}, floating=True)
+            component["value"] = 0
+        start = component["value"] or 0
+        component["value"] = start + count
+        if params.get("final", True):
+            self._new_solution()
+        return {"id": component["id"], "kind": kind, "start": start, "count": count}
+
+    def get_component_info(self, params):
+        component = self._component(params)
+        info = {key: component[key] for key in ("id", "type", "componentName", "name", "value")}
+        if component["inputs"] is not None:
+            info["inputs"] = [{"name": name} for name in component["inputs"]]
+        for key in ("minimum", "maximum", "rounding"):
+            if key in component:
+                info[key] = component[key]
+        if component["componentName"] in EMULATED_OPERATIONS:
+            output = {"name": "Result"}
+            if params.get("includeData"):
+                value = self._evaluate(component["id"], set())
+                output["data"] = [] if value is None else [value]
+                output["count"] = len(output["data"])
+            info["outputs"] = [output]
+        return info
+
+    def _evaluate(self, component_id: str, visiting: set):
+        """Value flowing out of a component: sliders and panels hold one, arithmetic components compute one"""
+        component = self.components[component_id]
+        if component["componentName"] not in EMULATED_OPERATIONS:
+            try:
+                return float(component["value"])
+            except (TypeError, ValueError):
+                return component["value"]
+        if component_id in visiting:
+            return None
+        visiting = visiting | {component_id}
+        operands = []
+        for name in component["inputs"]:
+            connection = self.connections.get((component_id, name))
+            value = self._evaluate(connection["sourceId"], visiting) if connection else None
+            if not isinstance(value, (int, float)):
+                return None
+            operands.append(value)
+        try:
+            return EMULATED_OPERATIONS[component["componentName"]](*operands)
+        except ZeroDivisionError:
+            return None
+
+    def get_all_components(self, params):
+        listing = []
+        for component in self.components.values():
+            row = {key: component[key] for key in ("id", "type", "componentName", "name", "x", "y")}
+            # The plug-in lists values (and ranges) of sliders and panels only
+            if component["componentName"] in ("Number Slider", "Panel"):
+                for key in ("value", "minimum", "maximum", "rounding"):
+                    if key in component:
+                        row[key] = component[key]
+            listing.append(row)
+        return listing
+
+    def get_connections(self, params):
+        return list(self.connections.values())
+
+    def get_document_info(self, params):
+        return {
+            "name": "emulated",
+            "path": None,
+            "componentCount": len(self.components),
+            "components": [{key: component[key] for key in ("id", "type", "name")} for component in self.components.values()],
+            "solutionCount": self.solutions,
+        }
+
+    def get_document_fingerprint(self, params):
+        state = json.dumps(
+            [sorted((c["id"], c["x"], c["y"], str(c["value"])) for c in self.components.values()),
+             sorted((c["sourceId"], c["targetId"], c["targetParam"]) for c in self.connections.values())]
+        )
+        return {
+            "componentCount": len(self.components),
+            "connectionCount": len(self.connections),
+            "hash": hashlib.sha256(state.encode("utf-8")).hexdigest()[:16],
+        }
+
+    def clear_document(self, params):
+        self.components.clear()
+        self.connections.clear()
+        self._new_solution()
+        return {"message": "Document cleared"}
+
+    def _disabled(self, handler: str, action: str):
+        """The plug-in's save_document and load_document only report that they are disabled"""
+        return {
+            "success": False,
+            "message": f"{handler} is temporarily disabled due to API compatibility issues. Please {action} the document manually."
+        }
+
+    def begin_transaction(self, params):
+        if self.transaction is not None:
+            raise RuntimeError(f"Transaction {self.transaction['id']} is already open")
+        timeout = float(params.get("timeoutSeconds", DEFAULT_TRANSACTION_TIMEOUT))
+        if timeout <= 0:
+            raise ValueError("timeoutSeconds must be positive")
+        started = time.monotonic()
+        self.transaction = {"id": uuid.uuid4().hex[:12], "started": started, "expires": started + timeout, "added": [], "deferred": 0}
+        return {"transactionId": self.transaction["id"], "timeoutSeconds": timeout}
+
+    def _expire_transaction(self):
+        if self.transaction is not None and time.monotonic() >= self.transaction["expires"]:
+            print(f"Transaction {self.transaction['id']} timed out, rolling back", file=sys.stderr)
+            self.finish_transaction(self.transaction["id"], rollback=True)
+
+    def finish_transaction(self, transaction_id: Optional[str], rollback: bool):
+        """Commit (one solution for all deferred ones) or roll back (remove the components added in it)"""
+        transaction = self.transaction
+        if transaction is None:
+            raise RuntimeError("No transaction is open")
+        if transaction_id and transaction_id != transaction["id"]:
+            raise RuntimeError(f"Transaction {transaction_id} is not open (open transaction: {transaction['id']})")
+        self.transaction = None
+        removed = 0
+        if rollback:
+            for component_id in transaction["added"]:
+                if self.components.pop(component_id, None) is not None:
+                    removed += 1
+            self.connections = {
+                key: connection for key, connection in self.connections.items()
+                if connection["sourceId"] in self.components and connection["targetId"] in self.components
+            }
+        solved = transaction["deferred"] > 0 or removed > 0
+        if solved:
+            self._new_solution()
+        return {
+            "transactionId": transaction["id"],
+            "committed": not rollback,
+            "rolledBack": rollback,
+            "addedComponents": len(transaction["added"]),
+            "removedComponents": removed,
+            "deferredSolutions": transaction["deferred"],
+            "solutions": 1 if solved else 0,
+            "seconds": time.monotonic() - transaction["started"],
+        }
+
+    def get_transaction_status(self, params):
+        transaction = self.transaction
+        return {
+            "active": transaction is not None,
+            "transactionId": transaction["id"] if transaction else None,
+            "addedComponents": len(transaction["added"]) if transaction else 0,
+            "deferredSolutions": transaction["deferred"] if transaction else 0,
+            "seconds": time.monotonic() - transaction["started"] if transaction else 0.0,
+            "expiresInSeconds": max(0.0, transaction["expires"] - time.monotonic()) if transaction else 0.0,
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            return
+        try:
+            command = json.loads(line.decode("utf-8"))
+            response = self.server.document.execute(command)
+        except ValueError as e:
+            response = {"success": False, "data": None, "error": f"Server error: {str(e)}"}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+class EmulatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "localhost", port: int = 8080, latency: float = 0.0):
+        self.document = EmulatedDocument(latency=latency)
+        super().__init__((host, port), _Handler)
+
+    def start_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="grasshopper-emulator", daemon=True)
+        thread.start()
+        return thread
+
+
+def run_emulator(host: str = "localhost", port: int = 8080, latency_ms: float = 0.0) -> int:
+    """Entry point for `grasshopper-mcp emulate`"""
+    emulator = EmulatorServer(host, port, latency=latency_ms / 1000.0)
+    print(f"Grasshopper emulator listening on {host}:{emulator.server_address[1]}", file=sys.stderr)
+    try:
+        emulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.server_close()
+    return 0
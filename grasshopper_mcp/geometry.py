@@ -0,0 +1,81 @@
+"""
+Encoding of point, circle and curve arrays for create_geometry_bulk
+"""
+
+from typing import Dict, Any, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from grasshopper_mcp.packing import pack_array, unpack_array
+
+GEOMETRY_KINDS = ("point", "circle", "curve")
+
+# Geometry items per create_geometry_bulk request
+DEFAULT_GEOMETRY_CHUNK = 10000
+
+
+def as_points(points: Any) -> np.ndarray:
+    """Coerce an N x 2 or N x 3 coordinate array, packed block or single point to N x 3 float64"""
+    if isinstance(points, dict):
+        points = unpack_array(points)
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 1:
+        points = points.reshape(1, -1)
+    if points.ndim != 2 or points.shape[1] not in (2, 3):
+        raise ValueError(f"Points must be an N x 3 (or N x 2) array, got shape {list(points.shape)}")
+    if points.shape[1] == 2:
+        points = np.hstack([points, np.zeros((len(points), 1))])
+    return np.ascontiguousarray(points)
+
+
+def geometry_chunks(kind: str, points: Any = None, radii: Any = None, curves: Optional[Sequence[Any]] = None,
+                    chunk_items: int = DEFAULT_GEOMETRY_CHUNK) -> Iterator[Dict[str, Any]]:
+    """
+    Split geometry into create_geometry_bulk parameter sets of at most chunk_items items
+
+    Args:
+        kind: "point", "circle" or "curve"
+        points: N x 3 point coordinates or circle centers
+        radii: One radius for every circle, or one per center
+        curves: One vertex array (M x 3) per curve
+        chunk_items: Maximum number of items per chunk
+
+    Yields:
+        {"kind", "points", "radii"?, "counts"?} with packed arrays, in order
+    """
+    if kind not in GEOMETRY_KINDS:
+        raise ValueError(f"Unsupported geometry kind: {kind} (expected {', '.join(GEOMETRY_KINDS)})")
+    chunk_items = max(1, chunk_items)
+
+    if kind == "curve":
+        if not curves:
+            raise ValueError("Curves require a list of vertex arrays")
+        polylines: List[np.ndarray] = [as_points(curve) for curve in curves]
+        for i, polyline in enumerate(polylines):
+            if len(polyline) < 2:
+                raise ValueError(f"Curve {i} needs at least 2 vertices")
+        for start in range(0, len(polylines), chunk_items):
+            chunk = polylines[start:start + chunk_items]
+            yield {
+                "kind": kind,
+                "points": pack_array(np.concatenate(chunk)),
+                "counts": pack_array(np.array([len(polyline) for polyline in chunk], dtype=np.int32), dtype="int32"),
+            }
+        return
+
+    if points is None:
+        raise ValueError("Points are required")
+    centers = as_points(points)
+    if kind == "circle":
+        if radii is None:
+            raise ValueError("Circles require radii")
+        radii = np.asarray(unpack_array(radii) if isinstance(radii, dict) else radii, dtype=np.float64).ravel()
+        if len(radii) not in (1, len(centers)):
+            raise ValueError(f"Expected 1 or {len(centers)} radii, got {len(radii)}")
+        if (radii <= 0).any():
+            raise ValueError("Radii must be greater than 0")
+    for start in range(0, len(centers), chunk_items):
+        chunk = {"kind": kind, "points": pack_array(centers[start:start + chunk_items])}
+        if kind == "circle":
+            chunk["radii"] = pack_array(radii if len(radii) == 1 else radii[start:start + chunk_items])
+        yield chunk
@@ -0,0 +1,152 @@
+"""
+Linear-time analytics over the component / connection graph of a Grasshopper document
+"""
+
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Iterable
+
+from grasshopper_mcp.models import component_type_name
+
+
+class ComponentGraph:
+    """
+    Directed graph of components (nodes) and wires (edges from source to target)
+
+    Built once from the get_all_components and get_connections results; every
+    query runs in O(V + E).
+    """
+
+    def __init__(self, components: Iterable[Dict[str, Any]], connections: Iterable[Dict[str, Any]]):
+        self.types: Dict[str, Optional[str]] = {}
+        for component in components:
+            component_id = component.get("id")
+            if component_id:
+                self.types[component_id] = component_type_name(component)
+
+        self.successors: Dict[str, List[str]] = {component_id: [] for component_id in self.types}
+        self.predecessors: Dict[str, List[str]] = {component_id: [] for component_id in self.types}
+        # component id -> names of connected input parameters
+        self.connected_inputs: Dict[str, set] = {}
+        self.edge_count = 0
+        for conn in connections:
+            source_id, target_id = conn.get("sourceId"), conn.get("targetId")
+            if not source_id or not target_id:
+                continue
+            # Wires may reference components missing from the listing; keep them as untyped nodes
+            for component_id in (source_id, target_id):
+                if component_id not in self.types:
+                    self.types[component_id] = None
+                    self.successors[component_id] = []
+                    self.predecessors[component_id] = []
+            self.successors[source_id].append(target_id)
+            self.predecessors[target_id].append(source_id)
+            self.edge_count += 1
+            if conn.get("targetParam"):
+                self.connected_inputs.setdefault(target_id, set()).add(conn["targetParam"])
+
+    def topological_order(self) -> List[str]:
+        """Components in dependency order (Kahn); components on cycles are left out"""
+        indegree = {component_id: len(preds) for component_id, preds in self.predecessors.items()}
+        queue = deque(component_id for component_id, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            component_id = queue.popleft()
+            order.append(component_id)
+            for successor in self.successors[component_id]:
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    queue.append(successor)
+        return order
+
+    def cycles(self) -> List[List[str]]:
+        """Strongly connected components that form cycles (iterative Tarjan)"""
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack = set()
+        stack: List[str] = []
+        result = []
+        counter = 0
+
+        for root in self.successors:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work[-1]
+                if child == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                successors = self.successors[node]
+                if child < len(successors):
+                    work[-1] = (node, child + 1)
+                    successor = successors[child]
+                    if successor not in index:
+                        work.append((successor, 0))
+                    elif successor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.successors[node]:
+                        result.append(component[::-1])
+        return result
+
+    def orphans(self) -> List[str]:
+        """Components with no wires at all"""
+        return [
+            component_id
+            for component_id in self.types
+            if not self.successors[component_id] and not self.predecessors[component_id]
+        ]
+
+    def dangling_inputs(self, input_names: Callable[[str, Optional[str]], Optional[List[str]]]) -> List[Dict[str, Any]]:
+        """
+        Components with unconnected inputs
+
+        Args:
+            input_names: Returns the input parameter names of (component id, type), or None if unknown
+        """
+        result = []
+        for component_id, component_type in self.types.items():
+            inputs = input_names(component_id, component_type)
+            if not inputs:
+                continue
+            connected = self.connected_inputs.get(component_id, set())
+            missing = [name for name in inputs if name not in connected]
+            # Wires recorded without a parameter name cannot be attributed to a specific input
+            if missing and len(self.predecessors[component_id]) < len(inputs):
+                result.append({"id": component_id, "type": component_type, "inputs": missing})
+        return result
+
+    def _closure(self, start: str, neighbours: Dict[str, List[str]]) -> List[str]:
+        seen = {start}
+        order = []
+        queue = deque([start])
+        while queue:
+            component_id = queue.popleft()
+            for neighbour in neighbours.get(component_id, ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    order.append(neighbour)
+                    queue.append(neighbour)
+        return order
+
+    def upstream(self, component_id: str) -> List[str]:
+        """All components feeding into the given one, nearest first"""
+        return self._closure(component_id, self.predecessors)
+
+    def downstream(self, component_id: str) -> List[str]:
+        """All components fed by the given one, nearest first"""
+        return self._closure(component_id, self.successors)
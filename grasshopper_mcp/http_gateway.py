@@ -0,0 +1,281 @@
+"""
+HTTP/JSON gateway to the bridge's tools for scripts and CI jobs that do not speak MCP
+
+All clients share this process's scheduler, document mirror, status cache and
+shared cache, so scripts queue behind each other (and behind agents using the
+same Grasshopper) instead of racing for the plug-in's port.
+
+Endpoints:
+    GET  /tools                  Registered tools with their input schemas
+    POST /tools/{name}           Call a tool; the body is its JSON arguments
+    GET  /resources/{name}       Read grasshopper://{name}
+    POST /command                Send a raw plug-in command {"type", "parameters"}; only read-only
+                                 commands unless the gateway allows more (serve-http --allow-command)
+    POST /batch                  Run {"calls": [{"tool", "arguments"} | {"command", "parameters"}], "stopOnError",
+                                 "transaction"} in order on one worker; with "transaction" Grasshopper recomputes
+                                 once at the end and the components added are removed if a call fails
+
+Tools and resources are called through the FastMCP server, so they get the
+same argument validation and result conversion as over MCP.
+
+Every response carries X-Request-Id and a Server-Timing header splitting the
+request into scheduler queue time, time talking to Grasshopper and total time.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from aiohttp import web
+from mcp.server.fastmcp.exceptions import ToolError
+from pydantic import ValidationError
+
+DEFAULT_HTTP_PORT = 8090
+DEFAULT_HTTP_WORKERS = 8
+
+# Raw plug-in commands /command and /batch accept by default: reads that cannot change the document
+DEFAULT_ALLOWED_COMMANDS = frozenset({
+    "get_all_components", "get_connections", "get_component_info", "get_document_info",
+    "get_document_fingerprint", "get_transaction_status",
+})
+
+
+class UnknownTool(Exception):
+    """Raised for a tool name that is not registered"""
+
+
+class CommandNotAllowed(Exception):
+    """Raised for a raw plug-in command outside the gateway's allow-list"""
+
+
+def _json_response(body: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> web.Response:
+    # Resources such as grasshopper://status are already serialized
+    text = body if isinstance(body, str) else json.dumps(body, separators=(",", ":"), default=str)
+    return web.Response(text=text, status=status, content_type="application/json", headers=headers)
+
+
+def _tool_result(content: Any) -> Any:
+    """Turn FastMCP's converted tool result back into the value the tool returned"""
+    if isinstance(content, tuple):
+        # (content blocks, structured content) for tools with an output schema
+        return content[1]
+    if isinstance(content, dict):
+        return content
+    values = []
+    for block in content:
+        text = getattr(block, "text", None)
+        if text is None:
+            values.append(block.model_dump(mode="json", exclude_none=True))
+            continue
+        try:
+            values.append(json.loads(text))
+        except ValueError:
+            values.append(text)
+    if len(values) == 1:
+        return values[0]
+    return values or None
+
+
+def _error(status: int, message: str) -> web.Response:
+    return _json_response({"success": False, "error": message}, status=status)
+
+
+class HttpGateway:
+    """
+    Maps HTTP requests onto the tools and resources of a FastMCP server
+
+    Args:
+        server: FastMCP server whose tools and resources are exposed
+        send_command: send_to_grasshopper(command_type, params, priority=None)
+        track_commands: Context manager collecting CommandTimings for the current thread
+        workers: Requests executed at once (upstream concurrency is still bounded by the scheduler)
+        run_transaction: run_in_transaction(fn), used for batches with "transaction"
+        allowed_commands: Raw plug-in command types clients may send; None allows every command
+    """
+
+    def __init__(self, server, send_command: Callable[..., Dict[str, Any]], track_commands: Callable,
+                 workers: int = DEFAULT_HTTP_WORKERS, run_transaction: Optional[Callable] = None,
+                 allowed_commands: Optional[Iterable[str]] = DEFAULT_ALLOWED_COMMANDS):
+        self.server = server
+        self.send_command = send_command
+        self.track_commands = track_commands
+        self.run_transaction = run_transaction
+        self.allowed_commands = None if allowed_commands is None else frozenset(allowed_commands)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="grasshopper-http")
+        # Tool and resource names, read from the server when the app starts
+        self.tools: Dict[str, Any] = {}
+        self.resources = set()
+        # One event loop per worker thread for the server's async call_tool / read_resource
+        self._local = threading.local()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/tools", self.list_tools)
+        app.router.add_post("/tools/{name}", self.call_tool)
+        app.router.add_get("/resources/{name}", self.read_resource)
+        app.router.add_post("/command", self.command)
+        app.router.add_post("/batch", self.batch)
+        app.on_startup.append(self._load_names)
+        app.on_cleanup.append(self._shutdown)
+        return app
+
+    async def _load_names(self, app):
+        self.tools = {tool.name: tool for tool in await self.server.list_tools()}
+        self.resources = {str(resource.uri) for resource in await self.server.list_resources()}
+
+    async def _shutdown(self, app):
+        self.executor.shutdown(wait=False)
+
+    def _await(self, coroutine) -> Any:
+        """Run one of the server's coroutines to completion on this worker thread"""
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = self._local.loop = asyncio.new_event_loop()
+        return loop.run_until_complete(coroutine)
+
+    def _invoke_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        if name not in self.tools:
+            raise UnknownTool(name)
+        try:
+            content = self._await(self.server.call_tool(name, arguments or {}))
+        except ToolError as e:
+            # Surface the tool's own error (e.g. a ValidationError for bad arguments)
+            if e.__cause__ is not None:
+                raise e.__cause__
+            raise
+        return _tool_result(content)
+
+    def _read_resource(self, uri: str) -> Any:
+        contents = self._await(self.server.read_resource(uri))
+        return contents[0].content if len(contents) == 1 else [item.content for item in contents]
+
+    def _invoke_command(self, command_type: str, parameters: Optional[Dict[str, Any]]) -> Any:
+        if not command_type:
+            raise ValueError("Missing command type")
+        if self.allowed_commands is not None and command_type not in self.allowed_commands:
+            raise CommandNotAllowed(command_type)
+        return self.send_command(command_type, parameters or {})
+
+    async def _run(self, request: web.Request, fn: Callable[[], Any]) -> web.Response:
+        """Run fn on a worker thread, timing its Grasshopper commands"""
+        request_id = request.headers.get("X-Request-Id") or uuid.uuid4().hex[:16]
+        started = time.perf_counter()
+
+        def run():
+            with self.track_commands() as timings:
+                return fn(), timings
+
+        try:
+            result, timings = await asyncio.get_running_loop().run_in_executor(self.executor, run)
+        except UnknownTool as e:
+            return _error(404, f"Unknown tool: {e.args[0]}")
+        except CommandNotAllowed as e:
+            return _error(403, f"Command not allowed over HTTP: {e.args[0]}")
+        except (ValidationError, ValueError, TypeError) as e:
+            return _error(400, f"Invalid arguments: {str(e)}")
+        except Exception as e:
+            print(f"HTTP request {request_id} failed: {str(e)}", file=sys.stderr)
+            return _error(500, str(e))
+
+        headers = {
+            "X-Request-Id": request_id,
+            "X-Grasshopper-Commands": str(timings.commands),
+            "Server-Timing": timings.server_timing(time.perf_counter() - started),
+        }
+        # The scheduler's queue was full: tell the client to back off
+        busy = isinstance(result, dict) and result.get("busy")
+        if busy:
+            headers["Retry-After"] = "1"
+        return _json_response(result, status=503 if busy else 200, headers=headers)
+
+    async def _body(self, request: web.Request) -> Any:
+        if not request.can_read_body:
+            return {}
+        try:
+            return await request.json()
+        except ValueError as e:
+            raise web.HTTPBadRequest(text=json.dumps({"success": False, "error": f"Invalid JSON: {str(e)}"}),
+                                     content_type="application/json")
+
+    async def list_tools(self, request: web.Request) -> web.Response:
+        tools = [
+            {"name": tool.name, "description": tool.description, "inputSchema": tool.inputSchema}
+            for tool in self.tools.values()
+        ]
+        return _json_response({"success": True, "result": tools})
+
+    async def call_tool(self, request: web.Request) -> web.Response:
+        name = request.match_info["name"]
+        arguments = await self._body(request)
+        if not isinstance(arguments, dict):
+            return _error(400, "Tool arguments must be a JSON object")
+        return await self._run(request, lambda: self._invoke_tool(name, arguments))
+
+    async def read_resource(self, request: web.Request) -> web.Response:
+        uri = f"grasshopper://{request.match_info['name']}"
+        if uri not in self.resources:
+            return _error(404, f"Unknown resource: {uri}")
+        return await self._run(request, lambda: self._read_resource(uri))
+
+    async def command(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        if not isinstance(body, dict):
+            return _error(400, "Command must be a JSON object")
+        return await self._run(request, lambda: self._invoke_command(body.get("type"), body.get("parameters")))
+
+    async def batch(self, request: web.Request) -> web.Response:
+        body = await self._body(request)
+        calls = body.get("calls") if isinstance(body, dict) else None
+        if not isinstance(calls, list) or not all(isinstance(call, dict) for call in calls):
+            return _error(400, "Batch must be {\"calls\": [{\"tool\", \"arguments\"} | {\"command\", \"parameters\"}, ...]}")
+        transaction = bool(body.get("transaction", False)) and self.run_transaction is not None
+        # A failed call rolls the whole transaction back, so the rest need not run
+        stop_on_error = bool(body.get("stopOnError", False)) or transaction
+
+        def run_batch():
+            results = []
+            for call in calls:
+                started = time.perf_counter()
+                try:
+                    if "tool" in call:
+                        result = self._invoke_tool(call["tool"], call.get("arguments") or {})
+                    else:
+                        result = self._invoke_command(call.get("command"), call.get("parameters"))
+                except UnknownTool as e:
+                    result = {"success": False, "error": f"Unknown tool: {e.args[0]}"}
+                except CommandNotAllowed as e:
+                    result = {"success": False, "error": f"Command not allowed over HTTP: {e.args[0]}"}
+                except (ValidationError, ValueError, TypeError) as e:
+                    result = {"success": False, "error": f"Invalid arguments: {str(e)}"}
+                except Exception as e:
+                    print(f"Batch call failed: {str(e)}", file=sys.stderr)
+                    result = {"success": False, "error": str(e)}
+                results.append({"result": result, "elapsedMs": round((time.perf_counter() - started) * 1000, 3)})
+                if stop_on_error and isinstance(result, dict) and result.get("success") is False:
+                    break
+            return {
+                "success": all(not (isinstance(item["result"], dict) and item["result"].get("success") is False)
+                               for item in results),
+                "results": results
+            }
+
+        if transaction:
+            return await self._run(request, lambda: self.run_transaction(run_batch))
+        return await self._run(request, run_batch)
+
+
+def run_gateway(server, send_command: Callable[..., Dict[str, Any]], track_commands: Callable,
+                host: str = "127.0.0.1", port: int = DEFAULT_HTTP_PORT, workers: int = DEFAULT_HTTP_WORKERS,
+                run_transaction: Optional[Callable] = None,
+                allowed_commands: Optional[Iterable[str]] = DEFAULT_ALLOWED_COMMANDS) -> int:
+    """Serve the gateway until interrupted (the `serve-http` command)"""
+    gateway = HttpGateway(server, send_command, track_commands, workers=workers, run_transaction=run_transaction,
+                          allowed_commands=allowed_commands)
+    print(f"Serving Grasshopper MCP tools over HTTP on http://{host}:{port}", file=sys.stderr)
+    web.run_app(gateway.create_app(), host=host, port=port, print=None)
+    return 0
@@ -0,0 +1,170 @@
+"""
+Background jobs for long-running tool calls
+
+Loading, saving or building a large definition can outlast the MCP host's tool
+timeout even though Grasshopper finishes the work. Such calls can instead be
+submitted as jobs: the tool returns a job id at once and the caller polls
+job_status / job_result.
+
+Jobs run on a bounded thread pool; at most max_pending jobs may wait for a
+worker. Finished jobs are kept for `retention` seconds, then forgotten.
+"""
+
+import sys
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+# Seconds a finished job's result is kept
+DEFAULT_RETENTION = 3600.0
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobManagerBusy(Exception):
+    """Raised when too many jobs are waiting for a worker"""
+
+
+class Job:
+    """A submitted call, its state and, once finished, its result"""
+
+    def __init__(self, name: str, params: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.params = params or {}
+        self.state = QUEUED
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.progress: Optional[float] = None
+        self.message: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.future = None
+
+    def report(self, message: str, progress: Optional[float] = None):
+        """Record a progress message and, optionally, the completed fraction (0-1)"""
+        self.message = message
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+
+    def status(self) -> Dict[str, Any]:
+        end = self.finished or time.time()
+        status = {
+            "jobId": self.id,
+            "name": self.name,
+            "params": self.params,
+            "state": self.state,
+            "elapsed": round(end - (self.started or end), 3),
+            "queued": round((self.started or end) - self.created, 3),
+        }
+        if self.progress is not None:
+            status["progress"] = self.progress
+        if self.message is not None:
+            status["message"] = self.message
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool and keeps their results for a retention period
+
+    Args:
+        workers: Jobs running at once
+        max_pending: Jobs allowed to wait for a worker before submit() raises JobManagerBusy
+        retention: Seconds a finished job is kept
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 retention: float = DEFAULT_RETENTION):
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, name: str, fn: Callable[[Job], Any], params: Optional[Dict[str, Any]] = None) -> Job:
+        """Queue fn(job); its return value becomes the job's result"""
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if job.state == QUEUED)
+            if pending >= self.max_pending:
+                raise JobManagerBusy(f"{pending} jobs are already waiting; try again later")
+            if self._executor is None:
+                # Created lazily so importing the bridge starts no threads
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="grasshopper-job")
+            job = Job(name, params)
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        with self._lock:
+            if job.state != QUEUED:
+                return
+            job.state = RUNNING
+            job.started = time.time()
+        try:
+            result = fn(job)
+            state, error = SUCCEEDED, None
+            # Tools report failure in the result rather than by raising
+            if isinstance(result, dict) and result.get("success") is False:
+                state, error = FAILED, str(result.get("error") or "Unknown error")
+        except Exception as e:
+            print(f"Job {job.id} ({job.name}) failed: {str(e)}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            result, state, error = None, FAILED, str(e)
+        with self._lock:
+            job.result = result
+            job.error = error
+            job.state = state
+            job.finished = time.time()
+            if state == SUCCEEDED:
+                job.progress = 1.0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            self._prune()
+            return sorted(self._jobs.values(), key=lambda job: job.created)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued job; returns the job, or None if unknown
+
+        A job that has started keeps running: commands already sent to
+        Grasshopper cannot be interrupted.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state == QUEUED:
+                job.future.cancel()
+                job.state = CANCELLED
+                job.error = "Cancelled before it started"
+                job.finished = time.time()
+            return job
+
+    def _prune(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.state in FINISHED_STATES and now - job.finished > self.retention]
+        for job_id in expired:
+            del self._jobs[job_id]
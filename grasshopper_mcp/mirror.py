@@ -0,0 +1,153 @@
+"""
+Local mirror of the Grasshopper document state kept by the bridge
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+# Seconds after which the mirrored connection table is considered stale and is
+# re-read from Grasshopper (manual edits on the canvas are not visible otherwise)
+DEFAULT_MIRROR_TTL = 30.0
+
+
+class DocumentMirror:
+    """
+    Tracks components, their input ports and the wires feeding them.
+
+    The mirror is seeded from the component library when the bridge adds a
+    component and updated from the bridge's own successful connects, so free
+    input ports can be assigned without asking Grasshopper. Each input port
+    holds at most one wire, matching the plug-in, which replaces the existing
+    source when a port is reconnected.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_MIRROR_TTL):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        # component id -> ordered input parameter names
+        self._inputs: Dict[str, List[str]] = {}
+        # (target id, target param) -> (source id, source param)
+        self._wires: Dict[Tuple[str, str], Tuple[str, Optional[str]]] = {}
+        # component id -> names of occupied input parameters
+        self._occupied: Dict[str, set] = {}
+        # Time of the last full connection download, None when never synced
+        self._synced_at: Optional[float] = None
+
+    def reset(self, synced: bool = False):
+        """Forget everything; mark as synced when the document is known to be empty"""
+        with self._lock:
+            self._inputs.clear()
+            self._wires.clear()
+            self._occupied.clear()
+            self._synced_at = time.monotonic() if synced else None
+
+    def invalidate(self, component_id: Optional[str] = None):
+        """Mark one component (or the whole connection table) as stale"""
+        with self._lock:
+            if component_id is None:
+                self._synced_at = None
+            else:
+                self._inputs.pop(component_id, None)
+
+    def is_synced(self) -> bool:
+        """Whether the connection table is authoritative and recent enough to trust"""
+        with self._lock:
+            if self._synced_at is None:
+                return False
+            return time.monotonic() - self._synced_at <= self.ttl
+
+    def knows_inputs(self, component_id: str) -> bool:
+        with self._lock:
+            return component_id in self._inputs
+
+    def needs_refresh(self, component_id: str) -> bool:
+        """Whether assigning an input port on this component requires a round trip"""
+        return not (self.is_synced() and self.knows_inputs(component_id))
+
+    def register_component(self, component_id: str, inputs: Optional[Iterable[str]] = None):
+        """Record a component and, when known, its ordered input names"""
+        with self._lock:
+            if inputs is not None:
+                self._inputs[component_id] = list(inputs)
+            self._occupied.setdefault(component_id, set())
+
+    def input_names(self, component_id: str) -> Optional[List[str]]:
+        with self._lock:
+            inputs = self._inputs.get(component_id)
+            return list(inputs) if inputs is not None else None
+
+    def load_connections(self, connections: Iterable[Dict[str, Any]]):
+        """Replace the wire table with a full connection list downloaded from Grasshopper"""
+        with self._lock:
+            self._wires.clear()
+            for occupied in self._occupied.values():
+                occupied.clear()
+            tracked = True
+            for conn in connections:
+                tracked &= self._add_wire(
+                    conn.get("sourceId"),
+                    conn.get("sourceParam"),
+                    conn.get("targetId"),
+                    conn.get("targetParam"),
+                    conn.get("targetParamIndex"),
+                )
+            self._synced_at = time.monotonic() if tracked else None
+
+    def record_connection(self, source_id: str, source_param: Optional[str], target_id: str,
+                          target_param: Optional[str] = None, target_param_index: Optional[int] = None):
+        """Record a wire the bridge has just created"""
+        with self._lock:
+            self._add_wire(source_id, source_param, target_id, target_param, target_param_index)
+
+    def _add_wire(self, source_id, source_param, target_id, target_param, target_param_index) -> bool:
+        """Add a wire to the table; returns False when its port is unknown and the table is no longer complete"""
+        if not source_id or not target_id:
+            return True
+        inputs = self._inputs.get(target_id)
+        if target_param is None and target_param_index is not None:
+            if inputs is not None and 0 <= target_param_index < len(inputs):
+                target_param = inputs[target_param_index]
+        if target_param is None and inputs is not None and len(inputs) == 1:
+            # The plug-in connects to the only input when none is named
+            target_param = inputs[0]
+        if target_param is None:
+            # The port cannot be tracked, so the table no longer reflects the canvas
+            self._synced_at = None
+            return False
+        self._wires[(target_id, target_param)] = (source_id, source_param)
+        self._occupied.setdefault(target_id, set()).add(target_param)
+        return True
+
+    def assign_input(self, component_id: str, reserved: Optional[Iterable[str]] = None) -> Optional[str]:
+        """
+        Pick the input port for a new wire into a multi-input component
+
+        Returns the first free input not in ``reserved``, the last input when all
+        are occupied (the plug-in then replaces its source), or None when the
+        component has fewer than two known inputs and the plug-in should choose.
+        """
+        with self._lock:
+            inputs = self._inputs.get(component_id)
+            if not inputs or len(inputs) < 2:
+                return None
+            occupied = self._occupied.get(component_id, set())
+            if reserved:
+                occupied = occupied | set(reserved)
+            for name in inputs:
+                if name not in occupied:
+                    return name
+            return inputs[-1]
+
+    def connections(self) -> List[Dict[str, Any]]:
+        """Mirrored connections in the wire format used by get_connections"""
+        with self._lock:
+            return [
+                {
+                    "sourceId": source_id,
+                    "sourceParam": source_param,
+                    "targetId": target_id,
+                    "targetParam": target_param,
+                }
+                for (target_id, target_param), (source_id, source_param) in self._wires.items()
+            ]
@@ -0,0 +1,220 @@
+"""
+Compact typed models for components, parameters and connections
+
+Wire dicts from the plug-in are converted once into ``__slots__`` objects with
+interned ids, type names and parameter names, so a 10k-component document
+holds each string once and no per-instance ``__dict__``. Output for MCP is
+built from the models in one pass at the boundary.
+"""
+
+import sys
+from typing import Dict, Any, Optional, List, Iterable
+
+_intern = sys.intern
+
+
+def _str(value: Any) -> Optional[str]:
+    return _intern(value) if isinstance(value, str) else None
+
+
+# Library names of the objects the plug-in reports by class name ("type" is GetType().Name)
+CLASS_TYPE_NAMES = {
+    "GH_NumberSlider": "Number Slider",
+    "GH_MultiDimensionalSlider": "MD Slider",
+    "GH_Panel": "Panel",
+    "GH_BooleanToggle": "Boolean Toggle",
+    "GH_ButtonObject": "Button",
+    "GH_ValueList": "Value List",
+    "GH_ColourSwatch": "Colour Swatch",
+    "GH_Scribble": "Scribble",
+    "GH_Group": "Group",
+    "Param_Number": "Number",
+    "Param_Integer": "Integer",
+    "Param_Boolean": "Boolean",
+    "Param_String": "Text",
+    "Param_Point": "Point",
+    "Param_Vector": "Vector",
+    "Param_Plane": "Plane",
+    "Param_Line": "Line",
+    "Param_Circle": "Circle",
+    "Param_Arc": "Arc",
+    "Param_Curve": "Curve",
+    "Param_Surface": "Surface",
+    "Param_Brep": "Brep",
+    "Param_Mesh": "Mesh",
+    "Param_Geometry": "Geometry",
+    "Param_GenericObject": "Data",
+}
+
+
+def component_type_name(data: Dict[str, Any]) -> Optional[str]:
+    """
+    Library name ("Number Slider") of a component row from the plug-in
+
+    The plug-in's "type" is the object's class name ("GH_NumberSlider"); rows
+    from get_all_components also carry the library name as "componentName".
+    Names that are already library names pass through unchanged.
+    """
+    name = data.get("componentName")
+    if isinstance(name, str) and name:
+        return name
+    component_type = data.get("type")
+    return CLASS_TYPE_NAMES.get(component_type, component_type)
+
+
+class Param:
+    """Input or output parameter of a component"""
+
+    __slots__ = ("name", "nickname", "type", "data_type")
+
+    def __init__(self, name: Optional[str], nickname: Optional[str] = None, type: Optional[str] = None,
+                 data_type: Optional[str] = None):
+        self.name = name
+        self.nickname = nickname
+        self.type = type
+        self.data_type = data_type
+
+    @classmethod
+    def from_wire(cls, data: Any) -> "Param":
+        if isinstance(data, str):
+            return cls(_intern(data))
+        return cls(_str(data.get("name")), _str(data.get("nickname")), _str(data.get("type")), _str(data.get("dataType")))
+
+    def to_wire(self) -> Dict[str, Any]:
+        wire = {"name": self.name}
+        if self.nickname is not None:
+            wire["nickname"] = self.nickname
+        if self.type is not None:
+            wire["type"] = self.type
+        if self.data_type is not None:
+            wire["dataType"] = self.data_type
+        return wire
+
+
+class Component:
+    """A document object as reported by get_all_components / get_component_info"""
+
+    __slots__ = ("id", "type", "name", "x", "y", "value", "minimum", "maximum", "rounding", "inputs", "outputs")
+
+    def __init__(self, id: str, type: Optional[str], name: Optional[str] = None, x: float = 0.0, y: float = 0.0,
+                 value: Any = None, minimum: Optional[float] = None, maximum: Optional[float] = None,
+                 rounding: Optional[float] = None, inputs: Optional[List[Param]] = None,
+                 outputs: Optional[List[Param]] = None):
+        self.id = id
+        self.type = type
+        self.name = name
+        self.x = x
+        self.y = y
+        self.value = value
+        self.minimum = minimum
+        self.maximum = maximum
+        self.rounding = rounding
+        self.inputs = inputs
+        self.outputs = outputs
+
+    @classmethod
+    def from_wire(cls, data: Dict[str, Any]) -> "Component":
+        inputs = data.get("inputs")
+        outputs = data.get("outputs")
+        return cls(
+            _intern(str(data["id"])),
+            _str(component_type_name(data)),
+            _str(data.get("name")),
+            data.get("x") or 0.0,
+            data.get("y") or 0.0,
+            data.get("value"),
+            data.get("min", data.get("minimum")),
+            data.get("max", data.get("maximum")),
+            data.get("rounding"),
+            [Param.from_wire(param) for param in inputs] if inputs is not None else None,
+            [Param.from_wire(param) for param in outputs] if outputs is not None else None,
+        )
+
+    def update_from_info(self, data: Dict[str, Any]):
+        """Fill in value, range and parameters from a get_component_info result"""
+        updated = Component.from_wire(dict(data, id=self.id))
+        for slot in ("value", "minimum", "maximum", "rounding", "inputs", "outputs"):
+            value = getattr(updated, slot)
+            if value is not None:
+                setattr(self, slot, value)
+
+    def slider_settings(self) -> Dict[str, Any]:
+        return {
+            "min": self.minimum if self.minimum is not None else 0,
+            "max": self.maximum if self.maximum is not None else 10,
+            "value": self.value if self.value is not None else 5,
+            "rounding": self.rounding if self.rounding is not None else 0.1,
+        }
+
+    def to_wire(self) -> Dict[str, Any]:
+        wire = {"id": self.id, "type": self.type, "name": self.name, "x": self.x, "y": self.y}
+        if self.value is not None:
+            wire["value"] = self.value
+        if self.inputs is not None:
+            wire["inputs"] = [param.to_wire() for param in self.inputs]
+        if self.outputs is not None:
+            wire["outputs"] = [param.to_wire() for param in self.outputs]
+        return wire
+
+
+class Connection:
+    """A wire from a source component's output to a target component's input"""
+
+    __slots__ = ("source_id", "source_param", "target_id", "target_param")
+
+    def __init__(self, source_id: str, source_param: Optional[str], target_id: str, target_param: Optional[str]):
+        self.source_id = source_id
+        self.source_param = source_param
+        self.target_id = target_id
+        self.target_param = target_param
+
+    @classmethod
+    def from_wire(cls, data: Dict[str, Any]) -> "Connection":
+        return cls(
+            _intern(str(data.get("sourceId"))),
+            _str(data.get("sourceParam")),
+            _intern(str(data.get("targetId"))),
+            _str(data.get("targetParam")),
+        )
+
+    def to_wire(self) -> Dict[str, Any]:
+        return {
+            "sourceId": self.source_id,
+            "sourceParam": self.source_param,
+            "targetId": self.target_id,
+            "targetParam": self.target_param,
+        }
+
+
+class DocumentModel:
+    """
+    Components and connections of a document, with connections indexed by component
+
+    Each Connection object is shared by the index entries of both of its ends,
+    so looking up a component's wires is O(degree) and copies nothing.
+    """
+
+    __slots__ = ("components", "connections", "_by_component")
+
+    def __init__(self, components: Iterable[Component], connections: Iterable[Connection]):
+        self.components: Dict[str, Component] = {component.id: component for component in components}
+        self.connections: List[Connection] = list(connections)
+        self._by_component: Dict[str, List[Connection]] = {}
+        for connection in self.connections:
+            self._by_component.setdefault(connection.source_id, []).append(connection)
+            if connection.target_id != connection.source_id:
+                self._by_component.setdefault(connection.target_id, []).append(connection)
+
+    @classmethod
+    def from_wire(cls, components: Iterable[Dict[str, Any]], connections: Iterable[Dict[str, Any]]) -> "DocumentModel":
+        return cls(
+            (Component.from_wire(component) for component in components if component.get("id")),
+            (Connection.from_wire(connection) for connection in connections
+             if connection.get("sourceId") and connection.get("targetId")),
+        )
+
+    def connections_of(self, component_id: str) -> List[Connection]:
+        return self._by_component.get(component_id, [])
+
+    def of_type(self, component_type: str) -> List[Component]:
+        return [component for component in self.components.values() if component.type == component_type]
@@ -0,0 +1,238 @@
+"""
+Opt-in per-invocation profiling of MCP tools and resources
+
+When enabled, every registered tool and resource function is wrapped so that
+each call is profiled and written to its own file in the profile directory:
+
+- "pstats": deterministic cProfile, one ``.pstats`` file per call (open with
+  ``python -m pstats`` or snakeviz)
+- "sampling": a background thread samples the calling thread's stack every
+  ``interval`` seconds and writes a ``.collapsed`` file of folded stacks
+  (flamegraph.pl, speedscope)
+
+The directory is kept under ``max_bytes`` by deleting the oldest files. Hot
+functions across all calls since start-up are summarized by summary().
+When profiling is off nothing is wrapped, so tools run unchanged. The
+wrappers are the innermost layer (see grasshopper_mcp.wrappers) and only
+synchronous functions are profiled.
+"""
+
+import cProfile
+import functools
+import glob
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from grasshopper_mcp.wrappers import wrap_handlers
+
+PROFILE_MODES = ("pstats", "sampling")
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# Seconds between stack samples in "sampling" mode; about the interpreter's default thread switch interval
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP = 20
+
+_SUFFIXES = {"pstats": ".pstats", "sampling": ".collapsed"}
+
+# (file, line, function name), as used by pstats
+FunctionKey = Tuple[str, int, str]
+
+
+class _StackSampler(threading.Thread):
+    """Counts the folded stacks of one thread until stopped"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="grasshopper-profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[Tuple[FunctionKey, ...], int] = {}
+        # Wall time attributed to each stack: the time since the previous sample
+        self.seconds: Dict[Tuple[FunctionKey, ...], float] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                # Root first, as in the folded-stack format
+                stack = tuple(reversed(stack))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                self.seconds[stack] = self.seconds.get(stack, 0.0) + elapsed
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _label(function: FunctionKey) -> str:
+    filename, line, name = function
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class ToolProfiler:
+    """
+    Profiles each call of the wrapped functions and aggregates hot functions
+
+    Args:
+        directory: Where profile files are written, created if missing
+        mode: "pstats" (deterministic) or "sampling"
+        max_bytes: Total size of profile files kept; the oldest are deleted first
+        interval: Seconds between stack samples in "sampling" mode
+        top: Number of hot functions reported by summary()
+    """
+
+    def __init__(self, directory: str, mode: str = "pstats", max_bytes: int = DEFAULT_MAX_BYTES,
+                 interval: float = DEFAULT_INTERVAL, top: int = DEFAULT_TOP):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected {', '.join(PROFILE_MODES)})")
+        self.directory = directory
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.top = top
+        self._lock = threading.Lock()
+        self._sequence = 0
+        # name -> [calls, total seconds, max seconds]
+        self._invocations: Dict[str, List[float]] = {}
+        # function -> [calls, self seconds, cumulative seconds]
+        self._functions: Dict[FunctionKey, List[float]] = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def instrument(self, server, exclude: Tuple[str, ...] = ()) -> int:
+        """Wrap the functions of every tool and resource registered on a FastMCP server; returns the count"""
+        def wrap(kind, name, fn, is_async):
+            if name in exclude or is_async:
+                return None
+            label = f"tool.{name}" if kind == "tool" else f"resource.{name.split('://', 1)[-1]}"
+            return self.wrap(label, fn), False
+        return wrap_handlers(server, "profile", wrap)
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def profiled(*args, **kwargs):
+            if self.mode == "sampling":
+                return self._sample(name, fn, args, kwargs)
+            return self._trace(name, fn, args, kwargs)
+        return profiled
+
+    def _trace(self, name: str, fn: Callable, args, kwargs):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread (e.g. a nested profiled call)
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            try:
+                stats = pstats.Stats(profile)
+                functions = {key: (nc, tt, ct) for key, (cc, nc, tt, ct, callers) in stats.stats.items()}
+                self._record(name, elapsed, functions, lambda path: stats.dump_stats(path))
+            except Exception as e:
+                print(f"Could not record profile for {name}: {str(e)}", file=sys.stderr)
+
+    def _sample(self, name: str, fn: Callable, args, kwargs):
+        sampler = _StackSampler(threading.get_ident(), self.interval)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            sampler.stop()
+            stacks = sampler.stacks
+            # A function counts once per sample it appears in
+            functions: Dict[FunctionKey, List[float]] = {}
+            for stack, seconds in sampler.seconds.items():
+                for function in set(stack):
+                    functions.setdefault(function, [0, 0.0, 0.0])[2] += seconds
+                functions.setdefault(stack[-1], [0, 0.0, 0.0])[1] += seconds
+
+            def write(path):
+                with open(path, "w", encoding="utf-8") as f:
+                    for stack, count in stacks.items():
+                        f.write(";".join(_label(function) for function in stack) + f" {count}\n")
+
+            try:
+                self._record(name, elapsed, {key: tuple(value) for key, value in functions.items()}, write)
+            except Exception as e:
+                print(f"Could not record profile for {name}: {str(e)}", file=sys.stderr)
+
+    def _record(self, name: str, elapsed: float, functions: Dict[FunctionKey, Tuple[float, float, float]],
+                write: Callable[[str], Any]):
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+            invocation = self._invocations.setdefault(name, [0, 0.0, 0.0])
+            invocation[0] += 1
+            invocation[1] += elapsed
+            invocation[2] = max(invocation[2], elapsed)
+            for key, (calls, own, cumulative) in functions.items():
+                totals = self._functions.setdefault(key, [0, 0.0, 0.0])
+                totals[0] += calls
+                totals[1] += own
+                totals[2] += cumulative
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{sequence:06d}-{safe_name}{_SUFFIXES[self.mode]}"
+        write(os.path.join(self.directory, filename))
+        self.rotate()
+
+    def rotate(self):
+        """Delete the oldest profile files until the directory is within max_bytes"""
+        files = []
+        for suffix in _SUFFIXES.values():
+            for path in glob.glob(os.path.join(self.directory, "*" + suffix)):
+                try:
+                    files.append((os.path.getmtime(path), os.path.getsize(path), path))
+                except OSError:
+                    continue
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def summary(self, top: Optional[int] = None) -> Dict[str, Any]:
+        """Per-tool call times and the top-N functions by self time across all profiled calls"""
+        top = top or self.top
+        with self._lock:
+            invocations = {name: {"calls": int(calls), "totalSeconds": round(total, 6), "maxSeconds": round(longest, 6)}
+                           for name, (calls, total, longest) in self._invocations.items()}
+            functions = sorted(self._functions.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "mode": self.mode,
+            "directory": self.directory,
+            "invocations": invocations,
+            "hotFunctions": [
+                {
+                    "function": function[2],
+                    "file": function[0],
+                    "line": function[1],
+                    "selfSeconds": round(own, 6),
+                    "cumulativeSeconds": round(cumulative, 6),
+                    **({"calls": int(calls)} if self.mode == "pstats" else {})
+                }
+                for function, (calls, own, cumulative) in functions
+            ]
+        }
@@ -0,0 +1,144 @@
+"""
+Opt-in recording of bridge traffic to a compact JSONL log
+"""
+
+import json
+import math
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List
+
+
+class TrafficRecorder:
+    """
+    Appends one JSON line per command sent to Grasshopper
+
+    Each recording starts with a header line naming the session and its
+    wall-clock start ("session", "started"), since one log usually collects
+    the sessions of several bridge processes. Each command line holds the
+    session, the offset from the start of the recording ("t", seconds), the
+    command ("type", "params"), request and response sizes in bytes ("req",
+    "resp"), connect and total latency in milliseconds ("connect_ms",
+    "total_ms") and whether the command succeeded ("ok").
+
+    Args:
+        path: Log file; new entries are appended
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._write({"session": self.session, "started": round(time.time(), 6)})
+
+    def record(self, command_type: str, params: Dict[str, Any], started: float, request_bytes: int,
+               response_bytes: int, connect_s: float, total_s: float, ok: bool):
+        self._write({
+            "session": self.session,
+            "t": round(started - self._start, 6),
+            "type": command_type,
+            "params": params,
+            "req": request_bytes,
+            "resp": response_bytes,
+            "connect_ms": round(connect_s * 1000, 3),
+            "total_ms": round(total_s * 1000, 3),
+            "ok": ok
+        })
+
+    def _write(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            try:
+                self._file.write(line + "\n")
+            except (OSError, ValueError) as e:
+                print(f"Error recording traffic to {self.path}: {str(e)}", file=sys.stderr)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class CommandTimings:
+    """
+    Time spent by the commands of one request: waiting for a scheduler slot and talking to Grasshopper
+
+    Collected per thread by bridge.track_commands() and reported by the HTTP gateway.
+    """
+
+    def __init__(self):
+        self.commands = 0
+        self.queue_s = 0.0
+        self.upstream_s = 0.0
+
+    def add(self, queue_s: float, upstream_s: float):
+        self.commands += 1
+        self.queue_s += queue_s
+        self.upstream_s += upstream_s
+
+    def server_timing(self, total_s: float) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        return (
+            f"queue;dur={self.queue_s * 1000:.3f}, upstream;dur={self.upstream_s * 1000:.3f};desc=\"{self.commands} commands\", "
+            f"total;dur={total_s * 1000:.3f}"
+        )
+
+
+def load_log(path: str) -> List[Dict[str, Any]]:
+    """
+    Read a recorded log, skipping malformed lines
+
+    Sessions recorded by different processes are put on one timeline by their
+    wall-clock start: sessions that overlapped keep their relative timing, and
+    idle time between sessions that did not is dropped. Each entry's "t" is
+    its offset on that timeline.
+    """
+    started: Dict[Optional[str], float] = {}
+    sessions: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"Skipping malformed log line: {line[:80]}", file=sys.stderr)
+                continue
+            if "type" not in entry:
+                if "started" in entry:
+                    started[entry.get("session")] = entry["started"]
+                continue
+            sessions.setdefault(entry.get("session"), []).append(entry)
+
+    entries = []
+    # Wall-clock start and end of the current group of overlapping sessions, and where it starts on the timeline
+    group_start = group_end = None
+    group_offset = timeline_end = 0.0
+    for session in sorted(sessions, key=lambda session: started.get(session, 0.0)):
+        session_entries = sessions[session]
+        session_entries.sort(key=lambda entry: entry.get("t", 0))
+        start = started.get(session, 0.0)
+        last = session_entries[-1]
+        duration = last.get("t", 0) + (last.get("total_ms") or 0) / 1000
+        if group_end is None or start >= group_end:
+            group_start, group_end, group_offset = start, start, timeline_end
+        offset = group_offset + start - group_start
+        group_end = max(group_end, start + duration)
+        timeline_end = max(timeline_end, offset + duration)
+        for entry in session_entries:
+            entry["t"] = round(offset + entry.get("t", 0), 6)
+            entries.append(entry)
+    entries.sort(key=lambda entry: entry["t"])
+    return entries
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
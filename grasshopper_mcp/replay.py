@@ -0,0 +1,160 @@
+"""
+Replay a recorded bridge session against a Grasshopper MCP server and report latency
+"""
+
+import json
+import queue
+import socket
+import threading
+import time
+from typing import Dict, Any, Optional, List
+
+from grasshopper_mcp.recorder import load_log, percentile
+
+
+def send_raw(host: str, port: int, payload: bytes, timeout: float = 60.0) -> bytes:
+    """Send one newline-terminated command and read the newline-terminated response"""
+    client = socket.create_connection((host, port), timeout=timeout)
+    try:
+        client.sendall(payload)
+        response_data = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            response_data += chunk
+            if response_data.endswith(b"\n"):
+                break
+        return response_data
+    finally:
+        client.close()
+
+
+def replay(entries: List[Dict[str, Any]], host: str, port: int, speed: Optional[float] = 1.0,
+           concurrency: int = 1, timeout: float = 60.0) -> Dict[str, Any]:
+    """
+    Re-send recorded commands and measure the server's behaviour
+
+    Args:
+        entries: Recorded log entries (see TrafficRecorder)
+        host: Grasshopper MCP host
+        port: Grasshopper MCP port
+        speed: Time scale for the recorded gaps (1 = real time, 10 = ten times faster),
+            or None to send as fast as possible
+        concurrency: Number of commands allowed in flight at once
+        timeout: Socket timeout per command in seconds
+
+    Returns:
+        Throughput, latency percentiles and errors, overall and per command type
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    work: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+    for entry in entries:
+        work.put(entry)
+    for _ in range(concurrency):
+        work.put(None)
+
+    results: List[Dict[str, Any]] = []
+    results_lock = threading.Lock()
+    start = time.perf_counter()
+
+    def worker():
+        while True:
+            entry = work.get()
+            if entry is None:
+                return
+            if speed:
+                delay = start + entry.get("t", 0) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            payload = (json.dumps({"type": entry["type"], "parameters": entry.get("params") or {}}) + "\n").encode("utf-8")
+            sent = time.perf_counter()
+            ok, error, size = False, None, 0
+            try:
+                response_data = send_raw(host, port, payload, timeout)
+                size = len(response_data)
+                response = json.loads(response_data.decode("utf-8-sig").strip())
+                ok = bool(response.get("success"))
+                if not ok:
+                    error = response.get("error")
+            except Exception as e:
+                error = str(e)
+            latency = time.perf_counter() - sent
+            with results_lock:
+                results.append({
+                    "type": entry["type"],
+                    "latency_ms": latency * 1000,
+                    "recorded_ms": entry.get("total_ms"),
+                    "ok": ok,
+                    "error": error,
+                    "resp": size
+                })
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        by_type.setdefault(result["type"], []).append(result)
+
+    report = _summarize(results)
+    report["wall_s"] = round(elapsed, 3)
+    report["throughput_rps"] = round(len(results) / elapsed, 2) if elapsed > 0 else None
+    report["by_type"] = {command_type: _summarize(items) for command_type, items in sorted(by_type.items())}
+    errors: Dict[str, int] = {}
+    for result in results:
+        if result["error"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+    report["errors"] = errors
+    return report
+
+
+def _summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = sorted(result["latency_ms"] for result in results)
+    recorded = sorted(result["recorded_ms"] for result in results if result.get("recorded_ms") is not None)
+    summary = {
+        "count": len(results),
+        "failed": sum(1 for result in results if not result["ok"]),
+        "response_bytes": sum(result["resp"] for result in results),
+    }
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        value = percentile(latencies, fraction)
+        summary[f"{name}_ms"] = round(value, 3) if value is not None else None
+        recorded_value = percentile(recorded, fraction)
+        summary[f"recorded_{name}_ms"] = round(recorded_value, 3) if recorded_value is not None else None
+    summary["max_ms"] = round(latencies[-1], 3) if latencies else None
+    return summary
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Human-readable replay report"""
+    lines = [
+        f"Replayed {report['count']} commands in {report['wall_s']} s "
+        f"({report['throughput_rps']} req/s), {report['failed']} failed",
+        f"{'command':<28}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'rec p50':>10}",
+    ]
+
+    def row(name, summary):
+        cells = [summary.get(key) for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms", "recorded_p50_ms")]
+        return f"{name:<28}{summary['count']:>7}" + "".join(f"{'-' if c is None else c:>10}" for c in cells)
+
+    lines.append(row("(all)", report))
+    for command_type, summary in report["by_type"].items():
+        lines.append(row(command_type, summary))
+    for error, count in report["errors"].items():
+        lines.append(f"error x{count}: {error}")
+    return "\n".join(lines)
+
+
+def run_replay(path: str, host: str, port: int, speed: str = "1", concurrency: int = 1, as_json: bool = False) -> int:
+    """Entry point for `grasshopper-mcp replay`"""
+    entries = load_log(path)
+    scale = None if speed == "max" else float(speed.rstrip("x"))
+    report = replay(entries, host, port, speed=scale, concurrency=concurrency)
+    print(json.dumps(report, indent=2) if as_json else format_report(report))
+    return 0 if report["failed"] == 0 else 1
@@ -0,0 +1,144 @@
+"""
+Client-side command scheduling with priorities and backpressure
+
+The plug-in runs every command on Rhino's UI thread, one at a time. Opening
+more sockets only adds blocked connections, so the bridge keeps a small
+in-flight window per endpoint. It queues everything else by priority class.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple
+
+from grasshopper_mcp.recorder import percentile
+
+# Priority classes, most urgent first
+INTERACTIVE = 0
+BULK = 1
+BACKGROUND = 2
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk", BACKGROUND: "background"}
+
+DEFAULT_WINDOW = 2
+DEFAULT_MAX_QUEUE = 64
+
+# Number of recent queue waits kept per priority class for percentiles
+WAIT_SAMPLES = 512
+
+Endpoint = Tuple[str, int]
+
+
+class SchedulerBusy(Exception):
+    """Raised when an endpoint's queue is full"""
+
+
+class _EndpointQueue:
+    def __init__(self):
+        self.in_flight = 0
+        self.waiting: List[Tuple[int, int, threading.Event]] = []
+        self.max_depth = 0
+        self.submitted = {priority: 0 for priority in PRIORITY_NAMES}
+        self.rejected = {priority: 0 for priority in PRIORITY_NAMES}
+        self.waits = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITY_NAMES}
+        self.max_wait = {priority: 0.0 for priority in PRIORITY_NAMES}
+
+
+class CommandScheduler:
+    """
+    Bounded in-flight window per endpoint with a strict priority queue in front of it
+
+    Interactive requests always go before queued bulk requests, and bulk before
+    background; within a class requests keep arrival order. A request that finds
+    ``max_queue`` requests already waiting for its endpoint is rejected with
+    SchedulerBusy rather than piling up another blocked socket.
+
+    Args:
+        window: Commands allowed in flight per endpoint
+        max_queue: Commands allowed to wait per endpoint before rejecting new ones
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.window = max(1, window)
+        self.max_queue = max(0, max_queue)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Endpoint, _EndpointQueue] = {}
+        self._sequence = itertools.count()
+
+    def _queue(self, endpoint: Endpoint) -> _EndpointQueue:
+        queue = self._endpoints.get(endpoint)
+        if queue is None:
+            queue = self._endpoints[endpoint] = _EndpointQueue()
+        return queue
+
+    def acquire(self, endpoint: Endpoint, priority: int = INTERACTIVE) -> float:
+        """Wait for a slot; returns the time spent queued in seconds"""
+        started = time.perf_counter()
+        with self._lock:
+            queue = self._queue(endpoint)
+            queue.submitted[priority] += 1
+            if queue.in_flight < self.window and not queue.waiting:
+                queue.in_flight += 1
+                self._record_wait(queue, priority, 0.0)
+                return 0.0
+            if len(queue.waiting) >= self.max_queue:
+                queue.rejected[priority] += 1
+                raise SchedulerBusy(
+                    f"Grasshopper is busy: {len(queue.waiting)} commands queued for "
+                    f"{endpoint[0]}:{endpoint[1]} (limit {self.max_queue}); try again shortly"
+                )
+            granted = threading.Event()
+            heapq.heappush(queue.waiting, (priority, next(self._sequence), granted))
+            queue.max_depth = max(queue.max_depth, len(queue.waiting))
+        # release() hands the slot over directly, so in_flight is already counted
+        granted.wait()
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._record_wait(queue, priority, waited)
+        return waited
+
+    def release(self, endpoint: Endpoint):
+        with self._lock:
+            queue = self._queue(endpoint)
+            if queue.waiting:
+                _, _, granted = heapq.heappop(queue.waiting)
+                granted.set()
+            else:
+                queue.in_flight = max(0, queue.in_flight - 1)
+
+    def _record_wait(self, queue: _EndpointQueue, priority: int, waited: float):
+        queue.waits[priority].append(waited)
+        queue.max_wait[priority] = max(queue.max_wait[priority], waited)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, in-flight count and wait times per endpoint and priority class"""
+        with self._lock:
+            endpoints = {}
+            for (host, port), queue in self._endpoints.items():
+                depth = {name: 0 for name in PRIORITY_NAMES.values()}
+                for priority, _, _ in queue.waiting:
+                    depth[PRIORITY_NAMES[priority]] += 1
+                classes = {}
+                for priority, name in PRIORITY_NAMES.items():
+                    waits = sorted(queue.waits[priority])
+                    classes[name] = {
+                        "submitted": queue.submitted[priority],
+                        "rejected": queue.rejected[priority],
+                        "queued": depth[name],
+                        "waitP50Ms": _milliseconds(percentile(waits, 0.5)),
+                        "waitP90Ms": _milliseconds(percentile(waits, 0.9)),
+                        "waitMaxMs": _milliseconds(queue.max_wait[priority]),
+                    }
+                endpoints[f"{host}:{port}"] = {
+                    "inFlight": queue.in_flight,
+                    "queueDepth": len(queue.waiting),
+                    "maxQueueDepth": queue.max_depth,
+                    "priorities": classes,
+                }
+            return {"window": self.window, "maxQueue": self.max_queue, "endpoints": endpoints}
+
+
+def _milliseconds(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 3) if seconds is not None else None
@@ -0,0 +1,270 @@
+"""
+Serving many MCP sessions from one bridge process
+
+With the SSE or streamable-HTTP transport, one long-lived bridge serves every
+agent session, so the document mirror, status cache, knowledge indexes and
+command scheduler are shared instead of rebuilt per process.
+
+FastMCP calls synchronous tools on its event loop, which would let one slow
+tool stall every session. SessionRunner moves tool and resource calls onto a
+bounded worker pool and makes tools that change the document take the
+DocumentLock for the calling session. A session can also hold the lock across
+several calls (lock_document / unlock_document) for a lease period.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from grasshopper_mcp.wrappers import wrap_handlers
+
+# Seconds a write waits for another session's lock before failing
+DEFAULT_LOCK_TIMEOUT = 30.0
+# Seconds an explicit lock_document hold lasts unless renewed
+DEFAULT_LEASE = 60.0
+DEFAULT_SESSION_WORKERS = 32
+
+# Owner used outside a networked session (stdio, background jobs without a session)
+LOCAL_OWNER = "local"
+
+# Session of the tool call being executed; copied into worker threads
+current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_session", default=None)
+
+
+class DocumentLockTimeout(Exception):
+    """Raised when the document stays locked by another session"""
+
+
+class DocumentLock:
+    """
+    Document write lock owned by a session
+
+    Re-entrant for its owner. Besides the per-call holds taken around write
+    tools, the owner can keep the lock for a lease period between calls.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.owner: Optional[str] = None
+        self._depth = 0
+        self._lease_until: Optional[float] = None
+        # Wake-up callbacks of event-loop waiters (acquire_async), called when the lock is freed
+        self._listeners: List[Callable[[], Any]] = []
+        self._stats = {"acquired": 0, "waited": 0, "timeouts": 0, "waitSeconds": 0.0, "expiredLeases": 0}
+
+    def _expire_lease(self, now: float):
+        if self._lease_until is not None and now >= self._lease_until:
+            self._lease_until = None
+            self._stats["expiredLeases"] += 1
+            if self._depth == 0:
+                self.owner = None
+                self._notify()
+
+    def _notify(self):
+        self._condition.notify_all()
+        listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener()
+
+    def _take(self, owner: str, started: float, waited: bool):
+        self.owner = owner
+        self._depth += 1
+        self._stats["acquired"] += 1
+        if waited:
+            self._stats["waited"] += 1
+            self._stats["waitSeconds"] += time.monotonic() - started
+
+    def _lease_wait(self, remaining: Optional[float]) -> Optional[float]:
+        """Time to wait for the lock to be freed, capped so an expiring lease is noticed"""
+        if self._lease_until is None:
+            return remaining
+        until_expiry = max(0.0, self._lease_until - time.time()) + 0.01
+        return until_expiry if remaining is None else min(remaining, until_expiry)
+
+    def acquire(self, owner: Optional[str], timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT):
+        """Take (or re-enter) the lock for owner, raising DocumentLockTimeout after timeout seconds (None: wait forever)"""
+        owner = owner or LOCAL_OWNER
+        started = time.monotonic()
+        with self._condition:
+            waited = False
+            while True:
+                self._expire_lease(time.time())
+                if self.owner is None or self.owner == owner:
+                    break
+                remaining = None if timeout is None else started + timeout - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise DocumentLockTimeout(f"Document is locked by another session (waited {timeout:g} seconds)")
+                waited = True
+                self._condition.wait(self._lease_wait(remaining))
+            self._take(owner, started, waited)
+
+    async def acquire_async(self, owner: Optional[str], timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT):
+        """acquire() for the event loop: waits without tying up a thread"""
+        owner = owner or LOCAL_OWNER
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        waited = False
+        while True:
+            freed = asyncio.Event()
+            with self._condition:
+                self._expire_lease(time.time())
+                if self.owner is None or self.owner == owner:
+                    self._take(owner, started, waited)
+                    return
+                remaining = None if timeout is None else started + timeout - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise DocumentLockTimeout(f"Document is locked by another session (waited {timeout:g} seconds)")
+                self._listeners.append(lambda: loop.call_soon_threadsafe(freed.set))
+                wait = self._lease_wait(remaining)
+            waited = True
+            try:
+                await asyncio.wait_for(freed.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, owner: Optional[str]):
+        owner = owner or LOCAL_OWNER
+        with self._condition:
+            if self.owner != owner or self._depth == 0:
+                return
+            self._depth -= 1
+            if self._depth == 0 and self._lease_until is None:
+                self.owner = None
+                self._notify()
+
+    @contextmanager
+    def held(self, owner: Optional[str], timeout: Optional[float] = DEFAULT_LOCK_TIMEOUT):
+        self.acquire(owner, timeout)
+        try:
+            yield
+        finally:
+            self.release(owner)
+
+    def hold(self, owner: Optional[str], lease: float = DEFAULT_LEASE, timeout: float = DEFAULT_LOCK_TIMEOUT) -> float:
+        """Keep the lock for owner for lease seconds after this call; returns the expiry time"""
+        owner = owner or LOCAL_OWNER
+        self.acquire(owner, timeout)
+        with self._condition:
+            self._lease_until = time.time() + lease
+            self._depth -= 1
+            return self._lease_until
+
+    def unhold(self, owner: Optional[str]) -> bool:
+        """End owner's lease; returns False if owner did not hold the lock"""
+        owner = owner or LOCAL_OWNER
+        with self._condition:
+            if self.owner != owner or self._lease_until is None:
+                return False
+            self._lease_until = None
+            if self._depth == 0:
+                self.owner = None
+                self._notify()
+            return True
+
+    def status(self) -> Dict[str, Any]:
+        with self._condition:
+            self._expire_lease(time.time())
+            status = {
+                "locked": self.owner is not None,
+                "owner": self.owner,
+                "leaseExpires": self._lease_until,
+            }
+            status.update(self._stats)
+            status["waitSeconds"] = round(status["waitSeconds"], 3)
+        return status
+
+
+class SessionRunner:
+    """
+    Runs a FastMCP server's tools and resources off the event loop, per session
+
+    Args:
+        server: FastMCP server to instrument
+        lock: Document lock taken around tools that change the document
+        is_read_only: Tool name -> True if the tool never changes the document
+        workers: Tool and resource calls executed at once across all sessions
+        lock_timeout: Seconds a write waits for another session's lock
+        on_session_end: Called with a session's ID once the session object is gone (disconnected)
+    """
+
+    def __init__(self, server, lock: DocumentLock, is_read_only: Callable[[str], bool],
+                 workers: int = DEFAULT_SESSION_WORKERS, lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+                 on_session_end: Optional[Callable[[str], None]] = None):
+        self.server = server
+        self.lock = lock
+        self.is_read_only = is_read_only
+        self.lock_timeout = lock_timeout
+        self.on_session_end = on_session_end
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="grasshopper-session")
+        self._sessions: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+        self._sessions_lock = threading.Lock()
+        self._seen = 0
+        self._calls = 0
+
+    def session_id(self) -> Optional[str]:
+        """Stable ID of the session making the current request, or None outside a request"""
+        try:
+            session = self.server._mcp_server.request_context.session
+        except LookupError:
+            return None
+        with self._sessions_lock:
+            session_id = self._sessions.get(session)
+            if session_id is None:
+                session_id = self._sessions[session] = uuid.uuid4().hex[:12]
+                self._seen += 1
+                weakref.finalize(session, self._session_ended, session_id)
+            return session_id
+
+    def _session_ended(self, session_id: str):
+        # A lease the session still holds must not outlive it
+        self.lock.unhold(session_id)
+        if self.on_session_end is not None:
+            self.on_session_end(session_id)
+
+    def install(self) -> int:
+        """Wrap every registered tool and resource, outside any profiling wrappers; returns the count"""
+        def wrap(kind, name, fn, is_async):
+            if is_async:
+                return None
+            return self._wrap(fn, lock=kind == "tool" and not self.is_read_only(name)), True
+        return wrap_handlers(self.server, "session", wrap)
+
+    def _wrap(self, fn: Callable, lock: bool) -> Callable:
+        @functools.wraps(fn)
+        async def run(*args, **kwargs):
+            session_id = self.session_id()
+            token = current_session.set(session_id)
+            try:
+                context = contextvars.copy_context()
+            finally:
+                current_session.reset(token)
+            self._calls += 1
+            loop = asyncio.get_running_loop()
+            if not lock:
+                return await loop.run_in_executor(self.executor, functools.partial(context.run, fn, *args, **kwargs))
+
+            # Wait for the document on the event loop, so sessions queued behind a lock hold no
+            # worker and the holder's own calls always find one
+            try:
+                await self.lock.acquire_async(session_id, kwargs.get("wait_seconds", self.lock_timeout))
+            except DocumentLockTimeout as e:
+                return {"success": False, "busy": True, "error": str(e)}
+            try:
+                return await loop.run_in_executor(self.executor, functools.partial(context.run, fn, *args, **kwargs))
+            finally:
+                self.lock.release(session_id)
+        return run
+
+    def status(self) -> Dict[str, Any]:
+        with self._sessions_lock:
+            sessions, seen = len(self._sessions), self._seen
+        return {"sessions": sessions, "sessionsSeen": seen, "calls": self._calls, "documentLock": self.lock.status()}
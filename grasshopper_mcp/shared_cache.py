@@ -0,0 +1,219 @@
+"""
+Optional cache shared by sibling bridge processes through a directory of memory-mapped entry files
+
+MCP hosts start one bridge process per chat session. With the shared cache
+enabled, a document listing fetched by one process is reused by the others
+for as long as the document fingerprint is unchanged.
+
+Each entry is one file: a fixed header (magic, format version, creation time,
+key length), the key and a JSON payload. Writers replace files atomically, so
+readers never lock; a per-key lock file makes sure only one process fetches a
+missing entry while the others wait for it.
+"""
+
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Bump when the entry layout or payload conventions change; older entries are ignored and removed
+CACHE_FORMAT = 1
+
+DEFAULT_MAX_ENTRIES = 256
+# Seconds an entry stays valid; document entries are keyed by fingerprint, so this mostly bounds disk use
+DEFAULT_MAX_AGE = 600.0
+# Seconds to wait for another process to fill an entry, and the age after which a lock counts as abandoned
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+_MAGIC = b"GHMC"
+_HEADER = struct.Struct("<4sHdI")
+_ENTRY_SUFFIX = ".entry"
+
+
+class SharedCache:
+    """
+    Versioned, read-mostly key/value store in a directory shared between processes
+
+    Args:
+        directory: Cache directory, created if missing
+        max_entries: Entries kept before the least recently written ones are evicted
+        max_age: Seconds after which an entry is stale
+        lock_timeout: Seconds to wait for a concurrent fill before fetching anyway
+    """
+
+    def __init__(self, directory: str, max_entries: int = DEFAULT_MAX_ENTRIES, max_age: float = DEFAULT_MAX_AGE,
+                 lock_timeout: float = DEFAULT_LOCK_TIMEOUT):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "waits": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + _ENTRY_SUFFIX)
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None when missing, stale or from another cache format"""
+        value = self._read(key)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def _read(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        value = None
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= _HEADER.size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        magic, version, created, key_length = _HEADER.unpack_from(mapped, 0)
+                        if magic != _MAGIC or version != CACHE_FORMAT or time.time() - created > self.max_age:
+                            stale = True
+                        else:
+                            stale = False
+                            key_end = _HEADER.size + key_length
+                            # Different keys can only collide on the file name, never on the stored key
+                            if mapped[_HEADER.size:key_end].decode("utf-8") == key:
+                                value = json.loads(mapped[key_end:])
+                else:
+                    stale = True
+        except FileNotFoundError:
+            stale = False
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable shared cache entry {path}: {str(e)}", file=sys.stderr)
+            stale = True
+        if stale:
+            self._remove(path)
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store value (JSON-serializable) under key and evict stale or excess entries"""
+        path = self._path(key)
+        encoded_key = key.encode("utf-8")
+        payload = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, CACHE_FORMAT, time.time(), len(encoded_key)))
+                f.write(encoded_key)
+                f.write(payload)
+            # Atomic: readers see either the old entry or the new one, never a partial file
+            os.replace(temp_path, path)
+        except OSError as e:
+            # e.g. the entry is mapped by a reader on Windows; the next writer will succeed
+            print(f"Could not write shared cache entry {path}: {str(e)}", file=sys.stderr)
+            self._remove(temp_path)
+            return
+        self._count("stores")
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Return the cached value, or compute and store it
+
+        Only one process computes a missing entry; others wait up to lock_timeout
+        for it to appear. compute() returning None means "do not cache".
+        """
+        value = self._read(key)
+        if value is not None:
+            self._count("hits")
+            return value
+
+        lock_path = self._path(key) + ".lock"
+        if self._acquire(lock_path):
+            try:
+                # Another process may have filled the entry while we took the lock
+                value = self._read(key)
+                if value is None:
+                    value = self._compute(key, compute)
+                else:
+                    self._count("hits")
+                return value
+            finally:
+                self._remove(lock_path)
+
+        self._count("waits")
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline and os.path.exists(lock_path):
+            time.sleep(0.02)
+        value = self._read(key)
+        if value is None:
+            return self._compute(key, compute)
+        self._count("hits")
+        return value
+
+    def _compute(self, key: str, compute: Callable[[], Optional[Any]]) -> Optional[Any]:
+        # Counted once per get_or_compute call, however many times the entry was looked up
+        self._count("misses")
+        value = compute()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def _acquire(self, lock_path: str) -> bool:
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Break locks left behind by processes that died while holding them
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.lock_timeout:
+                        self._remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                return False
+            except OSError:
+                return False
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            return True
+        return False
+
+    def evict(self):
+        """Remove stale entries, then the oldest ones beyond max_entries"""
+        now = time.time()
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*" + _ENTRY_SUFFIX)):
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > self.max_age:
+                self._remove(path, evicted=True)
+            else:
+                entries.append((mtime, path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            self._remove(path, evicted=True)
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*" + _ENTRY_SUFFIX)):
+            self._remove(path)
+
+    def _remove(self, path: str, evicted: bool = False):
+        try:
+            os.remove(path)
+        except OSError:
+            return
+        if evicted:
+            self._count("evictions")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["directory"] = self.directory
+        stats["entries"] = len(glob.glob(os.path.join(self.directory, "*" + _ENTRY_SUFFIX)))
+        return stats
@@ -0,0 +1,300 @@
+"""
+Compact, content-hashed document snapshots with O(n) diff and patch planning
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+from grasshopper_mcp.models import component_type_name
+
+SNAPSHOT_VERSION = 2
+
+# Positions closer than this are considered unchanged
+POSITION_TOLERANCE = 0.5
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def take_snapshot(components: Iterable[Dict[str, Any]], connections: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build a compact snapshot from get_all_components / get_connections results
+
+    Components are stored as [id, type, name, x, y, value] rows and connections
+    as [sourceId, sourceParam, targetId, targetParam] rows, both sorted, so equal
+    documents always hash to the same id.
+    """
+    component_rows = sorted(
+        [
+            component.get("id"),
+            component_type_name(component),
+            component.get("name"),
+            _number(component.get("x") or 0),
+            _number(component.get("y") or 0),
+            component.get("value"),
+        ]
+        for component in components
+        if component.get("id")
+    )
+    connection_rows = sorted((
+        [conn.get("sourceId"), conn.get("sourceParam"), conn.get("targetId"), conn.get("targetParam")]
+        for conn in connections
+        if conn.get("sourceId") and conn.get("targetId")
+    ), key=lambda row: ["" if value is None else str(value) for value in row])
+    body = {"version": SNAPSHOT_VERSION, "components": component_rows, "connections": connection_rows}
+    canonical = json.dumps(body, separators=(",", ":"), sort_keys=True, default=str)
+    body["hash"] = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+    return body
+
+
+def _component_rows(snapshot: Dict[str, Any]) -> List[List[Any]]:
+    """Component rows in the current [id, type, name, x, y, value] layout"""
+    if snapshot.get("version", 1) < 2:
+        return [[row[0], row[1], None] + list(row[2:]) for row in snapshot["components"]]
+    return snapshot["components"]
+
+
+def _place(row: List[Any]) -> Tuple[Any, Any, int, int]:
+    return (row[1], row[2], round(row[3]), round(row[4]))
+
+
+def match_components(old_rows: List[List[Any]], new_rows: List[List[Any]]) -> Dict[str, str]:
+    """
+    Pair components of two snapshots: new id -> old id
+
+    Components are matched by type, name and position first, so one deleted
+    and re-created in place (which gets a new InstanceGuid) is the same
+    component; among several at the same place the one with the same id wins.
+    The rest are matched by id when their type is unchanged.
+    """
+    by_place: Dict[Tuple[Any, Any, int, int], List[str]] = {}
+    for row in old_rows:
+        by_place.setdefault(_place(row), []).append(row[0])
+    old_types = {row[0]: row[1] for row in old_rows}
+
+    matches: Dict[str, str] = {}
+    matched_old = set()
+    unplaced = []
+    for row in new_rows:
+        candidates = [old_id for old_id in by_place.get(_place(row), ()) if old_id not in matched_old]
+        if not candidates:
+            unplaced.append(row)
+            continue
+        old_id = row[0] if row[0] in candidates else candidates[0]
+        matches[row[0]] = old_id
+        matched_old.add(old_id)
+    for row in unplaced:
+        if row[0] in old_types and row[0] not in matched_old and old_types[row[0]] == row[1]:
+            matches[row[0]] = row[0]
+            matched_old.add(row[0])
+    return matches
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Differences needed to turn the old snapshot into the new one
+
+    Components are paired with match_components and reported by their id in
+    the old snapshot; "matchedComponents" lists the pairs whose ids differ.
+    A component whose type changed counts as removed and re-added. Wires are
+    matched by target port, so a port fed by a different source is reported as
+    rewired rather than removed + added.
+    """
+    old_rows = _component_rows(old)
+    new_rows = _component_rows(new)
+    matches = match_components(old_rows, new_rows)
+    old_components = {row[0]: row for row in old_rows}
+
+    added, moved, values, matched = [], [], [], []
+    for row in new_rows:
+        old_id = matches.get(row[0])
+        if old_id is None:
+            added.append(row)
+            continue
+        previous = old_components[old_id]
+        if old_id != row[0]:
+            matched.append({"id": old_id, "newId": row[0]})
+        if abs(previous[3] - row[3]) > POSITION_TOLERANCE or abs(previous[4] - row[4]) > POSITION_TOLERANCE:
+            moved.append({"id": old_id, "x": row[3], "y": row[4]})
+        if row[5] is not None and previous[5] != row[5]:
+            values.append({"id": old_id, "value": row[5]})
+    matched_old = set(matches.values())
+    removed = [row for row in old_rows if row[0] not in matched_old]
+
+    # Refer to matched components by their old id on both sides
+    new_connections = [
+        [matches.get(source_id, source_id), source_param, matches.get(target_id, target_id), target_param]
+        for source_id, source_param, target_id, target_param in new["connections"]
+    ]
+    old_wires = _wires_by_port(old["connections"])
+    new_wires = _wires_by_port(new_connections)
+    added_wires, removed_wires, rewired = [], [], []
+    for port, sources in new_wires.items():
+        previous = old_wires.get(port, set())
+        gained = sources - previous
+        lost = previous - sources
+        if len(gained) == 1 and len(lost) == 1:
+            (source,), (old_source,) = gained, lost
+            rewired.append({
+                "targetId": port[0], "targetParam": port[1],
+                "fromSourceId": old_source[0], "fromSourceParam": old_source[1],
+                "sourceId": source[0], "sourceParam": source[1],
+            })
+            continue
+        added_wires.extend(_wire(source, port) for source in gained)
+        removed_wires.extend(_wire(source, port) for source in lost)
+    for port, sources in old_wires.items():
+        if port not in new_wires:
+            removed_wires.extend(_wire(source, port) for source in sources)
+
+    return {
+        "from": old.get("hash"),
+        "to": new.get("hash"),
+        "addedComponents": [_component(row) for row in added],
+        "removedComponents": [_component(row) for row in removed],
+        "matchedComponents": matched,
+        "movedComponents": moved,
+        "changedValues": values,
+        "addedConnections": added_wires,
+        "removedConnections": removed_wires,
+        "rewiredConnections": rewired,
+    }
+
+
+def _wires_by_port(rows: List[List[Any]]) -> Dict[Tuple[str, Optional[str]], set]:
+    wires: Dict[Tuple[str, Optional[str]], set] = {}
+    for source_id, source_param, target_id, target_param in rows:
+        wires.setdefault((target_id, target_param), set()).add((source_id, source_param))
+    return wires
+
+
+def _wire(source: Tuple[str, Optional[str]], port: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    return {"sourceId": source[0], "sourceParam": source[1], "targetId": port[0], "targetParam": port[1]}
+
+
+def _component(row: List[Any]) -> Dict[str, Any]:
+    return {"id": row[0], "type": row[1], "name": row[2], "x": row[3], "y": row[4], "value": row[5]}
+
+
+def is_empty_diff(diff: Dict[str, Any]) -> bool:
+    # Matched pairs need no command: the document keeps its own ids
+    return not any(value for key, value in diff.items() if key not in ("from", "to", "matchedComponents"))
+
+
+def plan_patch(diff: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Turn a diff into plug-in commands
+
+    Returns "create" commands (add_component, whose new ids must be mapped
+    before the rest runs), "update" commands (values, positions and wires, in
+    that order) and "unsupported" operations the plug-in has no command for
+    (removing components or wires).
+    """
+    create = [
+        {
+            "type": "add_component",
+            "parameters": {"type": component["type"], "x": component["x"], "y": component["y"]},
+            "snapshotId": component["id"],
+        }
+        for component in diff["addedComponents"]
+    ]
+
+    update = []
+    for component in diff["addedComponents"]:
+        if component.get("value") is not None:
+            update.append({"type": "set_component_value", "parameters": {"id": component["id"], "value": str(component["value"])}})
+    for change in diff["changedValues"]:
+        update.append({"type": "set_component_value", "parameters": {"id": change["id"], "value": str(change["value"])}})
+    for move in diff["movedComponents"]:
+        update.append({"type": "set_component_position", "parameters": {"id": move["id"], "x": move["x"], "y": move["y"]}})
+    for wire in diff["addedConnections"] + diff["rewiredConnections"]:
+        parameters = {"sourceId": wire["sourceId"], "targetId": wire["targetId"]}
+        if wire.get("sourceParam"):
+            parameters["sourceParam"] = wire["sourceParam"]
+        if wire.get("targetParam"):
+            parameters["targetParam"] = wire["targetParam"]
+        update.append({"type": "connect_components", "parameters": parameters})
+
+    unsupported = (
+        [{"operation": "remove_component", "id": component["id"], "type": component["type"]} for component in diff["removedComponents"]]
+        + [dict(wire, operation="remove_connection") for wire in diff["removedConnections"]]
+    )
+    return {"create": create, "update": update, "unsupported": unsupported}
+
+
+def remap_ids(commands: List[Dict[str, Any]], id_map: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Replace snapshot component ids with the ids Grasshopper assigned to re-created components"""
+    remapped = []
+    for command in commands:
+        parameters = dict(command["parameters"])
+        for key in ("id", "sourceId", "targetId"):
+            if parameters.get(key) in id_map:
+                parameters[key] = id_map[parameters[key]]
+        remapped.append({"type": command["type"], "parameters": parameters})
+    return remapped
+
+
+class SnapshotStore:
+    """
+    Bounded in-memory store of snapshots keyed by hash, optionally persisted as JSON files
+
+    Args:
+        directory: Directory to persist snapshots in, or None to keep them in memory only
+        capacity: Maximum number of snapshots kept in memory
+    """
+
+    def __init__(self, directory: Optional[str] = None, capacity: int = 64):
+        self.directory = directory
+        self.capacity = capacity
+        self._snapshots: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._labels: Dict[str, str] = {}
+
+    def _load_labels(self):
+        if self.directory and not self._labels and os.path.exists(os.path.join(self.directory, "labels.json")):
+            try:
+                with open(os.path.join(self.directory, "labels.json"), encoding="utf-8") as f:
+                    self._labels.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def put(self, snapshot: Dict[str, Any], label: Optional[str] = None) -> str:
+        # Merge with labels saved by earlier runs before rewriting labels.json
+        self._load_labels()
+        snapshot_hash = snapshot["hash"]
+        self._snapshots[snapshot_hash] = snapshot
+        self._snapshots.move_to_end(snapshot_hash)
+        while len(self._snapshots) > self.capacity:
+            self._snapshots.popitem(last=False)
+        if label:
+            self._labels[label] = snapshot_hash
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(os.path.join(self.directory, f"{snapshot_hash}.json"), "w", encoding="utf-8") as f:
+                    json.dump(snapshot, f, separators=(",", ":"))
+                if label:
+                    with open(os.path.join(self.directory, "labels.json"), "w", encoding="utf-8") as f:
+                        json.dump(self._labels, f)
+            except OSError as e:
+                print(f"Error persisting snapshot {snapshot_hash}: {str(e)}", file=sys.stderr)
+        return snapshot_hash
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a snapshot by hash or label"""
+        self._load_labels()
+        snapshot_hash = self._labels.get(key, key)
+        snapshot = self._snapshots.get(snapshot_hash)
+        if snapshot is None and self.directory:
+            path = os.path.join(self.directory, f"{os.path.basename(snapshot_hash)}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                self._snapshots[snapshot_hash] = snapshot
+        return snapshot
@@ -0,0 +1,407 @@
+"""
+Parameter sweeps: grid and Latin-hypercube sampling of slider values, with outputs
+streamed to CSV or Parquet, resumable runs and several Grasshopper endpoints
+"""
+
+import csv
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple, Callable, Set
+
+import numpy as np
+
+# Refuse sweeps larger than this many samples
+MAX_SAMPLES = 100000
+
+# Sidecar holding the sample plan, so a resumed run evaluates exactly the same samples
+PLAN_SUFFIX = ".plan.json"
+
+# An endpoint is dropped after this many consecutive transport failures
+MAX_ENDPOINT_FAILURES = 3
+
+# Rows buffered before a Parquet row group is written
+PARQUET_FLUSH_ROWS = 256
+
+Endpoint = Tuple[str, int]
+
+
+def parse_endpoints(value: Optional[str], default: Endpoint) -> List[Endpoint]:
+    """Parse "host:port,host:port" (as in GRASSHOPPER_ENDPOINTS); a bare port means localhost"""
+    endpoints = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":")
+        endpoints.append((host or "localhost", int(port)))
+    return endpoints or [default]
+
+
+def _axis(component_id: str, spec: Any) -> np.ndarray:
+    if isinstance(spec, dict):
+        steps = int(spec.get("steps", 5))
+        if steps < 1:
+            raise ValueError(f"Input {component_id}: steps must be at least 1")
+        return np.linspace(float(spec["min"]), float(spec["max"]), steps)
+    values = np.asarray(spec, dtype=np.float64).ravel()
+    if values.size == 0:
+        raise ValueError(f"Input {component_id}: no values given")
+    return values
+
+
+def _range(component_id: str, spec: Any) -> Tuple[float, float]:
+    if isinstance(spec, dict):
+        return float(spec["min"]), float(spec["max"])
+    values = np.asarray(spec, dtype=np.float64).ravel()
+    if values.size == 0:
+        raise ValueError(f"Input {component_id}: no values given")
+    return float(values.min()), float(values.max())
+
+
+def grid_samples(inputs: Dict[str, Any]) -> np.ndarray:
+    """
+    Full factorial grid over the inputs
+
+    Args:
+        inputs: Component ID -> list of values, or {"min", "max", "steps"}
+
+    Returns:
+        samples x inputs array, the last input varying fastest
+    """
+    axes = [_axis(component_id, spec) for component_id, spec in inputs.items()]
+    total = int(np.prod([len(axis) for axis in axes], dtype=np.int64))
+    if total > MAX_SAMPLES:
+        raise ValueError(f"Grid has {total} samples (limit {MAX_SAMPLES})")
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return np.stack([axis.ravel() for axis in mesh], axis=1)
+
+
+def latin_hypercube(inputs: Dict[str, Any], count: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    Latin-hypercube sample: each input's range is split into count strata and every stratum is used once
+
+    Args:
+        inputs: Component ID -> {"min", "max"} (or a list of values, whose min / max are used)
+        count: Number of samples
+        seed: Random seed, for reproducible samples
+    """
+    if count < 1 or count > MAX_SAMPLES:
+        raise ValueError(f"Sample count must be between 1 and {MAX_SAMPLES}")
+    ranges = np.array([_range(component_id, spec) for component_id, spec in inputs.items()])
+    rng = np.random.default_rng(seed)
+    strata = np.argsort(rng.random((count, len(ranges))), axis=0)
+    unit = (strata + rng.random((count, len(ranges)))) / count
+    return ranges[:, 0] + unit * (ranges[:, 1] - ranges[:, 0])
+
+
+def parse_outputs(outputs: Any) -> Dict[str, Tuple[str, Optional[str]]]:
+    """
+    Normalize output specs to label -> (component ID, output name)
+
+    Accepts a list of "id" / "id:Output" strings or a dict of label -> such a string.
+    """
+    if isinstance(outputs, str):
+        outputs = [outputs]
+    items = outputs.items() if isinstance(outputs, dict) else ((spec, spec) for spec in outputs)
+    parsed = {}
+    for label, spec in items:
+        component_id, _, name = str(spec).partition(":")
+        parsed[str(label)] = (component_id, name or None)
+    if not parsed:
+        raise ValueError("At least one output is required")
+    return parsed
+
+
+def output_value(info: Dict[str, Any], output_name: Optional[str]) -> Any:
+    """Pick a value out of a get_component_info(includeData) result: one item as a scalar, several as a list"""
+    outputs = info.get("outputs")
+    if outputs:
+        chosen = outputs[0] if output_name is None else next(
+            (output for output in outputs if output_name in (output.get("name"), output.get("nickname"))), None
+        )
+        if chosen is None:
+            raise ValueError(f"Output {output_name} not found")
+        data = chosen.get("data")
+    elif "data" in info:
+        data = info["data"]
+    else:
+        # Panels and sliders report their own value
+        return info.get("value")
+    if data is None:
+        return None
+    return data[0] if len(data) == 1 else data
+
+
+class CsvResultWriter:
+    """
+    Appends one row per sample; non-scalar values are JSON-encoded
+
+    Resuming drops the rows of failed samples, which are evaluated again.
+    """
+
+    def __init__(self, path: str, columns: List[str], resume: bool):
+        self.path = path
+        self.columns = columns
+        self.done: Set[int] = set()
+        exists = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            kept, failed = [], 0
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    if not row.get("error") and row.get("sample", "").isdigit():
+                        self.done.add(int(row["sample"]))
+                        kept.append(row)
+                    else:
+                        failed += 1
+            if failed:
+                # Rewrite without the failed rows, so each sample ends up with one row
+                temp_path = path + ".partial"
+                with open(temp_path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+                    writer.writeheader()
+                    writer.writerows(kept)
+                os.replace(temp_path, path)
+        self._file = open(path, "a" if exists else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns)
+        if not exists:
+            self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        self._writer.writerow({
+            key: json.dumps(value) if isinstance(value, (list, dict)) else value
+            for key, value in row.items()
+        })
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter:
+    """
+    Streams rows to a Parquet file in row groups (requires pyarrow)
+
+    Column types come from the first row group: numeric outputs become float64
+    and anything else JSON text. Resuming rewrites the completed rows first.
+    """
+
+    def __init__(self, path: str, columns: List[str], resume: bool):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Parquet output requires pyarrow (pip install pyarrow), or use a .csv path")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self.columns = columns
+        self.done: Set[int] = set()
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+        self._schema = None
+        if resume and os.path.exists(path):
+            previous = self._pq.read_table(path).to_pylist()
+            self._rows = [row for row in previous if not row.get("error")]
+            self.done = {int(row["sample"]) for row in self._rows}
+        # Write to a temporary file so an interrupted run keeps the previous results
+        self._temp_path = path + ".partial"
+
+    def write(self, row: Dict[str, Any]):
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_FLUSH_ROWS:
+            self._flush()
+
+    def _coerce(self, value: Any, field_type) -> Any:
+        if self._pa.types.is_floating(field_type):
+            return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+        if self._pa.types.is_integer(field_type):
+            return int(value) if value is not None else None
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value)
+
+    def _flush(self):
+        if not self._rows:
+            return
+        if self._schema is None:
+            fields = []
+            for column in self.columns:
+                sample = next((row.get(column) for row in self._rows if row.get(column) is not None), None)
+                if column == "sample":
+                    field_type = self._pa.int64()
+                elif isinstance(sample, (int, float)) and not isinstance(sample, bool):
+                    field_type = self._pa.float64()
+                else:
+                    field_type = self._pa.string()
+                fields.append(self._pa.field(column, field_type))
+            self._schema = self._pa.schema(fields)
+            self._writer = self._pq.ParquetWriter(self._temp_path, self._schema)
+        table = self._pa.Table.from_pydict({
+            field.name: [self._coerce(row.get(field.name), field.type) for row in self._rows]
+            for field in self._schema
+        }, schema=self._schema)
+        self._writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._temp_path, self.path)
+
+
+def _load_plan(path: str, plan: Dict[str, Any], resume: bool) -> Dict[str, Any]:
+    plan_path = path + PLAN_SUFFIX
+    if resume and os.path.exists(plan_path):
+        with open(plan_path, encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("inputs") != plan["inputs"] or stored.get("outputs") != plan["outputs"]:
+            raise ValueError(f"{path} belongs to a sweep with different inputs or outputs; pass resume=False or use another path")
+        return stored
+    with open(plan_path, "w", encoding="utf-8") as f:
+        json.dump(plan, f)
+    return plan
+
+
+def _is_transport_error(error: Optional[str]) -> bool:
+    error = error or ""
+    return "Error communicating with Grasshopper" in error or "Grasshopper is busy" in error
+
+
+def run_sweep(send_batch: Callable[..., List[Dict[str, Any]]], endpoints: List[Endpoint], input_ids: List[str],
+              samples: np.ndarray, outputs: Dict[str, Tuple[str, Optional[str]]], path: str,
+              input_labels: Optional[List[str]] = None, resume: bool = True,
+              output_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Evaluate every sample and stream one result row per sample to path
+
+    Each sample is one batch request: set every input (recomputing only after the
+    last one) and read every output with get_component_info. Endpoints are expected
+    to hold the same definition (e.g. the same .gh file opened in several Rhino
+    instances); each one gets a worker pulling samples from a shared queue, and an
+    endpoint that keeps failing is dropped and its samples retried elsewhere.
+
+    Args:
+        send_batch: send_batch_to_grasshopper-compatible callable (accepting endpoint=)
+        endpoints: (host, port) pairs to distribute samples over
+        input_ids: Slider / parameter component IDs, in sample column order
+        samples: samples x inputs array of values
+        outputs: label -> (component ID, output name or None)
+        path: Result file (.csv or .parquet)
+        input_labels: Column names for the inputs (default: the component IDs)
+        resume: Skip samples already completed in an existing result file
+        output_format: "csv" or "parquet" (default: from the file extension)
+
+    Returns:
+        Sample, completion and failure counts, per-endpoint counts and throughput
+    """
+    input_labels = input_labels or list(input_ids)
+    output_format = output_format or ("parquet" if path.lower().endswith((".parquet", ".pq")) else "csv")
+    plan = _load_plan(path, {
+        "inputs": list(input_ids),
+        "outputs": {label: list(spec) for label, spec in outputs.items()},
+        "samples": np.asarray(samples, dtype=np.float64).tolist(),
+    }, resume)
+    samples = plan["samples"]
+
+    columns = ["sample", "endpoint"] + input_labels + list(outputs) + ["error"]
+    writer_class = ParquetResultWriter if output_format == "parquet" else CsvResultWriter
+    writer = writer_class(path, columns, resume)
+    skipped = len(writer.done)
+
+    work: "queue.Queue[int]" = queue.Queue()
+    for index in range(len(samples)):
+        if index not in writer.done:
+            work.put(index)
+
+    lock = threading.Lock()
+    # "outstanding" counts queued or in-flight samples; workers stop when it reaches zero
+    counts = {"completed": 0, "failed": 0, "outstanding": work.qsize()}
+    per_endpoint = {f"{host}:{port}": 0 for host, port in endpoints}
+    dropped = []
+    started = time.perf_counter()
+
+    def evaluate(endpoint: Endpoint, index: int) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        values = samples[index]
+        commands = [
+            {"type": "set_component_value", "parameters": {"id": component_id, "value": str(value), "final": i == len(input_ids) - 1}}
+            for i, (component_id, value) in enumerate(zip(input_ids, values))
+        ]
+        commands += [
+            {"type": "get_component_info", "parameters": {"id": component_id, "includeData": True}}
+            for component_id, _ in outputs.values()
+        ]
+        responses = send_batch(commands, stop_on_error=True, endpoint=endpoint)
+        row = {"sample": index, "endpoint": f"{endpoint[0]}:{endpoint[1]}"}
+        row.update(zip(input_labels, values))
+        errors = [response.get("error") for response in responses if not response.get("success")]
+        if len(responses) < len(commands) and not errors:
+            errors.append("Not all commands were executed")
+        if errors and _is_transport_error(errors[0]):
+            return None, errors[0]
+        for (label, (_, output_name)), response in zip(outputs.items(), responses[len(input_ids):]):
+            if response.get("success"):
+                try:
+                    row[label] = output_value(response.get("result") or {}, output_name)
+                except ValueError as e:
+                    errors.append(f"{label}: {str(e)}")
+        row["error"] = "; ".join(str(error) for error in errors)
+        return row, None
+
+    def worker(endpoint: Endpoint):
+        failures = 0
+        while True:
+            with lock:
+                if counts["outstanding"] == 0:
+                    return
+            try:
+                # The queue can be briefly empty while another worker's sample is in flight and may be requeued
+                index = work.get(timeout=0.05)
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in threads if thread is not threading.current_thread()) and work.empty():
+                    return
+                continue
+            row, transport_error = evaluate(endpoint, index)
+            if transport_error:
+                # Leave the sample for another endpoint
+                work.put(index)
+                failures += 1
+                if failures >= MAX_ENDPOINT_FAILURES:
+                    with lock:
+                        dropped.append({"endpoint": f"{endpoint[0]}:{endpoint[1]}", "error": transport_error})
+                    return
+                time.sleep(0.1 * failures)
+                continue
+            failures = 0
+            with lock:
+                writer.write(row)
+                per_endpoint[row["endpoint"]] += 1
+                counts["failed" if row["error"] else "completed"] += 1
+                counts["outstanding"] -= 1
+
+    threads = [threading.Thread(target=worker, args=(endpoint,), name=f"sweep-{endpoint[1]}", daemon=True) for endpoint in endpoints]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "format": output_format,
+        "samples": len(samples),
+        "skipped": skipped,
+        "completed": counts["completed"],
+        "failed": counts["failed"],
+        "remaining": work.qsize(),
+        "endpoints": per_endpoint,
+        "droppedEndpoints": dropped,
+        "elapsedSeconds": round(elapsed, 3),
+        "samplesPerSecond": round((counts["completed"] + counts["failed"]) / elapsed, 2) if elapsed > 0 else None,
+    }
@@ -0,0 +1,225 @@
+"""
+Reusable subgraph templates captured from the canvas
+
+A template holds a set of components (type, position relative to the set's
+top-left corner, value and slider settings) and the wires between them. It is
+stored under the hash of its canonical JSON, so capturing the same
+sub-definition twice, anywhere on the canvas, yields the same template.
+Instantiating a template plans one batch of add_component commands and one
+batch of settings, values and wires for any number of copies.
+"""
+
+import hashlib
+import json
+import math
+import os
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from grasshopper_mcp.models import DocumentModel
+from grasshopper_mcp.snapshot import SnapshotStore, _number
+
+TEMPLATE_VERSION = 1
+
+# Vertical gap between copies when no offset is given
+DEFAULT_COPY_GAP = 150.0
+
+# Prefix of the component ids used in planned commands until Grasshopper assigns real ones
+PLACEHOLDER_PREFIX = "template:"
+
+
+def default_template_directory() -> str:
+    return os.environ.get("GRASSHOPPER_MCP_TEMPLATE_DIR") or os.path.join(os.path.expanduser("~"), ".grasshopper-mcp", "templates")
+
+
+def _slider_settings(component) -> Optional[Dict[str, Any]]:
+    if component.type != "Number Slider" or component.minimum is None or component.maximum is None:
+        return None
+    settings = {"min": _number(component.minimum), "max": _number(component.maximum)}
+    if component.rounding:
+        settings["rounding"] = _number(component.rounding)
+    return settings
+
+
+def capture_template(model: DocumentModel, component_ids: Iterable[str]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Build a template from components of the document model
+
+    Components are stored as [type, dx, dy, value, settings] rows sorted by
+    position, so a row's index is the component's key in the template; wires
+    between them as [source index, sourceParam, target index, targetParam].
+
+    Returns:
+        (template, info) where info counts the wires to components outside the set, which are not captured
+    """
+    ids = list(dict.fromkeys(component_ids))
+    missing = [component_id for component_id in ids if component_id not in model.components]
+    if missing:
+        raise ValueError(f"Components not found: {', '.join(missing)}")
+    if not ids:
+        raise ValueError("No components specified")
+
+    selected = [model.components[component_id] for component_id in ids]
+    left = min(component.x for component in selected)
+    top = min(component.y for component in selected)
+    # Sort by position first so the row order (and hash) does not depend on component ids
+    rows = sorted(
+        (
+            (
+                [
+                    component.type,
+                    _number(round(component.x - left, 3)),
+                    _number(round(component.y - top, 3)),
+                    component.value,
+                    _slider_settings(component),
+                ],
+                component.id
+            )
+            for component in selected
+        ),
+        key=lambda item: json.dumps([item[0][2], item[0][1], item[0][0], item[0][3], item[0][4]], sort_keys=True, default=str)
+    )
+    index = {component_id: i for i, (_, component_id) in enumerate(rows)}
+
+    connections = []
+    external = 0
+    seen = set()
+    for component_id in ids:
+        for conn in model.connections_of(component_id):
+            if id(conn) in seen:
+                continue
+            seen.add(id(conn))
+            if conn.source_id in index and conn.target_id in index:
+                connections.append([index[conn.source_id], conn.source_param, index[conn.target_id], conn.target_param])
+            else:
+                external += 1
+    connections.sort(key=lambda row: ["" if value is None else str(value) for value in row])
+
+    template = {
+        "version": TEMPLATE_VERSION,
+        "components": [row for row, _ in rows],
+        "connections": connections,
+    }
+    canonical = json.dumps(template, separators=(",", ":"), sort_keys=True, default=str)
+    template["hash"] = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+    return template, {"externalConnections": external, "sourceIds": [component_id for _, component_id in rows]}
+
+
+def template_size(template: Dict[str, Any]) -> Tuple[float, float]:
+    """Width and height of the template's component positions"""
+    rows = template["components"]
+    return max(row[1] for row in rows), max(row[2] for row in rows)
+
+
+def _placeholder(copy: int, index: int) -> str:
+    return f"{PLACEHOLDER_PREFIX}{copy}:{index}"
+
+
+def plan_instances(template: Dict[str, Any], copies: int = 1, origin: Tuple[float, float] = (0.0, 0.0),
+                   offset: Optional[Tuple[float, float]] = None,
+                   overrides: Optional[List[Dict[str, Any]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Plan plug-in commands for copies of a template
+
+    Args:
+        template: Template from capture_template
+        copies: Number of copies
+        origin: Canvas position of the first copy's top-left corner
+        offset: Shift between consecutive copies (default: stacked below each other)
+        overrides: Per copy, component index -> value (or {"value", "min", "max", "rounding"} for sliders);
+            a single entry applies to every copy
+
+    Returns:
+        "create" add_component commands with a "placeholder" id, and "update" commands
+        (slider settings and values, then wires) referring to the placeholders; map them
+        to real ids with snapshot.remap_ids
+    """
+    if copies < 1:
+        raise ValueError("copies must be at least 1")
+    rows = template["components"]
+    if offset is None:
+        offset = (0.0, template_size(template)[1] + DEFAULT_COPY_GAP)
+    overrides = overrides or []
+    if len(overrides) not in (0, 1, copies):
+        raise ValueError(f"Expected 1 or {copies} override sets, got {len(overrides)}")
+
+    create, settings, wires = [], [], []
+    for copy in range(copies):
+        copy_overrides = overrides[copy if len(overrides) > 1 else 0] if overrides else {}
+        unknown = [key for key in copy_overrides if not str(key).isdigit() or int(key) >= len(rows)]
+        if unknown:
+            raise ValueError(f"Unknown component index in overrides: {', '.join(map(str, unknown))}")
+        x0, y0 = origin[0] + copy * offset[0], origin[1] + copy * offset[1]
+        for index, (component_type, dx, dy, value, slider) in enumerate(rows):
+            placeholder = _placeholder(copy, index)
+            create.append({
+                "type": "add_component",
+                "parameters": {"type": component_type, "x": x0 + dx, "y": y0 + dy},
+                "placeholder": placeholder,
+            })
+            override = copy_overrides.get(str(index), copy_overrides.get(index))
+            if isinstance(override, dict):
+                bounds = {key: override[key] for key in ("min", "max", "rounding") if key in override}
+                if bounds:
+                    if component_type != "Number Slider":
+                        raise ValueError(f"Component {index} is a {component_type}, not a Number Slider; it has no range to override")
+                    slider = dict(slider or {}, **bounds)
+                    if "min" not in slider or "max" not in slider:
+                        raise ValueError(f"Component {index} has no captured range; override both min and max")
+                value = override.get("value", value)
+            elif override is not None:
+                value = override
+            parameters = {"id": placeholder}
+            if slider:
+                parameters["minimum"] = slider["min"]
+                parameters["maximum"] = slider["max"]
+                if slider.get("rounding"):
+                    parameters["decimals"] = max(0, round(-math.log10(slider["rounding"])))
+            if value is not None:
+                parameters["value"] = str(value)
+            if len(parameters) > 1:
+                settings.append({"type": "set_component_value", "parameters": parameters})
+        for source, source_param, target, target_param in template["connections"]:
+            parameters = {"sourceId": _placeholder(copy, source), "targetId": _placeholder(copy, target)}
+            if source_param:
+                parameters["sourceParam"] = source_param
+            if target_param:
+                parameters["targetParam"] = target_param
+            wires.append({"type": "connect_components", "parameters": parameters})
+    return {"create": create, "update": settings + wires}
+
+
+class TemplateStore(SnapshotStore):
+    """
+    Templates persisted as JSON files keyed by hash, with names
+
+    Args:
+        directory: Directory holding the templates (created on first capture)
+        capacity: Templates kept in memory
+    """
+
+    def names(self) -> Dict[str, str]:
+        """Template name -> hash"""
+        self._load_labels()
+        return dict(self._labels)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of every stored template"""
+        names: Dict[str, List[str]] = {}
+        for name, template_hash in self.names().items():
+            names.setdefault(template_hash, []).append(name)
+        hashes = set(names)
+        if self.directory and os.path.isdir(self.directory):
+            hashes.update(filename[:-5] for filename in os.listdir(self.directory)
+                          if filename.endswith(".json") and filename != "labels.json")
+        summaries = []
+        for template_hash in sorted(hashes):
+            template = self.get(template_hash)
+            if template is None:
+                continue
+            summaries.append({
+                "hash": template_hash,
+                "names": sorted(names.get(template_hash, [])),
+                "components": [row[0] for row in template["components"]],
+                "connections": len(template["connections"]),
+            })
+        return summaries
@@ -0,0 +1,169 @@
+"""
+Background document change watcher and MCP resource subscriptions
+"""
+
+import asyncio
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+# Polling interval bounds in seconds; the interval doubles while nothing changes
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 30.0
+# Seconds to wait after a poke before polling, so a burst of edits costs one poll
+DEFAULT_POKE_DELAY = 0.05
+
+
+class DocumentWatcher:
+    """
+    Polls a cheap document fingerprint with adaptive backoff
+
+    The interval starts at ``min_interval`` and is multiplied by ``backoff``
+    after every unchanged poll up to ``max_interval``; any change resets it.
+    ``on_change`` is called from the watcher thread with the new fingerprint.
+
+    Each start() runs a thread with its own stop and wake events, so a thread
+    that is still winding down after stop() never keeps a new start() from
+    taking effect.
+
+    Args:
+        fetch_fingerprint: Returns the current fingerprint, or None when Grasshopper is unreachable
+        on_change: Called with the new fingerprint whenever it differs from the previous one
+        active: Checked before every poll; the watcher stops itself once it returns False
+        poke_delay: Seconds between a poke() and the poll it triggers
+    """
+
+    def __init__(self, fetch_fingerprint: Callable[[], Optional[str]], on_change: Callable[[str], None],
+                 min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL,
+                 backoff: float = 2.0, active: Optional[Callable[[], bool]] = None,
+                 poke_delay: float = DEFAULT_POKE_DELAY):
+        self.fetch_fingerprint = fetch_fingerprint
+        self.on_change = on_change
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.active = active
+        self.poke_delay = poke_delay
+        self.fingerprint: Optional[str] = None
+        self.interval = min_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stopped.is_set()
+
+    @property
+    def running(self) -> bool:
+        """Whether a watcher thread is polling (a stopped thread that has not exited yet does not count)"""
+        with self._lock:
+            return self._is_running()
+
+    def start(self):
+        with self._lock:
+            if self._is_running():
+                return
+            self._stopped = threading.Event()
+            self._wake = threading.Event()
+            self.interval = self.min_interval
+            self._thread = threading.Thread(target=self._run, args=(self._stopped, self._wake),
+                                            name="grasshopper-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            self._wake.set()
+
+    def poke(self):
+        """Check again now and reset the backoff (e.g. after the bridge changed the document)"""
+        self.interval = self.min_interval
+        self._wake.set()
+
+    def check(self) -> bool:
+        """Poll once; returns True when the fingerprint changed"""
+        fingerprint = self.fetch_fingerprint()
+        if fingerprint is None:
+            return False
+        changed = self.fingerprint is not None and fingerprint != self.fingerprint
+        self.fingerprint = fingerprint
+        if changed:
+            self.on_change(fingerprint)
+        return changed
+
+    def _run(self, stopped: threading.Event, wake: threading.Event):
+        while True:
+            # Decide under the lock, so a start() racing with the last subscriber leaving starts a new thread
+            with self._lock:
+                if not stopped.is_set() and self.active is not None and not self.active():
+                    stopped.set()
+                if stopped.is_set():
+                    return
+            try:
+                changed = self.check()
+            except Exception as e:
+                print(f"Error watching Grasshopper document: {str(e)}", file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                changed = False
+            if changed:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            if wake.wait(self.interval):
+                # Poked: let the rest of a burst of edits arrive first (stop() cuts this short)
+                stopped.wait(self.poke_delay)
+            wake.clear()
+
+
+class ResourceSubscriptions:
+    """
+    MCP sessions subscribed to resource URIs
+
+    Subscriptions are recorded from the session's event loop; notifications
+    may be sent from any thread and are scheduled back onto that loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # uri -> {session: event loop}
+        self._subscribers: Dict[str, Dict[Any, asyncio.AbstractEventLoop]] = {}
+
+    def subscribe(self, uri: str, session: Any, loop: asyncio.AbstractEventLoop):
+        with self._lock:
+            self._subscribers.setdefault(uri, {})[session] = loop
+
+    def unsubscribe(self, uri: str, session: Any):
+        with self._lock:
+            sessions = self._subscribers.get(uri)
+            if sessions is not None:
+                sessions.pop(session, None)
+                if not sessions:
+                    del self._subscribers[uri]
+
+    def count(self, uri: Optional[str] = None) -> int:
+        with self._lock:
+            if uri is not None:
+                return len(self._subscribers.get(uri, {}))
+            return sum(len(sessions) for sessions in self._subscribers.values())
+
+    def notify(self, uri: str):
+        """Send notifications/resources/updated for uri to every subscribed session"""
+        with self._lock:
+            targets = list(self._subscribers.get(uri, {}).items())
+        for session, loop in targets:
+            if loop.is_closed():
+                self.unsubscribe(uri, session)
+                continue
+            future = asyncio.run_coroutine_threadsafe(self._send(session, uri), loop)
+            future.add_done_callback(lambda f, s=session: self._drop_on_error(f, uri, s))
+
+    async def _send(self, session: Any, uri: str):
+        from pydantic import AnyUrl
+        await session.send_resource_updated(AnyUrl(uri))
+
+    def _drop_on_error(self, future, uri: str, session: Any):
+        if future.cancelled() or future.exception() is not None:
+            # The session went away; stop notifying it
+            self.unsubscribe(uri, session)
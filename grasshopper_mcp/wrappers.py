@@ -0,0 +1,69 @@
+"""
+Wrapping the functions behind a FastMCP server's tools and resources
+
+The profiler and the session runner both replace the function of every
+registered tool and resource. This module is the only place that does so,
+and it installs the wrappers as named layers in a fixed order, innermost
+first (LAYERS):
+
+- "profile": ToolProfiler.instrument, which profiles the synchronous call on
+  the thread that runs it
+- "session": SessionRunner.install, which makes tools asynchronous and moves
+  the call onto its worker pool, so it has to wrap the profiled function
+
+Installing a layer out of order, or twice, raises RuntimeError instead of
+silently profiling the wrong thing.
+"""
+
+import inspect
+import weakref
+from typing import Callable, List, Optional, Tuple
+
+# Wrapper layers, innermost first
+LAYERS = ("profile", "session")
+
+# wrap(kind, name, fn, is_async) -> (new fn, new is_async), or None to leave the function as it is;
+# kind is "tool" or "resource", name the tool name or resource URI
+Wrapper = Callable[[str, str, Callable, bool], Optional[Tuple[Callable, bool]]]
+
+_installed: "weakref.WeakKeyDictionary[object, List[str]]" = weakref.WeakKeyDictionary()
+
+
+def installed_layers(server) -> List[str]:
+    """Layers wrapped around the server's tools and resources so far, innermost first"""
+    return list(_installed.get(server, []))
+
+
+def wrap_handlers(server, layer: str, wrap: Wrapper) -> int:
+    """
+    Wrap every tool and resource function registered on a FastMCP server
+
+    Args:
+        server: FastMCP server
+        layer: Name of the wrapper layer, one of LAYERS
+        wrap: Called once per tool and resource function
+
+    Returns:
+        Number of functions wrapped
+    """
+    if layer not in LAYERS:
+        raise ValueError(f"Unknown wrapper layer: {layer} (expected {', '.join(LAYERS)})")
+    layers = _installed.setdefault(server, [])
+    if layers and LAYERS.index(layer) <= LAYERS.index(layers[-1]):
+        raise RuntimeError(f"Cannot wrap tools with '{layer}' after '{layers[-1]}'; install layers in the order {', '.join(LAYERS)}")
+    layers.append(layer)
+
+    count = 0
+    for name, tool in server._tool_manager._tools.items():
+        wrapped = wrap("tool", name, tool.fn, tool.is_async)
+        if wrapped is not None:
+            tool.fn, tool.is_async = wrapped
+            count += 1
+    for uri, resource in server._resource_manager._resources.items():
+        # Only function resources have a function to wrap
+        if hasattr(resource, "fn"):
+            wrapped = wrap("resource", uri, resource.fn, inspect.iscoroutinefunction(resource.fn))
+            if wrapped is not None:
+                resource.fn = wrapped[0]
+                count += 1
+    return count
@@ -12,9 +12,13 @@ setup(
     include_package_data=True,
     install_requires=[
         "mcp>=0.1.0",
+        "numpy>=1.17",
         "websockets>=10.0",
         "aiohttp>=3.8.0",
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+    },
     entry_points={
         "console_scripts": [
             "grasshopper-mcp=grasshopper_mcp.bridge:main",
@@ -0,0 +1,18 @@
+import pytest
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.emulator import EmulatorServer
+from grasshopper_mcp.mirror import DocumentMirror
+
+
+@pytest.fixture
+def emulator(monkeypatch):
+    """Emulated plug-in on a free port, with the bridge pointed at it and a fresh mirror"""
+    server = EmulatorServer("localhost", 0)
+    server.start_background()
+    monkeypatch.setattr(bridge, "GRASSHOPPER_PORT", server.server_address[1])
+    monkeypatch.setattr(bridge, "document_mirror", DocumentMirror())
+    monkeypatch.setattr(bridge, "_status_cache", {"fingerprint": None, "status": None})
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,78 @@
+from grasshopper_mcp import bridge
+
+
+def add(component_type, x=0, y=0):
+    return bridge.add_component(component_type, x, y)["result"]["id"]
+
+
+def wires(emulator):
+    return {(c["sourceId"], c["targetId"], c["targetParam"]) for c in emulator.document.get_connections({})}
+
+
+def test_fan_out_wires_one_source_to_every_target(emulator):
+    slider = add("Number Slider")
+    panels = [add("Panel", 200, 100 * i) for i in range(3)]
+
+    response = bridge.connect_many([{"mode": "fan_out", "source_id": slider, "target_ids": panels}])
+
+    assert response["success"]
+    assert response["result"]["succeeded"] == 3
+    assert {(source, target) for source, target, _ in wires(emulator)} == {(slider, panel) for panel in panels}
+    assert emulator.document.command_counts["connect_components"] == 3
+
+
+def test_fan_in_assigns_free_inputs_in_order(emulator):
+    sliders = [add("Number Slider", 0, 100 * i) for i in range(3)]
+    point = add("Construct Point", 200, 100)
+
+    response = bridge.connect_many([{"mode": "fan_in", "source_ids": sliders, "target_id": point}])
+
+    assert response["success"]
+    assert wires(emulator) == {(slider, point, name) for slider, name in zip(sliders, ["X", "Y", "Z"])}
+
+
+def test_fan_in_with_explicit_target_params(emulator):
+    sliders = [add("Number Slider", 0, 100 * i) for i in range(2)]
+    addition = add("Addition", 200, 50)
+
+    response = bridge.connect_many([{"mode": "fan_in", "source_ids": sliders, "target_id": addition,
+                                     "target_params": ["B", "A"]}])
+
+    assert response["success"]
+    assert wires(emulator) == {(sliders[0], addition, "B"), (sliders[1], addition, "A")}
+
+
+def test_zip_pairs_sources_with_targets(emulator):
+    sliders = [add("Number Slider", 0, 100 * i) for i in range(2)]
+    panels = [add("Panel", 200, 100 * i) for i in range(2)]
+
+    response = bridge.connect_many([{"mode": "zip", "source_ids": sliders, "target_ids": panels}])
+
+    assert response["success"]
+    assert {(source, target) for source, target, _ in wires(emulator)} == set(zip(sliders, panels))
+
+
+def test_malformed_specs_are_rejected_before_sending(emulator):
+    response = bridge.connect_many([
+        {"mode": "zip", "source_ids": ["a", "b"], "target_ids": ["c"]},
+        {"mode": "fan_in", "source_ids": ["a", "b"], "target_id": "c", "target_params": ["A"]},
+        {"mode": "fan_out", "source_id": "a", "target_ids": []},
+        {"mode": "spiral"},
+    ])
+
+    assert not response["success"]
+    assert [error.split(":")[0] for error in response["errors"]] == ["Spec 0", "Spec 1", "Spec 2", "Spec 3"]
+    assert "2 sources and 1 targets" in response["errors"][0]
+    assert "connect_components" not in emulator.document.command_counts
+    assert not bridge.connect_many([])["success"]
+
+
+def test_failed_wires_are_reported_per_wire(emulator):
+    slider = add("Number Slider")
+    panel = add("Panel", 200, 0)
+
+    response = bridge.connect_many([{"mode": "fan_out", "source_id": slider, "target_ids": ["missing", panel]}])
+
+    assert not response["success"]
+    assert [entry["success"] for entry in response["result"]["results"]] == [False, True]
+    assert not bridge.document_mirror.is_synced()
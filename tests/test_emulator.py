@@ -0,0 +1,52 @@
+import os
+import re
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.emulator import EmulatedDocument
+
+REGISTRY = os.path.join(os.path.dirname(__file__), "..", "GH_MCP", "GH_MCP", "Commands", "GrasshopperCommandRegistry.cs")
+
+
+def registered_commands():
+    with open(REGISTRY, encoding="utf-8") as f:
+        return set(re.findall(r'RegisterCommand\("([a-z_]+)"', f.read()))
+
+
+def test_emulator_only_handles_registered_commands():
+    assert set(EmulatedDocument().handlers) - registered_commands() == set()
+
+
+def test_unregistered_command_is_rejected():
+    response = EmulatedDocument().execute({"type": "get_everything", "parameters": {}})
+    assert not response["success"]
+    assert "No handler registered for command type 'get_everything'" in response["error"]
+
+
+def test_types_are_class_names():
+    document = EmulatedDocument()
+    slider = document.execute({"type": "add_component", "parameters": {"type": "Number Slider"}})["data"]
+    addition = document.execute({"type": "add_component", "parameters": {"type": "Addition"}})["data"]
+    assert slider["type"] == "GH_NumberSlider"
+    assert addition["type"] != "Addition"
+    listing = {row["id"]: row for row in document.execute({"type": "get_all_components"})["data"]}
+    assert listing[slider["id"]]["componentName"] == "Number Slider"
+    assert listing[slider["id"]]["minimum"] == 0
+
+
+def test_floating_parameter_is_its_own_port():
+    document = EmulatedDocument()
+    slider = document.execute({"type": "add_component", "parameters": {"type": "Number Slider"}})["data"]
+    panel = document.execute({"type": "add_component", "parameters": {"type": "Panel"}})["data"]
+    response = document.execute({"type": "connect_components", "parameters": {"sourceId": slider["id"], "targetId": panel["id"], "targetParam": "anything"}})
+    assert response["success"]
+    assert document.execute({"type": "get_connections"})["data"] == [
+        {"sourceId": slider["id"], "sourceParam": "Number Slider", "targetId": panel["id"], "targetParam": "Panel"}
+    ]
+
+
+def test_bridge_model_normalizes_emulator_types(emulator):
+    slider = bridge.add_component("Number Slider", 0, 0)["result"]
+    bridge.add_component("Addition", 200, 0)
+    model = bridge.load_document_model()
+    assert [component.id for component in model.of_type("Number Slider")] == [slider["id"]]
+    assert model.of_type("Addition")
@@ -0,0 +1,85 @@
+from grasshopper_mcp import bridge
+from grasshopper_mcp.graph import ComponentGraph
+
+
+def wire(source, target, param=None):
+    return {"sourceId": source, "targetId": target, "targetParam": param}
+
+
+def make_graph(edges, ids=()):
+    components = [{"id": component_id, "type": "Addition"} for component_id in ids]
+    return ComponentGraph(components, [wire(*edge) for edge in edges])
+
+
+def test_upstream_and_downstream_follow_paths_nearest_first():
+    graph = make_graph([("a", "b"), ("b", "c"), ("a", "d"), ("d", "c"), ("c", "e"), ("x", "y")])
+
+    assert graph.downstream("a") == ["b", "d", "c", "e"]
+    assert graph.upstream("e") == ["c", "b", "d", "a"]
+    assert graph.upstream("a") == []
+    assert graph.downstream("x") == ["y"]
+
+
+def test_cycles_are_strongly_connected_components():
+    # b <-> c is a loop, d feeds back into itself, a and e only touch the loop
+    graph = make_graph([("a", "b"), ("b", "c"), ("c", "b"), ("c", "e"), ("d", "d")])
+
+    cycles = graph.cycles()
+
+    assert sorted(sorted(cycle) for cycle in cycles) == [["b", "c"], ["d"]]
+    assert graph.topological_order() == ["a"]
+    assert "c" in graph.downstream("b") and "b" in graph.downstream("c")
+
+
+def test_acyclic_graph_orders_every_component():
+    graph = make_graph([("a", "b"), ("b", "c"), ("a", "c")], ids=["c", "b", "a", "lonely"])
+
+    order = graph.topological_order()
+
+    assert sorted(order) == ["a", "b", "c", "lonely"]
+    assert order.index("a") < order.index("b") < order.index("c")
+    assert graph.cycles() == []
+    assert graph.orphans() == ["lonely"]
+
+
+def test_wires_to_unlisted_components_become_untyped_nodes():
+    graph = ComponentGraph([{"id": "a", "componentName": "Number Slider"}], [wire("a", "ghost"), {"sourceId": "a"}])
+
+    assert graph.types == {"a": "Number Slider", "ghost": None}
+    assert graph.edge_count == 1
+
+
+def test_dangling_inputs_skip_connected_and_unknown_components():
+    graph = make_graph([("s", "add", "A"), ("s", "half")], ids=["add", "half", "s"])
+    inputs = {"add": ["A", "B"], "half": ["A", "B"]}
+
+    dangling = graph.dangling_inputs(lambda component_id, _: inputs.get(component_id))
+
+    # "half" has an unnamed wire that might be either input, so only its count is trusted
+    assert dangling == [
+        {"id": "add", "type": "Addition", "inputs": ["B"]},
+        {"id": "half", "type": "Addition", "inputs": ["A", "B"]},
+    ]
+
+
+def test_graph_query_against_emulator(emulator):
+    slider = bridge.add_component("Number Slider", 0, 0)["result"]["id"]
+    addition = bridge.add_component("Addition", 200, 0)["result"]["id"]
+    panel = bridge.add_component("Panel", 400, 0)["result"]["id"]
+    lonely = bridge.add_component("Panel", 0, 300)["result"]["id"]
+    assert bridge.connect_components(slider, addition, target_param="A")["success"]
+    assert bridge.connect_components(addition, panel)["success"]
+
+    summary = bridge.graph_query()["result"]
+
+    assert summary["isAcyclic"]
+    assert summary["cycles"] == []
+    assert summary["orphans"] == [lonely]
+    assert summary["topologicalOrder"].index(slider) < summary["topologicalOrder"].index(addition)
+    assert (summary["componentCount"], summary["connectionCount"]) == (4, 2)
+
+    downstream = bridge.graph_query("downstream", slider)["result"]["downstream"]
+    assert [entry["id"] for entry in downstream] == [addition, panel]
+    assert not bridge.graph_query("upstream")["success"]
+    assert not bridge.graph_query("upstream", "missing")["success"]
+    assert not bridge.graph_query("shortest_path")["success"]
@@ -0,0 +1,74 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.http_gateway import HttpGateway
+
+
+def request(gateway, method, path, **kwargs):
+    """Send one request to a fresh app of the gateway; returns (status, headers, JSON body)"""
+    async def send():
+        async with TestClient(TestServer(gateway.create_app())) as client:
+            response = await client.request(method, path, **kwargs)
+            return response.status, response.headers, await response.json()
+    return asyncio.run(send())
+
+
+def make_gateway(**kwargs):
+    # The app shuts the gateway's workers down on cleanup, so each request gets its own gateway
+    return HttpGateway(bridge.server, bridge.send_to_grasshopper, bridge.track_commands, workers=2,
+                       run_transaction=bridge.run_in_transaction, **kwargs)
+
+
+def test_tool_call_goes_through_server(emulator):
+    status, headers, body = request(make_gateway(), "POST", "/tools/add_component",
+                                    json={"component_type": "Panel", "x": 1, "y": 2})
+
+    assert status == 200
+    assert body["success"]
+    assert headers["X-Grasshopper-Commands"] != "0"
+    assert [component["name"] for component in emulator.document.components.values()] == ["Panel"]
+
+
+def test_tool_errors_map_to_status_codes(emulator):
+    assert request(make_gateway(), "POST", "/tools/no_such_tool", json={})[0] == 404
+    status, _, body = request(make_gateway(), "POST", "/tools/add_component", json={"x": 1})
+    assert status == 400
+    assert "component_type" in body["error"]
+
+
+def test_list_tools_and_read_resource(emulator):
+    _, _, body = request(make_gateway(), "GET", "/tools")
+    tools = {tool["name"]: tool for tool in body["result"]}
+    assert "component_type" in tools["add_component"]["inputSchema"]["properties"]
+
+    status, _, body = request(make_gateway(), "GET", "/resources/component_library")
+    assert status == 200
+    assert body["categories"]
+    assert request(make_gateway(), "GET", "/resources/no_such_resource")[0] == 404
+
+
+def test_command_allow_list(emulator):
+    status, _, body = request(make_gateway(), "POST", "/command", json={"type": "clear_document"})
+    assert status == 403
+    assert "clear_document" in body["error"]
+
+    status, _, body = request(make_gateway(), "POST", "/command", json={"type": "get_document_info"})
+    assert status == 200 and body["success"]
+
+    status, _, body = request(make_gateway(allowed_commands=None), "POST", "/command", json={"type": "clear_document"})
+    assert status == 200 and body["success"]
+
+
+def test_batch_rejects_commands_outside_allow_list(emulator):
+    status, _, body = request(make_gateway(), "POST", "/batch", json={"calls": [
+        {"tool": "add_component", "arguments": {"component_type": "Panel", "x": 0, "y": 0}},
+        {"command": "clear_document"},
+    ]})
+
+    assert status == 200
+    assert not body["success"]
+    assert body["results"][0]["result"]["success"]
+    assert "not allowed" in body["results"][1]["result"]["error"]
+    assert len(emulator.document.components) == 1
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.jobs import CANCELLED, FAILED, QUEUED, RUNNING, SUCCEEDED, JobManager, JobManagerBusy
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def finished(job):
+    return job.future.done() and job.finished is not None
+
+
+@pytest.fixture
+def gate():
+    """Event that jobs block on, so tests control when the worker frees up"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def test_pending_queue_is_bounded(gate):
+    manager = JobManager(workers=1, max_pending=2)
+    running = manager.submit("running", lambda job: gate.wait())
+    wait_until(lambda: running.state == RUNNING)
+    queued = [manager.submit(f"queued {i}", lambda job: "done") for i in range(2)]
+
+    with pytest.raises(JobManagerBusy):
+        manager.submit("rejected", lambda job: "never")
+
+    assert [job.state for job in queued] == [QUEUED, QUEUED]
+    assert [job.name for job in manager.list()] == ["running", "queued 0", "queued 1"]
+    gate.set()
+    wait_until(lambda: all(finished(job) for job in queued))
+    assert [job.result for job in queued] == ["done", "done"]
+    # Room again once the queue drains
+    assert manager.submit("accepted", lambda job: None) is not None
+
+
+def test_cancel_only_stops_queued_jobs(gate):
+    manager = JobManager(workers=1)
+    calls = []
+    running = manager.submit("running", lambda job: gate.wait())
+    wait_until(lambda: running.state == RUNNING)
+    queued = manager.submit("queued", lambda job: calls.append(job.id))
+
+    assert manager.cancel(queued.id) is queued
+    assert manager.cancel(running.id).state == RUNNING
+    assert manager.cancel("unknown") is None
+
+    gate.set()
+    wait_until(lambda: finished(running))
+    assert queued.state == CANCELLED
+    assert queued.error == "Cancelled before it started"
+    assert running.state == SUCCEEDED
+    assert calls == []
+
+
+def test_failure_is_detected_from_the_result():
+    manager = JobManager()
+    reported = manager.submit("reported", lambda job: {"success": False, "error": "Component not found"})
+    raised = manager.submit("raised", lambda job: 1 / 0)
+    ok = manager.submit("ok", lambda job: {"success": True})
+    wait_until(lambda: all(finished(job) for job in (reported, raised, ok)))
+
+    assert (reported.state, reported.error) == (FAILED, "Component not found")
+    assert reported.result == {"success": False, "error": "Component not found"}
+    assert (raised.state, raised.result) == (FAILED, None)
+    assert "division by zero" in raised.error
+    assert (ok.state, ok.progress) == (SUCCEEDED, 1.0)
+
+
+def test_finished_jobs_are_pruned_after_retention(gate):
+    manager = JobManager(workers=1, retention=60)
+    done = manager.submit("done", lambda job: None)
+    wait_until(lambda: finished(done))
+    running = manager.submit("running", lambda job: gate.wait())
+    wait_until(lambda: running.state == RUNNING)
+
+    done.finished -= 30
+    assert manager.get(done.id) is done
+    done.finished -= 31
+    assert manager.get(done.id) is None
+    # Unfinished jobs are never pruned, however old
+    running.created -= 3600
+    assert [job.name for job in manager.list()] == ["running"]
+
+
+def test_background_tool_reports_plugin_failure(emulator, monkeypatch):
+    monkeypatch.setattr(bridge, "job_manager", JobManager(workers=1))
+
+    # The emulator has no create_pattern handler, so the command comes back with success: False
+    submitted = bridge.create_pattern("voronoi cube", background=True)
+    assert submitted["success"]
+    job_id = submitted["result"]["jobId"]
+    wait_until(lambda: not bridge.job_result(job_id).get("pending"))
+
+    result = bridge.job_result(job_id)
+    assert not result["success"]
+    assert result["job"]["state"] == FAILED
+    assert bridge.job_status(job_id)["result"]["state"] == FAILED
+    assert not bridge.cancel_job(job_id)["success"]
+    assert not bridge.job_result("unknown")["success"]
@@ -0,0 +1,50 @@
+from grasshopper_mcp import bridge
+from grasshopper_mcp.layout import layered_layout
+
+
+def test_nodes_follow_the_longest_path_without_overlaps():
+    edges = [("a", "b"), ("b", "c"), ("a", "c"), ("a", "d"), ("d", "e"), ("x", "e")]
+    positions = layered_layout(["a", "b", "c", "d", "e", "x", "lonely"], edges,
+                               x_spacing=100, y_spacing=50, origin=(10, 20))
+
+    assert len(set(positions.values())) == len(positions)
+    layers = {node: round((x - 10) / 100) for node, (x, _) in positions.items()}
+    assert layers == {"a": 0, "b": 1, "c": 2, "d": 1, "e": 2, "x": 0, "lonely": 0}
+    assert all(positions[source][0] < positions[target][0] for source, target in edges)
+    assert min(y for _, y in positions.values()) == 20
+
+
+def test_cycle_is_broken_and_still_laid_out():
+    # b -> c -> b is a feedback loop hanging off a
+    edges = [("a", "b"), ("b", "c"), ("c", "b"), ("c", "d")]
+    positions = layered_layout(["a", "b", "c", "d"], edges, x_spacing=100, y_spacing=50)
+
+    assert len(set(positions.values())) == 4
+    assert positions["a"][0] < positions["b"][0] < positions["c"][0] < positions["d"][0]
+
+
+def test_barycenter_ordering_avoids_crossings():
+    # Two independent chains listed crosswise; their ends should line up with their starts
+    edges = [("top", "top-end"), ("bottom", "bottom-end")]
+    positions = layered_layout(["top", "bottom", "bottom-end", "top-end"], edges)
+
+    assert positions["top"][1] < positions["bottom"][1]
+    assert positions["top-end"][1] < positions["bottom-end"][1]
+
+
+def test_endpoints_missing_from_nodes_are_added():
+    positions = layered_layout([], [("a", "b")])
+    assert set(positions) == {"a", "b"}
+
+
+def test_auto_layout_moves_canvas_components(emulator):
+    slider = bridge.add_component("Number Slider", 500, 500)["result"]["id"]
+    panel = bridge.add_component("Panel", 0, 0)["result"]["id"]
+    assert bridge.connect_components(slider, panel)["success"]
+
+    response = bridge.auto_layout(apply=True)
+
+    assert response["success"]
+    canvas = emulator.document.components
+    assert canvas[slider]["x"] < canvas[panel]["x"]
+    assert (canvas[slider]["x"], canvas[slider]["y"]) == (0, 0)
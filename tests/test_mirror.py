@@ -0,0 +1,59 @@
+from grasshopper_mcp import bridge
+from grasshopper_mcp.mirror import DocumentMirror
+
+
+def test_unnamed_wire_into_single_input_uses_that_input():
+    mirror = DocumentMirror()
+    mirror.load_connections([])
+    mirror.register_component("panel", ["Input"])
+    mirror.record_connection("slider", None, "panel")
+    assert mirror.connections() == [{"sourceId": "slider", "sourceParam": None, "targetId": "panel", "targetParam": "Input"}]
+    assert mirror.is_synced()
+
+
+def test_untrackable_wire_marks_mirror_unsynced():
+    mirror = DocumentMirror()
+    mirror.load_connections([])
+    mirror.register_component("add", ["A", "B"])
+    mirror.record_connection("slider", None, "add")
+    assert mirror.connections() == []
+    assert not mirror.is_synced()
+
+
+def test_listing_with_unknown_ports_is_not_authoritative():
+    mirror = DocumentMirror()
+    mirror.load_connections([{"sourceId": "s", "sourceParam": None, "targetId": "t", "targetParam": None}])
+    assert not mirror.is_synced()
+
+
+def test_assign_input_skips_occupied_ports():
+    mirror = DocumentMirror()
+    mirror.register_component("add", ["A", "B"])
+    mirror.load_connections([{"sourceId": "s", "sourceParam": "N", "targetId": "add", "targetParam": "A"}])
+    assert mirror.assign_input("add") == "B"
+    assert mirror.assign_input("add", reserved=["B"]) == "B"
+
+
+def test_bridge_wiring_matches_the_canvas(emulator):
+    first = bridge.add_component("Number Slider", 0, 0)["result"]["id"]
+    second = bridge.add_component("Number Slider", 0, 100)["result"]["id"]
+    addition = bridge.add_component("Addition", 200, 50)["result"]["id"]
+    panel = bridge.add_component("Panel", 400, 50)["result"]["id"]
+
+    assert bridge.connect_components(first, addition)["success"]
+    assert bridge.connect_components(second, addition)["success"]
+    assert bridge.connect_components(addition, panel)["success"]
+
+    def ports(connections):
+        return {(c["sourceId"], c["targetId"], c["targetParam"]) for c in connections}
+
+    canvas = emulator.document.get_connections({})
+    assert ports(bridge.document_mirror.connections()) == ports(canvas)
+    assert {c["targetParam"] for c in canvas if c["targetId"] == addition} == {"A", "B"}
+    assert bridge.document_mirror.is_synced()
+
+    # Once synced, further assignments need no listing
+    listings = emulator.document.command_counts.get("get_connections", 0)
+    third = bridge.add_component("Number Slider", 0, 200)["result"]["id"]
+    assert bridge.connect_components(third, panel)["success"]
+    assert emulator.document.command_counts.get("get_connections", 0) == listings
@@ -0,0 +1,42 @@
+import json
+
+from grasshopper_mcp.models import DocumentModel, component_type_name
+
+
+def test_class_names_map_to_library_names():
+    assert component_type_name({"type": "GH_NumberSlider"}) == "Number Slider"
+    assert component_type_name({"type": "GH_Panel"}) == "Panel"
+    assert component_type_name({"type": "Param_Point"}) == "Point"
+
+
+def test_component_name_wins_over_class_name():
+    assert component_type_name({"type": "Component_CircleCNR", "componentName": "Circle"}) == "Circle"
+
+
+def test_library_names_pass_through():
+    assert component_type_name({"type": "Addition"}) == "Addition"
+    assert component_type_name({}) is None
+
+
+def test_model_finds_sliders_reported_by_class_name():
+    model = DocumentModel.from_wire(
+        [
+            {"id": "s", "type": "GH_NumberSlider", "x": 0, "y": 0},
+            {"id": "p", "type": "GH_Panel", "componentName": "Panel", "x": 200, "y": 0},
+        ],
+        [{"sourceId": "s", "sourceParam": None, "targetId": "p", "targetParam": None}],
+    )
+    assert [component.id for component in model.of_type("Number Slider")] == ["s"]
+    assert [component.id for component in model.of_type("Panel")] == ["p"]
+
+
+def test_status_error_is_a_json_string(monkeypatch):
+    from grasshopper_mcp import bridge
+
+    def fail(*args, **kwargs):
+        raise ConnectionRefusedError("no plug-in")
+
+    monkeypatch.setattr(bridge, "document_fingerprint", fail)
+    status = bridge.get_grasshopper_status()
+    assert isinstance(status, str)
+    assert json.loads(status)["status"].startswith("Error")
@@ -0,0 +1,85 @@
+from array import array
+
+import numpy as np
+import pytest
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.packing import as_array, iter_chunks, pack_array, unpack_array
+
+
+@pytest.mark.parametrize("values, dtype", [
+    ([1, 2, 3], "int32"),
+    ([1.5, -2.25], "float64"),
+    ([2**40, 1], "float64"),
+    (array("d", [0.5, 1.5]), "float64"),
+    (np.arange(6).reshape(2, 3), "int32"),
+])
+def test_pack_round_trip(values, dtype):
+    packed = pack_array(values)
+
+    assert packed["dtype"] == dtype
+    unpacked = unpack_array(packed)
+    assert unpacked.shape == np.asarray(values).shape
+    assert np.array_equal(unpacked, np.asarray(values))
+    assert np.array_equal(as_array(packed), unpacked)
+
+
+def test_explicit_int32_rejects_lossy_values():
+    assert as_array([1.0, 2.0], "int32").dtype == np.dtype("<i4")
+    with pytest.raises(ValueError):
+        as_array([2**31], "int32")
+    with pytest.raises(ValueError):
+        as_array(np.array([-2**40], dtype=np.int64), "int32")
+    with pytest.raises(ValueError):
+        as_array([1.5], "int32")
+    with pytest.raises(ValueError):
+        as_array([float("nan")], "int32")
+    with pytest.raises(ValueError):
+        as_array([1], "int64")
+
+
+def test_iter_chunks_shapes():
+    assert [(offset, rows.tolist()) for offset, rows in iter_chunks(np.array(7.0))] == [(0, [7.0])]
+    assert [(offset, rows.size) for offset, rows in iter_chunks(np.zeros(0))] == [(0, 0)]
+    assert [(offset, rows.size) for offset, rows in iter_chunks(np.arange(10), 4)] == [(0, 4), (4, 4), (8, 2)]
+    # Rows of a 2-D array are never split
+    assert [(offset, rows.shape) for offset, rows in iter_chunks(np.zeros((5, 3)), 7)] == [(0, (2, 3)), (2, (2, 3)), (4, (1, 3))]
+
+
+@pytest.fixture
+def panel(emulator):
+    return bridge.send_to_grasshopper("add_component", {"type": "Panel", "x": 0, "y": 0})["result"]["id"]
+
+
+def test_set_values_streams_chunks_and_solves_once(emulator, panel, monkeypatch):
+    sent = []
+    send = bridge.send_to_grasshopper
+
+    def recording_send(command_type, params=None, *args, **kwargs):
+        if command_type == "set_component_value":
+            sent.append((params["append"], params["final"]))
+        return send(command_type, params, *args, **kwargs)
+
+    monkeypatch.setattr(bridge, "send_to_grasshopper", recording_send)
+    solutions = emulator.document.solutions
+
+    response = bridge.set_values({panel: list(range(10))}, chunk_size=4)
+
+    assert response["success"]
+    entry = response["result"]["results"][0]
+    assert (entry["count"], entry["chunks"]) == (10, 3)
+    assert sent == [(False, False), (True, False), (True, True)]
+    assert emulator.document.components[panel]["value"] == list(range(10))
+    assert emulator.document.solutions == solutions + 1
+
+
+def test_set_values_batches_small_arrays_and_reports_bad_ones(emulator, panel):
+    response = bridge.set_values({panel: [1.5, 2.5], "missing": [1, 2]})
+
+    assert not response["success"]
+    assert response["result"]["succeeded"] == 1
+    assert emulator.document.components[panel]["value"] == [1.5, 2.5]
+
+    response = bridge.set_values({panel: [1.5]}, dtype="int32")
+    assert not response["success"]
+    assert "whole numbers" in response["result"]["results"][0]["error"]
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from grasshopper_mcp.recorder import TrafficRecorder, load_log
+from grasshopper_mcp.replay import replay
+
+
+def write_log(path, lines):
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+
+
+def command(session, t, command_type="get_document_info"):
+    return {"session": session, "t": t, "type": command_type, "params": {}, "total_ms": 100.0, "ok": True}
+
+
+def test_recorder_writes_session_header(tmp_path):
+    path = tmp_path / "log.jsonl"
+    for _ in range(2):
+        recorder = TrafficRecorder(str(path))
+        recorder.record("get_document_info", {}, recorder._start + 0.5, 10, 20, 0.001, 0.002, True)
+        recorder.close()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [("started" in line, "type" in line) for line in lines] == [(True, False), (False, True)] * 2
+    assert lines[0]["session"] == lines[1]["session"] != lines[2]["session"]
+
+
+def test_sequential_sessions_replay_one_after_another(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write_log(path, [
+        {"session": "a", "started": 1000.0},
+        command("a", 0.0), command("a", 2.0),
+        # An hour later, in a new process whose clock restarts at 0
+        {"session": "b", "started": 4600.0},
+        command("b", 0.0), command("b", 1.0),
+    ])
+
+    entries = load_log(str(path))
+
+    assert [(entry["session"], entry["t"]) for entry in entries] == [("a", 0.0), ("a", 2.0), ("b", 2.1), ("b", 3.1)]
+
+
+def test_overlapping_sessions_keep_their_relative_timing(tmp_path):
+    path = tmp_path / "log.jsonl"
+    write_log(path, [
+        {"session": "a", "started": 1000.0},
+        {"session": "b", "started": 1001.5},
+        command("a", 0.0), command("b", 0.0), command("a", 3.0), command("b", 0.5),
+    ])
+
+    entries = load_log(str(path))
+
+    assert [(entry["session"], entry["t"]) for entry in entries] == [("a", 0.0), ("b", 1.5), ("b", 2.0), ("a", 3.0)]
+
+
+def test_log_without_headers_is_one_session(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text(json.dumps({"t": 1.0, "type": "x"}) + "\nnot json\n" + json.dumps({"t": 0.5, "type": "y"}) + "\n",
+                    encoding="utf-8")
+
+    assert [entry["type"] for entry in load_log(str(path))] == ["y", "x"]
+
+
+def test_replay_against_emulator(emulator):
+    entries = [command("a", 0.0), command("a", 0.01, "get_all_components"), command("a", 0.02, "no_such_command")]
+
+    report = replay(entries, "localhost", emulator.server_address[1], speed=None, concurrency=2, timeout=5)
+
+    assert report["count"] == 3
+    assert report["failed"] == 1
+    assert set(report["by_type"]) == {"get_document_info", "get_all_components", "no_such_command"}
+
+
+def test_replay_requires_a_worker():
+    with pytest.raises(ValueError):
+        replay([command("a", 0.0)], "localhost", 1, concurrency=0)
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from grasshopper_mcp.scheduler import BACKGROUND, BULK, INTERACTIVE, CommandScheduler, SchedulerBusy
+
+ENDPOINT = ("localhost", 8080)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def queued(scheduler):
+    return scheduler.metrics()["endpoints"]["localhost:8080"]["queueDepth"]
+
+
+def start_waiter(scheduler, priority, order, label):
+    def run():
+        scheduler.acquire(ENDPOINT, priority)
+        order.append(label)
+        scheduler.release(ENDPOINT)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_window_bounds_commands_in_flight():
+    scheduler = CommandScheduler(window=2)
+    assert scheduler.acquire(ENDPOINT) == 0.0
+    assert scheduler.acquire(ENDPOINT) == 0.0
+
+    order = []
+    thread = start_waiter(scheduler, INTERACTIVE, order, "third")
+    wait_until(lambda: queued(scheduler) == 1)
+    assert order == []
+    assert scheduler.metrics()["endpoints"]["localhost:8080"]["inFlight"] == 2
+
+    scheduler.release(ENDPOINT)
+    thread.join(5)
+    assert order == ["third"]
+    scheduler.release(ENDPOINT)
+    assert scheduler.metrics()["endpoints"]["localhost:8080"]["inFlight"] == 0
+
+
+def test_queued_commands_run_by_priority_then_arrival():
+    scheduler = CommandScheduler(window=1)
+    scheduler.acquire(ENDPOINT)
+
+    order = []
+    threads = []
+    for priority, label in ((BACKGROUND, "background"), (BULK, "bulk 1"), (BULK, "bulk 2"), (INTERACTIVE, "interactive")):
+        threads.append(start_waiter(scheduler, priority, order, label))
+        wait_until(lambda: queued(scheduler) == len(threads))
+
+    scheduler.release(ENDPOINT)
+    for thread in threads:
+        thread.join(5)
+    assert order == ["interactive", "bulk 1", "bulk 2", "background"]
+
+
+def test_full_queue_rejects_with_scheduler_busy():
+    scheduler = CommandScheduler(window=1, max_queue=1)
+    scheduler.acquire(ENDPOINT)
+    order = []
+    thread = start_waiter(scheduler, BULK, order, "queued")
+    wait_until(lambda: queued(scheduler) == 1)
+
+    with pytest.raises(SchedulerBusy):
+        scheduler.acquire(ENDPOINT, INTERACTIVE)
+
+    scheduler.release(ENDPOINT)
+    thread.join(5)
+    priorities = scheduler.metrics()["endpoints"]["localhost:8080"]["priorities"]
+    assert priorities["interactive"]["rejected"] == 1
+    assert priorities["bulk"]["submitted"] == 1
+    assert order == ["queued"]
+
+
+def test_endpoints_have_separate_windows():
+    scheduler = CommandScheduler(window=1, max_queue=0)
+    scheduler.acquire(ENDPOINT)
+    assert scheduler.acquire(("localhost", 8081)) == 0.0
+    with pytest.raises(SchedulerBusy):
+        scheduler.acquire(ENDPOINT)
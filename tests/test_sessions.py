@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from grasshopper_mcp.sessions import DocumentLock, DocumentLockTimeout, LOCAL_OWNER
+
+
+def test_lock_is_reentrant_for_its_owner():
+    lock = DocumentLock()
+    lock.acquire("a")
+    lock.acquire("a")
+    lock.release("a")
+    assert lock.status()["owner"] == "a"
+
+    with pytest.raises(DocumentLockTimeout):
+        lock.acquire("b", timeout=0.05)
+
+    lock.release("a")
+    status = lock.status()
+    assert not status["locked"]
+    assert status["timeouts"] == 1
+
+
+def test_release_by_other_owner_is_ignored():
+    lock = DocumentLock()
+    with lock.held(None):
+        lock.release("b")
+        assert lock.status()["owner"] == LOCAL_OWNER
+    assert not lock.status()["locked"]
+
+
+def test_waiter_gets_lock_when_released():
+    lock = DocumentLock()
+    lock.acquire("a")
+    acquired = threading.Event()
+
+    def wait():
+        with lock.held("b", timeout=5):
+            acquired.set()
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired.is_set()
+    lock.release("a")
+    thread.join(5)
+
+    assert acquired.is_set()
+    assert lock.status()["waited"] == 1
+
+
+def test_hold_keeps_lock_between_calls_until_unhold():
+    lock = DocumentLock()
+    lock.hold("a", lease=60)
+    with lock.held("a"):
+        pass
+    assert lock.status()["owner"] == "a"
+    with pytest.raises(DocumentLockTimeout):
+        lock.acquire("b", timeout=0.05)
+
+    assert not lock.unhold("b")
+    assert lock.unhold("a")
+    lock.acquire("b", timeout=0)
+    assert lock.status()["owner"] == "b"
+
+
+def test_expired_lease_frees_lock_for_waiters():
+    lock = DocumentLock()
+    lock.hold("a", lease=0.1)
+    started = time.monotonic()
+
+    # Nobody releases: the waiter must notice the lease running out on its own
+    lock.acquire("b", timeout=5)
+
+    assert time.monotonic() - started < 2
+    status = lock.status()
+    assert status["owner"] == "b"
+    assert status["expiredLeases"] == 1
+
+
+def test_lease_does_not_end_a_call_in_progress():
+    lock = DocumentLock()
+    lock.hold("a", lease=0.05)
+    lock.acquire("a")
+    time.sleep(0.1)
+
+    # The lease ran out, but "a" is still inside a call
+    assert lock.status()["owner"] == "a"
+    lock.release("a")
+    assert not lock.status()["locked"]
+
+
+def test_async_waiter_wakes_on_release():
+    lock = DocumentLock()
+    lock.acquire("a")
+
+    async def wait():
+        asyncio.get_running_loop().call_later(0.05, lock.release, "a")
+        await lock.acquire_async("b", timeout=5)
+
+    asyncio.run(wait())
+    assert lock.status()["owner"] == "b"
+
+    async def time_out():
+        await lock.acquire_async("c", timeout=0.05)
+
+    with pytest.raises(DocumentLockTimeout):
+        asyncio.run(time_out())
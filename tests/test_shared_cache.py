@@ -0,0 +1,84 @@
+import pytest
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.shared_cache import SharedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SharedCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def round_trips(emulator, cache, monkeypatch):
+    """Shared cache enabled for the bridge, with every request to the emulator recorded"""
+    monkeypatch.setattr(bridge, "shared_cache", cache)
+    monkeypatch.setattr(bridge, "_fingerprint_supported", None)
+    monkeypatch.setattr(bridge, "_batch_supported", None)
+    sent = []
+    send = bridge.send_to_grasshopper
+
+    def recording_send(command_type, params=None, *args, **kwargs):
+        sent.append(command_type)
+        return send(command_type, params, *args, **kwargs)
+
+    monkeypatch.setattr(bridge, "send_to_grasshopper", recording_send)
+    return sent
+
+
+def test_get_or_compute_counts_one_miss(cache):
+    assert cache.get_or_compute("key", lambda: {"value": 1}) == {"value": 1}
+    assert cache.get_or_compute("key", lambda: pytest.fail("should be cached")) == {"value": 1}
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["stores"]) == (1, 1, 1)
+
+
+def test_get_or_compute_does_not_store_none(cache):
+    assert cache.get_or_compute("key", lambda: None) is None
+    assert cache.get("key") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_listing_cold_miss_takes_two_round_trips(emulator, round_trips):
+    bridge.send_to_grasshopper("add_component", {"type": "Point", "x": 0, "y": 0})
+    round_trips.clear()
+
+    response = bridge.send_listing("get_all_components")
+
+    assert response["success"] and len(response["result"]) == 1
+    assert round_trips == ["get_document_fingerprint", "batch"]
+
+    round_trips.clear()
+    assert bridge.send_listing("get_all_components")["result"] == response["result"]
+    assert round_trips == ["get_document_fingerprint"]
+
+
+def test_listing_not_cached_when_document_changes_during_fetch(emulator, cache, round_trips, monkeypatch):
+    fingerprint = bridge.document_fingerprint
+    # The document changes between the first fingerprint and the listing
+    monkeypatch.setattr(bridge, "document_fingerprint", lambda priority=bridge.INTERACTIVE: fingerprint(priority) + "-old")
+
+    response = bridge.send_listing("get_connections")
+
+    assert response["success"] and response["result"] == []
+    assert cache.stats()["stores"] == 0
+
+
+def test_component_parameters_come_from_library(round_trips):
+    response = bridge.get_component_parameters("slider")
+
+    assert response["success"]
+    assert response["result"]["name"] == "Number Slider"
+    assert [param["name"] for param in response["result"]["outputs"]] == ["N"]
+    assert round_trips == []
+
+    assert not bridge.get_component_parameters("No Such Component")["success"]
+
+
+def test_search_components_matches_library(round_trips):
+    response = bridge.search_components("slider")
+
+    assert response["success"]
+    assert "Number Slider" in [match["name"] for match in response["result"]]
+    assert round_trips == []
@@ -0,0 +1,53 @@
+from grasshopper_mcp import bridge
+from grasshopper_mcp.snapshot import SnapshotStore, take_snapshot, diff_snapshots, is_empty_diff, plan_patch
+
+
+def _document(slider_id="s1", circle_id="c1", circle_x=300):
+    components = [
+        {"id": slider_id, "type": "GH_NumberSlider", "name": "r", "x": 0, "y": 0, "value": 2},
+        {"id": circle_id, "type": "Component_CircleCNR", "componentName": "Circle", "name": "Circle", "x": circle_x, "y": 0},
+    ]
+    connections = [{"sourceId": slider_id, "sourceParam": "Number Slider", "targetId": circle_id, "targetParam": "Radius"}]
+    return take_snapshot(components, connections)
+
+
+def test_recreated_component_matches_by_type_name_and_position():
+    diff = diff_snapshots(_document(), _document(slider_id="s2"))
+    assert diff["addedComponents"] == [] and diff["removedComponents"] == []
+    assert diff["matchedComponents"] == [{"id": "s1", "newId": "s2"}]
+    assert diff["addedConnections"] == [] and diff["rewiredConnections"] == []
+    assert is_empty_diff(diff)
+
+
+def test_moved_component_falls_back_to_id():
+    diff = diff_snapshots(_document(), _document(circle_x=500))
+    assert diff["movedComponents"] == [{"id": "c1", "x": 500, "y": 0}]
+    assert diff["addedComponents"] == [] and diff["matchedComponents"] == []
+
+
+def test_recreated_and_moved_component_is_added():
+    diff = diff_snapshots(_document(), _document(circle_id="c2", circle_x=500))
+    assert [component["id"] for component in diff["addedComponents"]] == ["c2"]
+    assert [component["id"] for component in diff["removedComponents"]] == ["c1"]
+    assert plan_patch(diff)["create"][0]["parameters"]["type"] == "Circle"
+
+
+def test_version_1_snapshots_still_diff():
+    old = {"version": 1, "hash": "old", "components": [["s1", "Number Slider", 0, 0, 2]], "connections": []}
+    new = take_snapshot([{"id": "s1", "type": "GH_NumberSlider", "name": "r", "x": 0, "y": 0, "value": 3}], [])
+    diff = diff_snapshots(old, new)
+    assert diff["changedValues"] == [{"id": "s1", "value": 3}]
+    assert diff["addedComponents"] == []
+
+
+def test_apply_patch_restores_values_and_positions(emulator, monkeypatch):
+    monkeypatch.setattr(bridge, "snapshot_store", SnapshotStore())
+    slider = bridge.add_component("Number Slider", 0, 0)["result"]
+    bridge.send_to_grasshopper("set_component_value", {"id": slider["id"], "value": "4"})
+    assert bridge.snapshot("start")["success"]
+    bridge.send_to_grasshopper("set_component_value", {"id": slider["id"], "value": "7"})
+    bridge.send_to_grasshopper("set_component_position", {"id": slider["id"], "x": 80, "y": 40})
+    result = bridge.apply_patch("start")
+    assert result["success"], result
+    component = emulator.document.components[slider["id"]]
+    assert component["value"] == "4" and (component["x"], component["y"]) == (0, 0)
@@ -0,0 +1,64 @@
+import csv
+import time
+
+import numpy as np
+
+from grasshopper_mcp.sweep import run_sweep
+
+GOOD = ("localhost", 1)
+BAD = ("localhost", 2)
+
+
+def _responses(commands, error=None):
+    responses = []
+    for command in commands:
+        if command["type"] == "get_component_info":
+            responses.append({"success": error is None, "result": {"value": 1.0}, "error": error})
+        else:
+            responses.append({"success": True, "result": {}})
+    return responses
+
+
+def test_requeued_sample_is_not_stranded(tmp_path):
+    def send_batch(commands, stop_on_error=False, endpoint=None):
+        if endpoint == BAD:
+            time.sleep(0.1)
+            return [{"success": False, "error": "Error communicating with Grasshopper: refused"}]
+        time.sleep(0.01)
+        return _responses(commands)
+
+    summary = run_sweep(send_batch, [GOOD, BAD], ["slider"], np.array([[1.0], [2.0], [3.0]]),
+                        {"out": ("panel", None)}, str(tmp_path / "sweep.csv"))
+    assert summary["completed"] == 3
+    assert summary["remaining"] == 0
+
+
+def test_resume_replaces_failed_rows(tmp_path):
+    path = str(tmp_path / "sweep.csv")
+    samples = np.array([[1.0], [2.0], [3.0]])
+
+    def flaky(commands, stop_on_error=False, endpoint=None):
+        value = commands[0]["parameters"]["value"]
+        return _responses(commands, error="Component not found" if value == "2.0" else None)
+
+    first = run_sweep(flaky, [GOOD], ["slider"], samples, {"out": ("panel", None)}, path)
+    assert (first["completed"], first["failed"]) == (2, 1)
+
+    second = run_sweep(lambda commands, **kwargs: _responses(commands), [GOOD], ["slider"], samples,
+                       {"out": ("panel", None)}, path)
+    assert (second["skipped"], second["completed"]) == (2, 1)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert sorted(int(row["sample"]) for row in rows) == [0, 1, 2]
+    assert not any(row["error"] for row in rows)
+
+
+def test_unreachable_endpoints_leave_samples_remaining(tmp_path):
+    def unreachable(commands, stop_on_error=False, endpoint=None):
+        return [{"success": False, "error": "Error communicating with Grasshopper: refused"}]
+
+    summary = run_sweep(unreachable, [GOOD, BAD], ["slider"], np.array([[1.0], [2.0]]),
+                        {"out": ("panel", None)}, str(tmp_path / "sweep.csv"))
+    assert summary["completed"] == 0
+    assert summary["remaining"] == 2
+    assert len(summary["droppedEndpoints"]) == 2
@@ -0,0 +1,62 @@
+import pytest
+
+from grasshopper_mcp.models import DocumentModel
+from grasshopper_mcp.templates import capture_template, plan_instances
+
+
+def _model():
+    return DocumentModel.from_wire(
+        [
+            {"id": "s", "type": "GH_NumberSlider", "componentName": "Number Slider", "name": "r",
+             "x": 100, "y": 50, "value": 2.5, "minimum": 0, "maximum": 10, "rounding": 0.1},
+            {"id": "c", "type": "Component_CircleCNR", "componentName": "Circle", "name": "Circle", "x": 300, "y": 50},
+            {"id": "p", "type": "GH_Panel", "name": "Panel", "x": 500, "y": 50, "value": ""},
+        ],
+        [
+            {"sourceId": "s", "sourceParam": None, "targetId": "c", "targetParam": "Radius"},
+            {"sourceId": "c", "sourceParam": "Circle", "targetId": "p", "targetParam": None},
+        ],
+    )
+
+
+def test_capture_uses_library_names_and_slider_ranges():
+    template, info = capture_template(_model(), ["s", "c"])
+    rows = {row[0]: row for row in template["components"]}
+    assert set(rows) == {"Number Slider", "Circle"}
+    assert rows["Number Slider"][4] == {"min": 0, "max": 10, "rounding": 0.1}
+    assert info["externalConnections"] == 1
+    assert len(template["connections"]) == 1
+
+
+def test_capture_is_position_independent():
+    model = _model()
+    first, _ = capture_template(model, ["s", "c"])
+    for component in model.components.values():
+        component.x += 1000
+    second, _ = capture_template(model, ["c", "s"])
+    assert first["hash"] == second["hash"]
+
+
+def test_instances_create_library_types_with_slider_settings():
+    template, _ = capture_template(_model(), ["s", "c"])
+    plan = plan_instances(template, copies=2)
+    assert sorted(command["parameters"]["type"] for command in plan["create"]) == ["Circle", "Circle", "Number Slider", "Number Slider"]
+    settings = [command for command in plan["update"] if command["type"] == "set_component_value"]
+    assert len(settings) == 2
+    assert all(command["parameters"]["minimum"] == 0 and command["parameters"]["decimals"] == 1 for command in settings)
+
+
+def test_range_overrides_need_a_slider_with_both_bounds():
+    with pytest.raises(ValueError):
+        plan_instances({"components": [["Panel", 0, 0, "a", None]], "connections": []}, overrides=[{"0": {"max": 10}}])
+    uncaptured = {"components": [["Number Slider", 0, 0, 5, None]], "connections": []}
+    with pytest.raises(ValueError):
+        plan_instances(uncaptured, overrides=[{"0": {"max": 10}}])
+
+    plan = plan_instances(uncaptured, overrides=[{"0": {"min": 1, "max": 10, "value": 4}}])
+    parameters = plan["update"][0]["parameters"]
+    assert (parameters["minimum"], parameters["maximum"], parameters["value"]) == (1, 10, "4")
+
+    template, _ = capture_template(_model(), ["s"])
+    plan = plan_instances(template, overrides=[{"0": {"max": 20}}])
+    assert (plan["update"][0]["parameters"]["minimum"], plan["update"][0]["parameters"]["maximum"]) == (0, 20)
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.emulator import EmulatedDocument
+from grasshopper_mcp.sessions import DocumentLock, SessionRunner, current_session
+
+
+@pytest.fixture
+def plugin(emulator, monkeypatch):
+    monkeypatch.setattr(bridge, "document_lock", DocumentLock())
+    monkeypatch.setattr(bridge, "_open_transaction", None)
+    monkeypatch.setattr(bridge, "_transactions_supported", None)
+    yield emulator.document
+    if bridge._open_transaction is not None:
+        bridge._forget_transaction(bridge._open_transaction["id"])
+
+
+@pytest.fixture
+def session():
+    tokens = []
+
+    def use(session_id):
+        tokens.append(current_session.set(session_id))
+
+    yield use
+    for token in reversed(tokens):
+        current_session.reset(token)
+
+
+def test_plugin_rolls_back_an_expired_transaction():
+    document = EmulatedDocument()
+    document.execute({"type": "begin_transaction", "parameters": {"timeoutSeconds": 0.05}})
+    document.execute({"type": "add_component", "parameters": {"type": "Addition"}})
+    time.sleep(0.1)
+    status = document.execute({"type": "get_transaction_status"})["data"]
+    assert not status["active"]
+    assert document.components == {}
+
+
+def test_failed_tool_is_rolled_back(plugin):
+    def body():
+        bridge.add_component("Addition", 0, 0)
+        return {"success": False, "error": "later step failed"}
+
+    result = bridge.run_in_transaction(body)
+    assert result["transaction"]["rolledBack"]
+    assert plugin.components == {}
+    assert plugin.transaction is None
+
+
+def test_successful_tool_recomputes_once(plugin):
+    solutions = plugin.solutions
+
+    def body():
+        first = bridge.add_component("Number Slider", 0, 0)["result"]["id"]
+        second = bridge.add_component("Panel", 200, 0)["result"]["id"]
+        return bridge.connect_components(first, second)
+
+    result = bridge.run_in_transaction(body)
+    assert result["transaction"]["committed"]
+    assert plugin.solutions == solutions + 1
+
+
+def test_lease_expiry_rolls_back_the_transaction(plugin, session):
+    session("a")
+    assert bridge.begin_transaction(lease_seconds=0.2)["success"]
+    bridge.add_component("Addition", 0, 0)
+    time.sleep(0.5)
+    assert plugin.transaction is None
+    assert plugin.components == {}
+    assert bridge._open_transaction is None
+    assert bridge.document_lock.status()["owner"] is None
+
+
+def test_session_end_rolls_back_the_transaction(plugin, session):
+    session("a")
+    assert bridge.begin_transaction(lease_seconds=60)["success"]
+    bridge.add_component("Addition", 0, 0)
+    runner = SessionRunner(None, bridge.document_lock, bridge.is_read_only_tool, workers=1,
+                           on_session_end=bridge._on_session_end)
+    runner._session_ended("a")
+    assert plugin.transaction is None
+    assert plugin.components == {}
+    assert bridge.document_lock.status()["owner"] is None
+
+
+def test_tool_does_not_join_another_sessions_transaction(plugin, session):
+    session("a")
+    assert bridge.begin_transaction(lease_seconds=60)["success"]
+    calls = []
+
+    def body():
+        calls.append(current_session.get())
+        return {"success": True}
+
+    session("b")
+    result = bridge.run_in_transaction(body)
+    assert not result["success"] and result["busy"]
+    assert calls == []
+
+    session("a")
+    assert bridge.run_in_transaction(body) == {"success": True}
+    assert calls == ["a"]
+    assert plugin.transaction is not None
+    assert bridge.commit_transaction()["success"]
+    assert bridge._open_transaction is None
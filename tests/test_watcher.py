@@ -0,0 +1,90 @@
+import threading
+import time
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.watcher import DocumentWatcher
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_start_after_stop_while_thread_is_still_busy():
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(threading.current_thread())
+        if len(calls) == 1:
+            # The first thread is mid-poll when it is stopped and the watcher restarted
+            release.wait(2.0)
+        return "a"
+
+    watcher = DocumentWatcher(fetch, lambda fingerprint: None, min_interval=0.01, max_interval=0.01)
+    watcher.start()
+    assert _wait_for(lambda: calls)
+    first = calls[0]
+    watcher.stop()
+    assert not watcher.running
+    watcher.start()
+    assert watcher.running
+    assert _wait_for(lambda: any(thread is not first for thread in calls))
+    release.set()
+    first.join(1.0)
+    assert not first.is_alive()
+    assert watcher.running
+    watcher.stop()
+
+
+def test_watcher_stops_itself_when_inactive_and_restarts():
+    subscribed = [True]
+    watcher = DocumentWatcher(lambda: "a", lambda fingerprint: None, min_interval=0.01, max_interval=0.01,
+                              active=lambda: subscribed[0])
+    watcher.start()
+    assert watcher.running
+    subscribed[0] = False
+    watcher.poke()
+    assert _wait_for(lambda: not watcher.running)
+    subscribed[0] = True
+    watcher.start()
+    assert watcher.running
+    watcher.stop()
+
+
+def test_change_is_reported_once():
+    fingerprints = iter(["a", "a", "b"])
+    changes = []
+    watcher = DocumentWatcher(lambda: next(fingerprints, "b"), changes.append)
+    assert not watcher.check()
+    assert not watcher.check()
+    assert watcher.check()
+    assert not watcher.check()
+    assert changes == ["b"]
+
+
+def test_bridge_edits_poke_the_watcher(emulator, monkeypatch):
+    polls = []
+    changes = []
+
+    def fetch():
+        polls.append(time.monotonic())
+        return bridge.document_fingerprint()
+
+    # Without pokes the next poll would be a minute away
+    watcher = DocumentWatcher(fetch, changes.append, min_interval=60, max_interval=60)
+    monkeypatch.setattr(bridge, "document_watcher", watcher)
+    watcher.start()
+    assert _wait_for(lambda: watcher.fingerprint is not None)
+
+    bridge.send_to_grasshopper("get_document_info")
+    time.sleep(0.2)
+    assert len(polls) == 1
+
+    bridge.send_to_grasshopper("add_component", {"type": "Panel", "x": 0, "y": 0})
+    assert _wait_for(lambda: changes)
+    watcher.stop()
@@ -0,0 +1,58 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from grasshopper_mcp.profiling import ToolProfiler
+from grasshopper_mcp.sessions import DocumentLock, SessionRunner
+from grasshopper_mcp.wrappers import installed_layers, wrap_handlers
+
+
+def make_server():
+    server = FastMCP("wrappers-test")
+    calls = []
+
+    @server.tool("add")
+    def add(a: int, b: int):
+        calls.append(threading.current_thread().name)
+        return {"success": True, "result": a + b}
+
+    @server.resource("test://status")
+    def status():
+        return {"calls": len(calls)}
+
+    return server, calls
+
+
+def test_profiled_tools_run_in_session_workers(tmp_path):
+    server, calls = make_server()
+    profiler = ToolProfiler(str(tmp_path))
+    runner = SessionRunner(server, DocumentLock(), lambda name: False, workers=2)
+
+    assert profiler.instrument(server) == 2
+    assert runner.install() == 2
+    assert installed_layers(server) == ["profile", "session"]
+
+    content = asyncio.run(server.call_tool("add", {"a": 2, "b": 3}))
+    assert json.loads(content[0].text)["result"] == 5
+    assert calls[0].startswith("grasshopper-session")
+    # The profiler wrapped the synchronous function, so the call was profiled on the worker
+    assert profiler.summary()["invocations"]["tool.add"]["calls"] == 1
+
+    contents = asyncio.run(server.read_resource("test://status"))
+    assert json.loads(contents[0].content) == {"calls": 1}
+
+
+def test_layers_out_of_order_are_refused(tmp_path):
+    server, _ = make_server()
+    SessionRunner(server, DocumentLock(), lambda name: False).install()
+
+    with pytest.raises(RuntimeError):
+        ToolProfiler(str(tmp_path)).instrument(server)
+    with pytest.raises(RuntimeError):
+        SessionRunner(server, DocumentLock(), lambda name: False).install()
+    with pytest.raises(ValueError):
+        wrap_handlers(make_server()[0], "unknown", lambda *args: None)
+    assert installed_layers(server) == ["session"]